@@ -0,0 +1,39 @@
+"""
+setuptools.build_meta, except that a regular (non-editable) wheel is refused.
+
+bambu_inventory resolves data/, scripts/secret.env and the Arduino data directory from the repository
+checkout (ROOT = parents of the package), so an installed copy in site-packages would point at paths that
+do not exist. Editable installs keep the package in the checkout and are the supported way to install.
+"""
+# The metadata and editable hooks come from setuptools unchanged
+from setuptools.build_meta import (
+    build_editable,
+    get_requires_for_build_editable,
+    get_requires_for_build_sdist,
+    get_requires_for_build_wheel,
+    prepare_metadata_for_build_editable,
+    prepare_metadata_for_build_wheel,
+)
+
+__all__ = [
+    "build_editable",
+    "build_sdist",
+    "build_wheel",
+    "get_requires_for_build_editable",
+    "get_requires_for_build_sdist",
+    "get_requires_for_build_wheel",
+    "prepare_metadata_for_build_editable",
+    "prepare_metadata_for_build_wheel",
+]
+
+
+def build_wheel(wheel_directory, config_settings=None, metadata_directory=None):
+    raise RuntimeError(
+        "bambu-inventory reads its data from the repository checkout and cannot be installed as a regular "
+        "wheel; install it editable instead: pip install -e ."
+    )
+
+
+def build_sdist(sdist_directory, config_settings=None):
+    raise RuntimeError("bambu-inventory is not distributed as an sdist; install it editable: pip install -e .")
+
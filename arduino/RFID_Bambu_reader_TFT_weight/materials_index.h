@@ -0,0 +1,91 @@
+#pragma once
+
+// Lookup in materials.idx (written by scripts/materials_index.py and the sync) straight from SPIFFS.
+// Binary search over fixed 16-byte records sorted by filament code; strings are copied into the caller's
+// fixed buffers, so a lookup allocates nothing and needs no JSON document in RAM.
+//
+// Layout (little-endian): 16-byte header  "BMIX", u16 version, u16 record size, u32 count, u32 strings offset
+//                         count records    u32 code, u32 material, u32 color, u32 variantId (string offsets)
+//                         string table     NUL-terminated UTF-8
+
+#include <stddef.h>
+#include <stdint.h>
+#include <string.h>
+#include <SPIFFS.h>
+#include <FS.h>
+
+struct MaterialIndexEntry
+{
+    uint32_t code;
+    char material[32];
+    char color[48];
+    char variantId[16];
+};
+
+static inline uint32_t materialIndexU32(const uint8_t *p)
+{
+    return (uint32_t)p[0] | ((uint32_t)p[1] << 8) | ((uint32_t)p[2] << 16) | ((uint32_t)p[3] << 24);
+}
+
+// Copy the NUL-terminated string at `offset` into out (truncated to size - 1 bytes)
+static inline void materialIndexString(File &file, uint32_t offset, char *out, size_t size)
+{
+    size_t len = 0;
+    if (file.seek(offset))
+    {
+        while (len + 1 < size)
+        {
+            int c = file.read();
+            if (c <= 0)
+                break;
+            out[len++] = (char)c;
+        }
+    }
+    out[len] = '\0';
+}
+
+// Find `code` in the index; fills `out` and returns true when found
+inline bool findMaterialIndexed(uint32_t code, MaterialIndexEntry &out, const char *indexPath = "/materials.idx")
+{
+    File file = SPIFFS.open(indexPath, "r");
+    if (!file)
+    {
+        Serial.println("Failed to open materials.idx from SPIFFS");
+        return false;
+    }
+    uint8_t header[16];
+    if (file.read(header, sizeof(header)) != sizeof(header) || memcmp(header, "BMIX", 4) != 0 ||
+        (header[4] | (header[5] << 8)) != 1 || (header[6] | (header[7] << 8)) != 16)
+    {
+        Serial.println("materials.idx is not a v1 materials index");
+        file.close();
+        return false;
+    }
+    uint32_t count = materialIndexU32(header + 8);
+    uint32_t strings = materialIndexU32(header + 12);
+
+    uint8_t record[16];
+    uint32_t lo = 0, hi = count;
+    while (lo < hi)
+    {
+        uint32_t mid = lo + (hi - lo) / 2;
+        if (!file.seek(16 + mid * 16) || file.read(record, sizeof(record)) != sizeof(record))
+            break;
+        uint32_t found = materialIndexU32(record);
+        if (found == code)
+        {
+            out.code = found;
+            materialIndexString(file, strings + materialIndexU32(record + 4), out.material, sizeof(out.material));
+            materialIndexString(file, strings + materialIndexU32(record + 8), out.color, sizeof(out.color));
+            materialIndexString(file, strings + materialIndexU32(record + 12), out.variantId, sizeof(out.variantId));
+            file.close();
+            return true;
+        }
+        if (found < code)
+            lo = mid + 1;
+        else
+            hi = mid;
+    }
+    file.close();
+    return false;
+}
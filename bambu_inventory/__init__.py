@@ -0,0 +1,6 @@
+"""
+Bambu Lab filament inventory tools (see scripts/README.md).
+
+The modules import each other relatively; scripts/<module>.py are thin shims so `python scripts/x.py` keeps
+working from a checkout. Data paths resolve from the checkout, so install with `pip install -e .`.
+"""
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Single-pass fan-out writer for the artifacts derived from merged rows.
+
+`fan_out(rows, sinks)` iterates the rows once and hands each one to every sink, which streams its own format to a
+temp file next to the target; the targets are replaced only after every sink finished, so a failed run leaves
+the previous artifacts in place.
+
+    JsonArraySink   JSON array; indent=2 gives the same bytes as json.dumps(rows, indent=2), compact=True one
+                    minified object per line (device-bound files, parsed by ArduinoJson on the ESP32)
+    CsvSink         CSV/TSV with a fixed column list
+    CollectSink     hands the rows to a callback at the end (e.g. Catalog.replace)
+
+Sinks can project rows onto other key names (`columns={"filamentCode": "code", ...}`) so the Arduino
+materials.json is written from the same pass as filament.json without building a second list of dicts.
+
+Output is canonical: UTF-8, no BOM, LF-joined JSON with fixed separators, and with `columns` or `key_order` a
+fixed key order (other keys follow sorted), so equal content gives equal bytes whichever merge path built the rows.
+A finished temp file only replaces its target when the sha256 differs; otherwise the target (and its mtime) is
+left alone, so git, SPIFFS uploads and file watchers see no change. With a Manifest, fan_out records every
+file's sha256/bytes/rows in data/artifacts_manifest.json and `summarize()` lists what changed.
+
+    python scripts/artifacts.py            # manifest entries and whether the files still match them
+"""
+import argparse
+import csv
+import hashlib
+import json
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parents[1]
+MANIFEST_JSON = ROOT / "data" / "artifacts_manifest.json"
+
+Row = Dict[str, Any]
+
+
+class Sink:
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.tmp = self.path.with_name(self.path.name + ".tmp")
+        self.fh: Any = None
+        self.rows = 0
+        self.sha256 = ""
+        self.bytes = 0
+        self.previous_bytes: Optional[int] = None
+        self.changed: Optional[bool] = None
+
+    def open(self) -> None:
+        self.rows = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fh = self.tmp.open("w", encoding="utf-8", newline="")
+
+    def write(self, row: Row) -> None:
+        raise NotImplementedError
+
+    def finish(self) -> None:
+        """Write any trailer; the file is still open."""
+
+    def close(self) -> None:
+        self.finish()
+        self.fh.close()
+
+    def commit(self) -> None:
+        """Replace the target with the temp file unless both hash the same (then the target is not touched)."""
+        self.sha256 = file_sha256(self.tmp)
+        self.bytes = self.tmp.stat().st_size
+        if self.path.exists():
+            self.previous_bytes = self.path.stat().st_size
+            if self.previous_bytes == self.bytes and file_sha256(self.path) == self.sha256:
+                self.tmp.unlink()
+                self.changed = False
+                return
+        self.tmp.replace(self.path)
+        self.changed = True
+
+    def abort(self) -> None:
+        if self.fh is not None and not self.fh.closed:
+            self.fh.close()
+        self.tmp.unlink(missing_ok=True)
+
+    def describe(self) -> str:
+        return f"{self.path.name} ({self.rows} rows)"
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as fh:
+        for block in iter(lambda: fh.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def canonical(row: Row, columns: Optional[Dict[str, str]] = None, key_order: Optional[Sequence[str]] = None) -> Row:
+    """
+    `row` in canonical key order. With `columns` ({output key: input key}) only those keys are kept, renamed,
+    missing inputs as ""; with `key_order` those keys come first and any others follow sorted; with neither the
+    row is kept as it is (catalog exports are verbatim).
+    """
+    if columns is not None:
+        return {out: row.get(key, "") for out, key in columns.items()}
+    if key_order is None:
+        return row
+    ordered = {key: row[key] for key in key_order if key in row}
+    for key in sorted(row.keys() - ordered.keys()):
+        ordered[key] = row[key]
+    return ordered
+
+
+class JsonArraySink(Sink):
+    def __init__(
+        self,
+        path: Path,
+        columns: Optional[Dict[str, str]] = None,
+        compact: bool = False,
+        key_order: Optional[Sequence[str]] = None,
+    ) -> None:
+        super().__init__(path)
+        self.columns = columns
+        self.compact = compact
+        self.key_order = key_order
+
+    def write(self, row: Row) -> None:
+        row = canonical(row, self.columns, self.key_order)
+        if self.compact:
+            text = json.dumps(row, ensure_ascii=False, separators=(",", ":"))
+        else:
+            # json.dumps escapes newlines inside strings, so re-indenting the lines nests the object exactly
+            text = "  " + json.dumps(row, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+        self.fh.write(("[\n" if self.rows == 0 else ",\n") + text)
+        self.rows += 1
+
+    def finish(self) -> None:
+        self.fh.write("\n]" if self.rows else "[]")
+
+
+class CsvSink(Sink):
+    def __init__(self, path: Path, fields: Sequence[str], delimiter: str = ",") -> None:
+        super().__init__(path)
+        self.fields = list(fields)
+        self.delimiter = delimiter
+        self.writer: Any = None
+
+    def open(self) -> None:
+        super().open()
+        self.writer = csv.writer(self.fh, delimiter=self.delimiter)
+        self.writer.writerow(self.fields)
+
+    def write(self, row: Row) -> None:
+        values = []
+        for field in self.fields:
+            value = row.get(field, "")
+            values.append(json.dumps(value) if isinstance(value, (dict, list)) else value)
+        self.writer.writerow(values)
+        self.rows += 1
+
+
+class CollectSink(Sink):
+    """Not a file: collects the rows and passes them to `callback` once every file sink succeeded."""
+
+    def __init__(self, name: str, callback: Callable[[List[Row]], Any]) -> None:
+        self.name = name
+        self.callback = callback
+        self.collected: List[Row] = []
+        self.rows = 0
+        self.changed: Optional[bool] = None
+
+    def open(self) -> None:
+        self.collected = []
+        self.rows = 0
+
+    def write(self, row: Row) -> None:
+        self.collected.append(row)
+        self.rows += 1
+
+    def close(self) -> None:
+        pass
+
+    def commit(self) -> None:
+        self.callback(self.collected)
+
+    def abort(self) -> None:
+        self.collected = []
+
+    def describe(self) -> str:
+        return f"{self.name} ({self.rows} rows)"
+
+
+def sink_for(path: Path, fields: Optional[Sequence[str]] = None) -> Sink:
+    """Sink for an export path by suffix: .csv/.tsv get a column per field, anything else a JSON array."""
+    suffix = Path(path).suffix.lower()
+    if suffix in (".csv", ".tsv"):
+        return CsvSink(path, fields or (), delimiter="\t" if suffix == ".tsv" else ",")
+    return JsonArraySink(path)
+
+
+class Manifest:
+    """{path relative to the repo: {sha256, bytes, rows}} of the artifacts fan_out wrote (data/artifacts_manifest.json)."""
+
+    def __init__(self, path: Path = MANIFEST_JSON) -> None:
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+    def load(self) -> "Manifest":
+        try:
+            self.entries = json.loads(self.path.read_text(encoding="utf-8")).get("artifacts", {})
+        except Exception:  # noqa: BLE001
+            self.entries = {}
+        return self
+
+    @staticmethod
+    def key(path: Path) -> str:
+        path = Path(path).resolve()
+        try:
+            return path.relative_to(ROOT).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def record(self, sink: Sink) -> None:
+        self.entries[self.key(sink.path)] = {"sha256": sink.sha256, "bytes": sink.bytes, "rows": sink.rows}
+
+    def save(self) -> None:
+        """Canonical JSON (sorted keys, no timestamps), replaced only when it changed like any other artifact."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        text = json.dumps({"artifacts": self.entries}, indent=2, sort_keys=True, ensure_ascii=False) + "\n"
+        tmp.write_text(text, encoding="utf-8", newline="")
+        if self.path.exists() and file_sha256(self.path) == file_sha256(tmp):
+            tmp.unlink()
+        else:
+            tmp.replace(self.path)
+
+    def verify(self) -> List[str]:
+        """Entries whose file is missing or no longer hashes to the recorded sha256."""
+        drift = []
+        for key, entry in sorted(self.entries.items()):
+            path = ROOT / key if not Path(key).is_absolute() else Path(key)
+            if not path.exists():
+                drift.append(f"{key}: missing")
+            elif file_sha256(path) != entry.get("sha256"):
+                drift.append(f"{key}: modified since it was written")
+        return drift
+
+
+def fan_out(rows: Iterable[Row], sinks: Sequence[Sink], manifest: Optional[Manifest] = None) -> int:
+    """
+    Write `rows` to every sink in one pass; targets are replaced only if every sink succeeded, and then only
+    those whose content changed. File sinks are recorded in `manifest` (saved) when given.
+    """
+    count = 0
+    try:
+        for sink in sinks:
+            sink.open()
+        for row in rows:
+            for sink in sinks:
+                sink.write(row)
+            count += 1
+        for sink in sinks:
+            sink.close()
+    except BaseException:
+        for sink in sinks:
+            sink.abort()
+        raise
+    for sink in sinks:
+        sink.commit()
+    if manifest is not None:
+        for sink in sinks:
+            if sink.changed is not None:
+                manifest.record(sink)
+        manifest.save()
+    return count
+
+
+def summarize(sinks: Sequence[Sink]) -> str:
+    """One line: which files changed (with their size delta) and which were left as they were."""
+    changed, unchanged, other = [], [], []
+    for sink in sinks:
+        if sink.changed is None:
+            other.append(sink.describe())
+        elif not sink.changed:
+            unchanged.append(sink.path.name)
+        elif sink.previous_bytes is None:
+            changed.append(f"{sink.path.name} (new, {sink.bytes} B)")
+        else:
+            changed.append(f"{sink.path.name} ({sink.bytes - sink.previous_bytes:+d} B)")
+    parts = [f"changed: {', '.join(changed) or 'none'}"]
+    if unchanged:
+        parts.append(f"unchanged: {', '.join(unchanged)}")
+    if other:
+        parts.append(f"also: {', '.join(other)}")
+    return "; ".join(parts)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Show the artifact manifest and check the files against it.")
+    parser.add_argument("--manifest", default=str(MANIFEST_JSON), help="Manifest file (default: data/artifacts_manifest.json)")
+    args = parser.parse_args()
+    manifest = Manifest(Path(args.manifest)).load()
+    if not manifest.entries:
+        print(f"No artifacts recorded in {manifest.path}.")
+        return 0
+    for key, entry in sorted(manifest.entries.items()):
+        print(f"{entry['sha256'][:12]}  {entry['bytes']:>8} B  {entry['rows']:>6} rows  {key}")
+    drift = manifest.verify()
+    for line in drift:
+        print(f"[WARN] {line}", file=sys.stderr)
+    return 1 if drift else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Bulk store ingestion from the Shopify-style `<collection>/products.json` feed.
+
+One paginated JSON request per 250 products replaces one HTML download + BeautifulSoup parse per product page.
+Variants are flattened to the same code/color/variantid/imageurl shape parse_product_variants returns, plus producturl.
+sync_all_data.py uses this by default (`--ingest auto`) and falls back to the HTML crawl when the feed is unavailable.
+
+Standalone (offline check against the bundled fixture):
+    python scripts/bulk_products.py --file data/fixtures/shopify_products.json --check data/fixtures/shopify_products.expected.json
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+from .http_cache import cached_get
+
+ROOT = Path(__file__).resolve().parents[1]
+STORE_BASE = os.environ.get("STORE_BASE", "https://store.bambulab.com")
+COLLECTION_PATH = os.environ.get("STORE_COLLECTION_PATH", "/collections/bambu-lab-3d-printer-filament")
+PAGE_LIMIT = 250
+
+
+def fetch_bulk_products(collection_url: str, limit: int = PAGE_LIMIT, max_pages: int = 40) -> List[Dict]:
+    """Page through `<collection_url>/products.json` until a short page comes back."""
+    products: List[Dict] = []
+    for page in range(1, max_pages + 1):
+        resp = cached_get(f"{collection_url.rstrip('/')}/products.json?limit={limit}&page={page}")
+        resp.raise_for_status()
+        batch = resp.json().get("products", [])
+        products.extend(batch)
+        if len(batch) < limit:
+            break
+    return products
+
+
+def load_bulk_products(path: Path) -> List[Dict]:
+    """Read a saved products.json page (object with "products") or a list of such pages."""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    pages = data if isinstance(data, list) else [data]
+    return [product for page in pages for product in page.get("products", [])]
+
+
+def map_bulk_products(products: List[Dict], store_base: str = STORE_BASE) -> List[Dict[str, str]]:
+    variants: List[Dict[str, str]] = []
+    for product in products:
+        handle = product.get("handle", "")
+        producturl = f"{store_base.rstrip('/')}/products/{handle}" if handle else ""
+        images = product.get("images") or []
+        fallback_image = images[0].get("src", "") if images else ""
+        for variant in product.get("variants", []):
+            image_url = (variant.get("featured_image") or {}).get("src", "") or fallback_image
+            variants.append(
+                {
+                    "code": str(variant.get("sku") or variant.get("barcode") or "").strip(),
+                    "color": str(variant.get("title") or variant.get("option1") or "").strip(),
+                    "variantid": variant.get("sku", "") or "",
+                    "imageurl": image_url,
+                    "producturl": producturl,
+                }
+            )
+    return variants
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Fetch or load the bulk products.json feed and print the mapped variant rows.")
+    parser.add_argument("--file", default=None, help="Saved products.json page(s) to map instead of fetching the live feed")
+    parser.add_argument("--check", default=None, help="Expected mapped rows (JSON); exit 1 when the mapping differs")
+    args = parser.parse_args()
+
+    if args.file:
+        products = load_bulk_products(Path(args.file))
+    else:
+        products = fetch_bulk_products(f"{STORE_BASE.rstrip('/')}{COLLECTION_PATH}")
+    variants = map_bulk_products(products, STORE_BASE)
+
+    if args.check:
+        expected = json.loads(Path(args.check).read_text(encoding="utf-8"))
+        if variants != expected:
+            print(f"MISMATCH: mapped {len(variants)} rows, expected {len(expected)}", file=sys.stderr)
+            for got, want in zip(variants, expected):
+                if got != want:
+                    print(f"  got  {got}\n  want {want}", file=sys.stderr)
+            return 1
+        print(f"OK: {len(products)} products -> {len(variants)} rows match {args.check}")
+        return 0
+
+    print(json.dumps(variants, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
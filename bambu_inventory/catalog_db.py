@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Local SQLite catalog (data/catalog.sqlite3): the one place scripts read and write source rows.
+
+One table per source, all with the same layout: rows are kept verbatim (JSON, original key names and order) next
+to the extracted `code`, `variant_id` and `product_url` columns, each of which is indexed.
+
+    tab       "store index" Google Sheet tab        (export: data/store_index_tab.json)
+    store     scraped/merged store index             (export: data/store_index.json)
+    queen     Queen README filament table            (export: data/queengooborg.json)
+    filament  merged catalog from sync_all_data.py   (export: data/filament.json)
+
+The flat files are exports. With CATALOG_MIRROR=1 (the default) every save also rewrites the source's export so
+the Apps Script and firmware tooling keep working unchanged; with CATALOG_MIRROR=0 they are written only on demand:
+
+    python scripts/catalog_db.py --export store data/store_index.csv
+    python scripts/catalog_db.py --lookup 10100 | --variant A00-W1 | --url <product url>
+
+A source that was never saved is imported from its export file on first read, so existing data/ trees migrate
+without a separate step (`--import <source> [file]` does it explicitly). The sha256 of the export the catalog
+last matched is kept per source; when the file on disk changes behind the catalog's back (a `git pull`, a hand
+edit), the next read imports it again instead of letting the next save overwrite it with stale rows.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlparse, urlunparse
+
+from .artifacts import fan_out, file_sha256, sink_for
+
+ROOT = Path(__file__).resolve().parents[1]
+CATALOG_DB = Path(os.environ.get("CATALOG_DB", str(ROOT / "data" / "catalog.sqlite3")))
+CATALOG_MIRROR = os.environ.get("CATALOG_MIRROR", "1") != "0"
+SOURCES = ("tab", "store", "queen", "filament")
+EXPORTS = {
+    "tab": ROOT / "data" / "store_index_tab.json",
+    "store": ROOT / "data" / "store_index.json",
+    "queen": ROOT / "data" / "queengooborg.json",
+    "filament": ROOT / "data" / "filament.json",
+}
+CODE_KEYS = ("code", "filamentcode")
+VARIANT_KEYS = ("variantid",)
+PRODUCT_URL_KEYS = ("producturl",)
+
+
+def _first(row: Dict[str, Any], keys: Tuple[str, ...]) -> str:
+    """Value of the first matching key, compared case-insensitively (tab rows use `Code`, the store `code`)."""
+    for key, value in row.items():
+        if key.lower() in keys and isinstance(value, (str, int)):
+            return str(value).strip()
+    return ""
+
+
+def url_key(url: str) -> str:
+    """Product URL without query, fragment or trailing slash, so `?variant=` links index under their page."""
+    parsed = urlparse(url.strip())
+    return urlunparse(parsed._replace(query="", fragment="", path=parsed.path.rstrip("/")))
+
+
+def _check_source(source: str) -> str:
+    if source not in SOURCES:
+        raise ValueError(f"Unknown catalog source {source!r}; expected one of {', '.join(SOURCES)}")
+    return source
+
+
+class Catalog:
+    def __init__(self, path: Path = CATALOG_DB) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self._create_schema()
+
+    def __enter__(self) -> "Catalog":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _create_schema(self) -> None:
+        with self.conn:
+            # Stages open the catalog from several threads at once: take the write lock first, so only one of
+            # them sees an old `sources` table and adds the column (DDL does not start a transaction by itself)
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS sources (name TEXT PRIMARY KEY, rows INTEGER NOT NULL, updated REAL NOT NULL, "
+                "export_sha256 TEXT NOT NULL DEFAULT '')"
+            )
+            columns = {name for _, name, *_ in self.conn.execute("PRAGMA table_info(sources)")}
+            if "export_sha256" not in columns:  # catalogs created before exports were tracked
+                self.conn.execute("ALTER TABLE sources ADD COLUMN export_sha256 TEXT NOT NULL DEFAULT ''")
+            for source in SOURCES:
+                self.conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {source} ("
+                    "pos INTEGER PRIMARY KEY, code TEXT NOT NULL, variant_id TEXT NOT NULL, "
+                    "product_url TEXT NOT NULL, data TEXT NOT NULL)"
+                )
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS {source}_code ON {source} (code)")
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS {source}_variant_id ON {source} (variant_id)")
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS {source}_product_url ON {source} (product_url)")
+
+    # --- Writes ---
+    def replace(self, source: str, rows: Iterable[Dict[str, Any]]) -> int:
+        """Replace every row of `source` in one transaction; row order is kept."""
+        _check_source(source)
+        values = [
+            (
+                _first(row, CODE_KEYS),
+                _first(row, VARIANT_KEYS),
+                url_key(_first(row, PRODUCT_URL_KEYS)),
+                json.dumps(row, ensure_ascii=False),
+            )
+            for row in rows
+        ]
+        with self.conn:
+            self.conn.execute(f"DELETE FROM {source}")
+            self.conn.executemany(
+                f"INSERT INTO {source} (code, variant_id, product_url, data) VALUES (?, ?, ?, ?)", values
+            )
+            # keeps export_sha256: the export still holds what it held, whether or not it is rewritten next
+            self.conn.execute(
+                "INSERT INTO sources (name, rows, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET rows = excluded.rows, updated = excluded.updated",
+                (source, len(values), time.time()),
+            )
+        return len(values)
+
+    def import_file(self, source: str, path: Optional[Path] = None) -> int:
+        path = Path(path or EXPORTS[_check_source(source)])
+        count = self.replace(source, json.loads(path.read_text(encoding="utf-8")))
+        self.mark_export(source, path)
+        return count
+
+    def mark_export(self, source: str, path: Path) -> None:
+        """Remember the sha256 of `source`'s export file as matching the catalog (other paths are ignored)."""
+        if Path(path).resolve() != EXPORTS[_check_source(source)].resolve() or not Path(path).exists():
+            return
+        with self.conn:
+            self.conn.execute("UPDATE sources SET export_sha256 = ? WHERE name = ?", (file_sha256(path), source))
+
+    # --- Reads ---
+    def has(self, source: str) -> bool:
+        _check_source(source)
+        return self.conn.execute("SELECT 1 FROM sources WHERE name = ?", (source,)).fetchone() is not None
+
+    def export_sha256(self, source: str) -> str:
+        _check_source(source)
+        found = self.conn.execute("SELECT export_sha256 FROM sources WHERE name = ?", (source,)).fetchone()
+        return found[0] if found else ""
+
+    def stats(self) -> Dict[str, Tuple[int, float]]:
+        return {name: (rows, updated) for name, rows, updated in self.conn.execute("SELECT name, rows, updated FROM sources")}
+
+    def rows(self, source: str) -> List[Dict[str, Any]]:
+        _check_source(source)
+        return [json.loads(data) for (data,) in self.conn.execute(f"SELECT data FROM {source} ORDER BY pos")]
+
+    def codes(self, source: str) -> Set[str]:
+        _check_source(source)
+        return {code for (code,) in self.conn.execute(f"SELECT code FROM {source} WHERE code != ''")}
+
+    def get(self, source: str, code: str) -> Optional[Dict[str, Any]]:
+        """Row for `code`; when a source lists a code twice the later row wins, as in the dict lookups."""
+        _check_source(source)
+        found = self.conn.execute(
+            f"SELECT data FROM {source} WHERE code = ? ORDER BY pos DESC LIMIT 1", (str(code).strip(),)
+        ).fetchone()
+        return json.loads(found[0]) if found else None
+
+    def _find(self, column: str, value: str, sources: Optional[Iterable[str]]) -> List[Tuple[str, Dict[str, Any]]]:
+        found = []
+        for source in sources or SOURCES:
+            _check_source(source)
+            query = f"SELECT data FROM {source} WHERE {column} = ? ORDER BY pos"
+            found.extend((source, json.loads(data)) for (data,) in self.conn.execute(query, (value,)))
+        return found
+
+    def find_code(self, code: str, sources: Optional[Iterable[str]] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        return self._find("code", str(code).strip(), sources)
+
+    def find_variant(self, variant_id: str, sources: Optional[Iterable[str]] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        return self._find("variant_id", variant_id.strip(), sources)
+
+    def find_product_url(self, url: str, sources: Optional[Iterable[str]] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        return self._find("product_url", url_key(url), sources)
+
+    # --- Exports ---
+    def export(self, source: str, path: Optional[Path] = None, fields: Optional[List[str]] = None) -> Path:
+        """
+        Write `source` to `path` (default: its EXPORTS file). `.json` is the format the scripts always wrote;
+        `.csv`/`.tsv` get one column per key (first-seen order unless `fields` is given).
+        """
+        path = Path(path or EXPORTS[_check_source(source)])
+        rows = self.rows(source)
+        if path.suffix.lower() in (".csv", ".tsv") and not fields:
+            fields = list(dict.fromkeys(key for row in rows for key in row))
+        fan_out(rows, [sink_for(path, fields)])
+        self.mark_export(source, path)
+        return path
+
+
+def _export_changed(catalog: Catalog, source: str) -> bool:
+    """
+    True when `source`'s export file was changed outside the catalog. A file that no longer matches the recorded
+    sha256 but holds the catalog's rows (a fan_out wrote both) is just recorded. Catalogs from before the sha256
+    was kept only re-import when the export is a mirror (CATALOG_MIRROR=1); otherwise the catalog may be newer.
+    """
+    path = EXPORTS[source]
+    recorded = catalog.export_sha256(source)
+    if not path.exists() or recorded == file_sha256(path):
+        return False
+    try:
+        rows = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:  # noqa: BLE001
+        print(f"[WARN] {path} changed outside the catalog but is not valid JSON; keeping the catalog rows ({source}).")
+        return False
+    if rows != catalog.rows(source):
+        if recorded or CATALOG_MIRROR:
+            return True
+        print(f"[WARN] {path} differs from the catalog ({source}); keeping the catalog rows (CATALOG_MIRROR=0).")
+    catalog.mark_export(source, path)
+    return False
+
+
+def load_source(source: str, catalog_path: Path = CATALOG_DB) -> List[Dict[str, Any]]:
+    """
+    Rows of `source`; a source never saved to the catalog is imported from its export file first (if any), and
+    one whose export file was changed outside the catalog is imported again.
+    """
+    with Catalog(catalog_path) as catalog:
+        changed = catalog.has(source) and _export_changed(catalog, source)
+        if not catalog.has(source) or changed:
+            if not EXPORTS[source].exists():
+                return []
+            try:
+                catalog.import_file(source)
+            except Exception as exc:  # noqa: BLE001
+                raise RuntimeError(f"Failed to import {EXPORTS[source]}: {exc}") from exc
+            if changed:
+                print(f"[WARN] {EXPORTS[source]} changed outside the catalog; re-imported it ({source}).")
+            else:
+                print(f"[INFO] Imported {EXPORTS[source]} into the catalog ({source}).")
+        return catalog.rows(source)
+
+
+def save_source(
+    source: str, rows: List[Dict[str, Any]], export_path: Optional[Path] = None, catalog_path: Path = CATALOG_DB
+) -> None:
+    """Store `rows` as the new `source`, then refresh its export file unless CATALOG_MIRROR=0."""
+    with Catalog(catalog_path) as catalog:
+        catalog.replace(source, rows)
+        if CATALOG_MIRROR:
+            catalog.export(source, export_path)
+
+
+def has_source(source: str, catalog_path: Path = CATALOG_DB) -> bool:
+    with Catalog(catalog_path) as catalog:
+        return catalog.has(source)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Inspect, import and export the local SQLite catalog.")
+    parser.add_argument("--db", default=str(CATALOG_DB), help="Catalog database (default: data/catalog.sqlite3)")
+    parser.add_argument("--import", dest="import_", nargs="+", metavar=("SOURCE", "FILE"), help="Load a JSON file into a source")
+    parser.add_argument("--export", nargs="+", metavar=("SOURCE", "FILE"), help="Write a source to .json/.csv/.tsv")
+    parser.add_argument("--lookup", help="Rows with this filament code, across sources")
+    parser.add_argument("--variant", help="Rows with this variant id, across sources")
+    parser.add_argument("--url", help="Rows with this product URL (query ignored), across sources")
+    args = parser.parse_args()
+
+    with Catalog(Path(args.db)) as catalog:
+        try:
+            if args.import_:
+                count = catalog.import_file(args.import_[0], Path(args.import_[1]) if len(args.import_) > 1 else None)
+                print(f"Imported {count} rows into {args.import_[0]}.")
+            if args.export:
+                path = catalog.export(args.export[0], Path(args.export[1]) if len(args.export) > 1 else None)
+                print(f"Exported {args.export[0]} to {path}")
+        except (ValueError, OSError) as exc:
+            print(f"[ERROR] {exc}")
+            return 1
+        found = None
+        if args.lookup:
+            found = catalog.find_code(args.lookup)
+        elif args.variant:
+            found = catalog.find_variant(args.variant)
+        elif args.url:
+            found = catalog.find_product_url(args.url)
+        if found is not None:
+            for source, row in found:
+                print(f"{source}: {json.dumps(row, ensure_ascii=False)}")
+            if not found:
+                print("No matching rows.")
+        elif not (args.import_ or args.export):
+            print(f"Catalog: {catalog.path}")
+            stats = catalog.stats()
+            for source in SOURCES:
+                rows, updated = stats.get(source, (0, 0.0))
+                when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(updated)) if updated else "never saved"
+                print(f"  {source:<9}{rows:>7} rows  {when}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Chunked, compressed POSTs to the Apps Script web app (actions `uploadChunk`/`commitUpload`, see src/code.gs).
+
+A Store Index upload or patch body is serialized once, gzipped, base64-encoded and cut into chunks small enough
+for the script cache (UPLOAD_CHUNK_CHARS, default 90000 characters; CacheService values are capped at 100 KB).
+Every chunk carries the upload's session id, its sequence number, the chunk count and the sha256 of the JSON body:
+
+    {"action": "uploadChunk", "session": "<uuid hex>", "seq": 3, "total": 5, "digest": "<sha256>", "data": "..."}
+
+Chunks go out in parallel (UPLOAD_WORKERS, default 4) and each is retried on its own with jittered backoff.
+Re-sending a chunk is harmless: Apps Script keys them by (session, seq). The request that completes the set
+commits the body once under the script lock and the result is cached, so a retry after a lost reply gets the
+same answer instead of a second write. If no chunk reply reports the commit, `commitUpload` lists the missing
+sequence numbers (e.g. evicted from the cache) and only those are sent again.
+
+    python scripts/chunked_upload.py --check    # flaky local server running code.gs under the mock (needs node)
+"""
+import argparse
+import base64
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from . import http_client
+from .crawler import backoff_delay
+
+ROOT = Path(__file__).resolve().parents[1]
+MOCK_JS = ROOT / "src" / "spreadsheet_mock.js"
+CHUNK_CHARS = int(os.environ.get("UPLOAD_CHUNK_CHARS", "90000"))
+UPLOAD_WORKERS = int(os.environ.get("UPLOAD_WORKERS", "4"))
+CHUNK_RETRIES = 4
+COMMIT_ROUNDS = 3
+# The chunk that completes the set also runs the sheet write, so allow more than the default 30s read timeout
+UPLOAD_TIMEOUT = (10.0, 120.0)
+
+
+class UploadError(RuntimeError):
+    pass
+
+
+def encode(payload: Dict[str, Any]) -> Tuple[str, str, int]:
+    """(sha256 of the JSON body, base64 of its gzip, body bytes) for `payload`."""
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(body).hexdigest(), base64.b64encode(gzip.compress(body, mtime=0)).decode("ascii"), len(body)
+
+
+def split(text: str, size: int) -> List[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+
+class ChunkedUpload:
+    def __init__(self, push_url: str, payload: Dict[str, Any], chunk_chars: int = CHUNK_CHARS, workers: int = UPLOAD_WORKERS) -> None:
+        self.push_url = push_url
+        self.session = uuid.uuid4().hex
+        self.digest, text, self.body_bytes = encode(payload)
+        self.chunks = split(text, max(1, chunk_chars))
+        self.workers = max(1, workers)
+        self.retries = 0
+
+    def _post(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """POST one request, retrying transport errors and 5xx with backoff; 4xx and script errors are final."""
+        for attempt in range(CHUNK_RETRIES + 1):
+            try:
+                resp = http_client.post(self.push_url, json=body, timeout=UPLOAD_TIMEOUT)
+                if resp.status_code < 500:
+                    resp.raise_for_status()
+                    reply = resp.json()
+                    if reply.get("error"):
+                        raise UploadError(f"{body['action']} failed: {reply}")
+                    return reply
+                error = f"{resp.status_code} Server Error"
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as exc:
+                error = f"{type(exc).__name__}: {exc}"
+            if attempt == CHUNK_RETRIES:
+                raise UploadError(f"{body['action']} {body.get('seq', '')} failed after {attempt + 1} attempts: {error}")
+            self.retries += 1
+            time.sleep(backoff_delay(attempt))
+        raise AssertionError("unreachable")
+
+    def _send(self, seq: int) -> Dict[str, Any]:
+        return self._post({
+            "action": "uploadChunk",
+            "session": self.session,
+            "seq": seq,
+            "total": len(self.chunks),
+            "digest": self.digest,
+            "data": self.chunks[seq],
+        })
+
+    def _send_all(self, seqs: List[int]) -> Optional[Dict[str, Any]]:
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(seqs))) as pool:
+            replies = list(pool.map(self._send, seqs))
+        return next((reply for reply in replies if reply.get("committed")), None)
+
+    def run(self) -> Dict[str, Any]:
+        """Send every chunk and return the reply of the committed request (uploadStoreIndex/patchStoreIndex)."""
+        committed = self._send_all(list(range(len(self.chunks))))
+        for _ in range(COMMIT_ROUNDS):
+            if committed is not None:
+                return committed["result"]
+            reply = self._post({"action": "commitUpload", "session": self.session, "total": len(self.chunks), "digest": self.digest})
+            if reply.get("committed"):
+                return reply["result"]
+            missing = [int(seq) for seq in reply.get("missing", [])]
+            print(f"[WARN] Upload {self.session[:8]}: {len(missing)} chunks missing on the server; re-sending them.")
+            committed = self._send_all(missing) if missing else None
+        raise UploadError(f"Upload {self.session} was not committed after {COMMIT_ROUNDS} rounds")
+
+
+def upload(push_url: str, payload: Dict[str, Any], chunk_chars: int = CHUNK_CHARS, workers: int = UPLOAD_WORKERS) -> Dict[str, Any]:
+    """Send `payload` (an uploadStoreIndex/patchStoreIndex body) in chunks; returns that action's reply."""
+    job = ChunkedUpload(push_url, payload, chunk_chars, workers)
+    started = time.monotonic()
+    result = job.run()
+    encoded = sum(len(chunk) for chunk in job.chunks)
+    print(
+        f"[INFO] {payload.get('action')}: {job.body_bytes / 1024:.0f} KiB JSON sent as {encoded / 1024:.0f} KiB "
+        f"gzip+base64 in {len(job.chunks)} chunks ({job.retries} retries, {time.monotonic() - started:.1f}s)"
+    )
+    return result
+
+
+# --- Mock harness ---
+def check() -> int:
+    """Upload through a flaky mock server (dropped requests, lost replies) and compare with a direct upload."""
+    if not shutil.which("node"):
+        print("[ERROR] node is required for the SpreadsheetApp mock (src/spreadsheet_mock.js).")
+        return 1
+    from .store_index_patch import SHEET_NAME, diff_store_index, run_mock, sample_records
+
+    records = sample_records(400)
+    direct = run_mock([], [{"action": "uploadStoreIndex", "records": records}])["sheets"][SHEET_NAME]
+    proc = subprocess.Popen(
+        ["node", str(MOCK_JS), "--serve", "--flaky", "0.35", "--seed", "7"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    failures = 0
+    try:
+        proc.stdin.write(json.dumps({"sheets": {SHEET_NAME: []}}))
+        proc.stdin.close()
+        url = f"http://127.0.0.1:{json.loads(proc.stdout.readline())['port']}/"
+        result = upload(url, {"action": "uploadStoreIndex", "records": records}, chunk_chars=2000, workers=4)
+        state = http_client.get(url + "__state").json()
+        if not result.get("ok"):
+            print(f"FAIL: upload reply {result}")
+            failures += 1
+        if state["sheets"][SHEET_NAME] != direct:
+            print("FAIL: chunked upload left a different tab than a direct upload")
+            failures += 1
+        if state["calls"]["clearContents"] != 1:
+            print(f"FAIL: upload committed {state['calls']['clearContents']} times (expected once)")
+            failures += 1
+
+        # A patch rides the same protocol; the reply is patchStoreIndex's own
+        wanted = [dict(r) for r in records]
+        wanted[5]["color"] = "Patched color"
+        patch = diff_store_index(http_client.get(url).json(), wanted)
+        reply = upload(url, {"action": "patchStoreIndex", **patch}, chunk_chars=500, workers=4)
+        expected = run_mock([], [{"action": "uploadStoreIndex", "records": wanted}])["sheets"][SHEET_NAME]
+        if not reply.get("ok") or http_client.get(url + "__state").json()["sheets"][SHEET_NAME] != expected:
+            print(f"FAIL: chunked patch did not apply: {reply}")
+            failures += 1
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    # Out-of-order and repeated chunks, an early commit, and a corrupted body, in one mock run
+    digest, text, _ = encode({"action": "uploadStoreIndex", "records": records})
+    chunks = split(text, 3000)
+    session = uuid.uuid4().hex
+    chunk = lambda seq, data=None: {  # noqa: E731
+        "action": "uploadChunk", "session": session, "seq": seq, "total": len(chunks), "digest": digest,
+        "data": chunks[seq] if data is None else data,
+    }
+    order = list(range(len(chunks)))[::-1]
+    requests_ = [chunk(seq) for seq in order[:-1]] + [chunk(order[0])]
+    requests_ += [{"action": "commitUpload", "session": session, "total": len(chunks), "digest": digest}]
+    requests_ += [chunk(order[-1]), chunk(order[-1]), {"action": "commitUpload", "session": session, "total": len(chunks)}]
+    bad = uuid.uuid4().hex
+    requests_ += [dict(chunk(0, chunks[0][::-1]), session=bad, total=1)]
+    run = run_mock([], requests_)
+    early, final, repeat, late = run["responses"][len(chunks)], run["responses"][-4], run["responses"][-3], run["responses"][-2]
+    if early.get("committed") or early.get("missing") != [order[-1]]:
+        print(f"FAIL: incomplete session did not report its missing chunk: {early}")
+        failures += 1
+    if not (final.get("committed") and repeat.get("result") == final.get("result") == late.get("result")):
+        print(f"FAIL: repeated chunk/commit after the commit did not return the same result: {final} / {repeat} / {late}")
+        failures += 1
+    if run["calls"]["clearContents"] != 1 or run["sheets"][SHEET_NAME] != direct:
+        print("FAIL: out-of-order chunks did not commit exactly once")
+        failures += 1
+    if "error" not in run["responses"][-1]:
+        print(f"FAIL: corrupted chunk was accepted: {run['responses'][-1]}")
+        failures += 1
+    if failures:
+        return 1
+    print("OK: chunked uploads commit once and match a direct upload despite dropped requests and lost replies.")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Chunked, compressed Store Index uploads.")
+    parser.add_argument("--check", action="store_true", help="Check the protocol against a flaky SpreadsheetApp mock server")
+    parser.add_argument("--records", type=Path, help="uploadStoreIndex records JSON to send to WEB_APP_URL")
+    args = parser.parse_args()
+    if args.check:
+        return check()
+    if not args.records:
+        parser.error("--records is required unless --check is given")
+    push_url = os.environ.get("WEB_APP_URL")
+    if not push_url:
+        print("ERROR: WEB_APP_URL is not set. Populate scripts/secret.env.", file=sys.stderr)
+        return 1
+    records = json.loads(args.records.read_text(encoding="utf-8"))
+    print(json.dumps(upload(push_url, {"action": "uploadStoreIndex", "records": records})))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Helpers shared by the scripts (previously re-implemented in each of them).
+
+Importing this module loads scripts/secret.env into os.environ (existing variables win), so every script
+sees the same STORE_BASE/WEB_APP_URL whether it reads them at import time or in main().
+
+`[DEBUG]` output is printed only at LOG_LEVEL=DEBUG (env, or `--log-level DEBUG`); callers test
+`debug_enabled()` before building the message, so sorted code lists and the like cost nothing otherwise.
+"""
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse, urlunparse
+
+ROOT = Path(__file__).resolve().parents[1]
+SECRETS_ENV = ROOT / "scripts" / "secret.env"
+DEFAULT_STORE_BASE = "https://store.bambulab.com"
+ROW_FIELDS = ("code", "name", "color", "variantid", "imageurl", "producturl", "material")
+LOG_LEVELS = ("DEBUG", "INFO", "WARN", "ERROR")
+
+
+def load_local_env(env_path: Path = SECRETS_ENV) -> None:
+    """Load simple KEY=VALUE lines into os.environ if not already set."""
+    if not env_path.exists():
+        return
+    for line in env_path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        key, val = line.split("=", 1)
+        key = key.strip()
+        val = val.strip().strip('"').strip("'")
+        if key and key not in os.environ:
+            os.environ[key] = val
+
+
+load_local_env()
+STORE_BASE = os.environ.get("STORE_BASE", DEFAULT_STORE_BASE)
+_debug = os.environ.get("LOG_LEVEL", "INFO").strip().upper() == "DEBUG"
+
+
+def set_log_level(level: Optional[str]) -> None:
+    """Apply `--log-level`; None keeps LOG_LEVEL from the environment."""
+    global _debug
+    if level is not None:
+        os.environ["LOG_LEVEL"] = level.upper()
+        _debug = level.upper() == "DEBUG"
+
+
+def debug_enabled() -> bool:
+    return _debug
+
+
+def clean_code(code: Any) -> str:
+    return str(code).strip()
+
+
+def normalize_product_url(url: Optional[str], store_base: Optional[str] = None) -> str:
+    """Absolute product URL on `store_base` (default STORE_BASE); relative paths are joined onto it."""
+    if not url:
+        return ""
+    store_base = store_base or STORE_BASE
+    base = urlparse(store_base)
+    parsed = urlparse(url)
+    if not parsed.netloc:
+        return f"{store_base.rstrip('/')}/{url.lstrip('/')}"
+    return urlunparse((base.scheme or parsed.scheme or "https", base.netloc, parsed.path, parsed.params, parsed.query, parsed.fragment))
+
+
+def normalize_tab_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Tab/store row with lowercased keys, every ROW_FIELDS key present, code as text and Image flattened."""
+    out = {k.lower(): v for k, v in row.items()}
+    for field in ROW_FIELDS:
+        if field not in out:
+            out[field] = ""
+    # Always coerce code to string
+    if "code" in out:
+        out["code"] = str(out["code"]).strip()
+    # Flatten Image field from tab if present
+    if "image" in row and not out.get("imageurl"):
+        out["imageurl"] = row.get("image", "") if isinstance(row.get("image"), str) else ""
+    return out
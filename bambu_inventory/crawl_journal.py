@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Append-only crawl journal for sync_all_data.py (data/crawl_journal.jsonl).
+
+Each line is one JSON event of the current run:
+- {"event": "run", "runId": ..., "started": ...}               first line of every run
+- {"event": "stage", "stage": "tab" | "queen" | "collection" | "store" | "push" | "done", ...}
+- {"event": "page", "url": ..., "status": "ok" | "error", "variants": [...], "error": ...}
+
+Lines are flushed as they are written, so a crash, 429 storm or Ctrl-C leaves a usable record.
+`--resume` reopens the journal of an unfinished run: completed stages are skipped (their outputs are
+read back from the journal or the files they wrote) and journaled product pages are replayed instead
+of fetched again. A run that reached "done" is not resumable; the next run starts a fresh journal.
+A line torn by a crash is cut off on resume, so the resumed run's events start on a line of their own.
+
+`python scripts/crawl_journal.py --check` crashes a run mid-line and resumes it twice.
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+JOURNAL_PATH = ROOT / "data" / "crawl_journal.jsonl"
+
+
+class CrawlJournal:
+    def __init__(self, path: Path = JOURNAL_PATH) -> None:
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self.run_id = ""
+        self.resumed = False
+
+    def _read_events(self) -> List[Dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        events = []
+        for line in self.path.read_bytes().splitlines():
+            try:
+                events.append(json.loads(line))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue  # torn line from a crash (journals written before resume cut them off)
+        return events
+
+    def _cut_torn_tail(self) -> None:
+        """Drop a half-written last line so appended events start on a line of their own."""
+        data = self.path.read_bytes()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            with self.path.open("r+b") as fh:
+                fh.truncate(end)
+            print(f"[WARN] Dropped a torn last line ({len(data) - end} bytes) from {self.path.name}.")
+
+    def start(self, resume: bool = False) -> None:
+        """Resume the journaled run when asked and possible, otherwise truncate and start a new one."""
+        events = self._read_events() if resume else []
+        runs = [e for e in events if e.get("event") == "run"]
+        finished = any(e.get("event") == "stage" and e.get("stage") == "done" for e in events)
+        if resume and runs and not finished:
+            self.run_id = runs[-1].get("runId", "")
+            for event in events:
+                if event.get("event") == "stage":
+                    self.stages[event["stage"]] = event
+                elif event.get("event") == "page" and event.get("status") == "ok":
+                    self.pages[event["url"]] = event
+            self.resumed = True
+            self._cut_torn_tail()
+            print(
+                f"[INFO] Resuming run {self.run_id}: stages done {sorted(self.stages)}, {len(self.pages)} product pages journaled."
+            )
+            return
+        if resume:
+            print("[INFO] No unfinished run in the crawl journal; starting fresh.")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text("", encoding="utf-8")
+        self.run_id = uuid.uuid4().hex[:12]
+        self._append({"event": "run", "runId": self.run_id, "started": time.time()})
+
+    def _append(self, event: Dict[str, Any]) -> None:
+        with self.lock:
+            with self.path.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(event, ensure_ascii=False) + "\n")
+                fh.flush()
+
+    def stage_done(self, stage: str) -> bool:
+        return stage in self.stages
+
+    def stage(self, stage: str) -> Dict[str, Any]:
+        return self.stages.get(stage, {})
+
+    def record_stage(self, stage: str, **info: Any) -> None:
+        event = {"event": "stage", "stage": stage, "at": time.time(), **info}
+        self.stages[stage] = event
+        self._append(event)
+
+    def record_page(self, url: str, variants: Optional[List[Dict[str, str]]] = None, error: str = "") -> None:
+        event: Dict[str, Any] = {"event": "page", "url": url, "status": "error" if error else "ok"}
+        if error:
+            event["error"] = error
+        else:
+            event["variants"] = variants or []
+            with self.lock:
+                self.pages[url] = event
+        self._append(event)
+
+    def page_variants(self, url: str) -> Optional[List[Dict[str, str]]]:
+        with self.lock:
+            event = self.pages.get(url)
+        return event.get("variants", []) if event else None
+
+
+def check() -> int:
+    """Crash a run mid-line, resume it twice, and check no journaled stage or page is lost."""
+    import tempfile
+
+    failures: List[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "crawl_journal.jsonl"
+        first = CrawlJournal(path)
+        first.start()
+        first.record_stage("tab", rows=1)
+        first.record_page("u1", [{"variantid": "A"}])
+        with path.open("a", encoding="utf-8") as fh:
+            fh.write('{"event": "page", "url": "u2", "sta')  # killed mid-write
+
+        second = CrawlJournal(path)
+        second.start(resume=True)
+        second.record_stage("queen", rows=2)
+        second.record_page("u3", [{"variantid": "C"}])
+
+        third = CrawlJournal(path)
+        third.start(resume=True)
+        if not third.resumed or third.run_id != first.run_id:
+            failures.append("second resume did not continue the journaled run")
+        if sorted(third.stages) != ["queen", "tab"]:
+            failures.append(f"stages after two resumes: {sorted(third.stages)}, expected ['queen', 'tab']")
+        if sorted(third.pages) != ["u1", "u3"]:
+            failures.append(f"pages after two resumes: {sorted(third.pages)}, expected ['u1', 'u3']")
+        for number, line in enumerate(path.read_text(encoding="utf-8").splitlines(), 1):
+            try:
+                json.loads(line)
+            except json.JSONDecodeError:
+                failures.append(f"line {number} is not valid JSON: {line[:60]}")
+    for failure in failures:
+        print(f"[ERROR] {failure}")
+    if not failures:
+        print("[INFO] Torn line cut off on resume; stages and pages from both runs survive a second resume.")
+    return 1 if failures else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Inspect the crawl journal, or self-check crash/resume.")
+    parser.add_argument("--check", action="store_true", help="Crash a run mid-line and resume it twice")
+    args = parser.parse_args()
+    if args.check:
+        return check()
+    journal = CrawlJournal()
+    events = journal._read_events()
+    runs = [e for e in events if e.get("event") == "run"]
+    stages = [e["stage"] for e in events if e.get("event") == "stage"]
+    pages = sum(1 for e in events if e.get("event") == "page" and e.get("status") == "ok")
+    print(f"{journal.path}: run {runs[-1].get('runId', '?') if runs else '-'}, stages {stages}, {pages} product pages")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Concurrent, rate-limited page crawler used by sync_all_data.py for store product pages.
+
+Pages are fetched by a bounded thread pool; every request first takes a token from a per-host
+token bucket so the store sees at most `rps` requests per second regardless of `concurrency`.
+A 429 response pauses the whole host for the server's Retry-After (or an exponential fallback).
+Failed pages go back on a priority queue with jittered backoff; whatever still fails at the end of
+a run is kept in data/retry_queue.json and retried by the next crawl.
+"""
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+from urllib.parse import urlparse
+
+import requests
+
+from .http_cache import cached_get
+
+ROOT = Path(__file__).resolve().parents[1]
+RETRY_QUEUE_JSON = ROOT / "data" / "retry_queue.json"
+LEGACY_FAILED_429_JSON = ROOT / "data" / "failed_429_urls.json"
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RPS = 4.0
+DEFAULT_RETRIES = 3
+MAX_RETRY_AFTER = 120.0
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+
+
+class TokenBucket:
+    """Classic token bucket; `rate` tokens per second, bursts up to `capacity`. rate <= 0 disables limiting."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.rate <= 0:
+                    return
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1.0:
+                        self.tokens -= 1.0
+                        return
+                    wait = (1.0 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Block every caller for `seconds` (used when the host answers 429)."""
+        with self.lock:
+            now = time.monotonic()
+            self.blocked_until = max(self.blocked_until, now + seconds)
+            self.tokens = 0.0
+            self.updated = max(self.updated, self.blocked_until)
+
+
+class HostRateLimiter:
+    """One TokenBucket per host, created lazily."""
+
+    def __init__(self, rps: float) -> None:
+        self.rps = rps
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rps)
+            return self.buckets[host]
+
+    def acquire(self, url: str) -> None:
+        self.bucket(url).acquire()
+
+    def pause(self, url: str, seconds: float) -> None:
+        self.bucket(url).pause(seconds)
+
+
+def parse_retry_after(value: Optional[str], default: float) -> float:
+    """Retry-After is either delta-seconds or an HTTP date; fall back to `default` when missing/garbled."""
+    if not value:
+        return min(default, MAX_RETRY_AFTER)
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            seconds = default
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+class RetryableError(Exception):
+    """A fetch failure worth retrying later (429, 5xx, connection trouble)."""
+
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: float = 0.0) -> None:
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+def fetch_once(url: str, limiter: HostRateLimiter) -> str:
+    """Single rate-limited attempt; scheduling retries is the caller's job."""
+    limiter.acquire(url)
+    try:
+        resp = cached_get(url)
+    except requests.exceptions.RequestException as exc:
+        raise RetryableError(f"{type(exc).__name__}: {exc}") from exc
+    if resp.status_code == 429:
+        wait = parse_retry_after(resp.headers.get("Retry-After"), BACKOFF_BASE)
+        print(f"[ERROR] 429 Too Many Requests for {url} (pausing host {wait:.1f}s)")
+        limiter.pause(url, wait)
+        raise RetryableError(f"429 Too Many Requests for {url}", status=429, retry_after=wait)
+    if resp.status_code >= 500 or resp.status_code == 408:
+        raise RetryableError(f"{resp.status_code} Server Error for {url}", status=resp.status_code)
+    resp.raise_for_status()
+    return resp.text
+
+
+def backoff_delay(attempt: int, retry_after: float = 0.0) -> float:
+    """Jittered exponential backoff ("equal jitter"), never shorter than the server's Retry-After."""
+    ceiling = min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt))
+    return max(retry_after, ceiling / 2 + random.uniform(0, ceiling / 2))
+
+
+class RetryQueue:
+    """
+    URLs that were still failing when a crawl ended, persisted in data/retry_queue.json so the next
+    crawl picks them up automatically. Entries: {url: {"attempts", "notBefore", "status", "error"}}.
+    The legacy data/failed_429_urls.json list is imported the first time the queue is created.
+    """
+
+    def __init__(self, path: Path = RETRY_QUEUE_JSON, legacy_path: Path = LEGACY_FAILED_429_JSON) -> None:
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except Exception:  # noqa: BLE001
+                self.entries = {}
+        elif legacy_path.exists():
+            try:
+                legacy = json.loads(legacy_path.read_text(encoding="utf-8"))
+            except Exception:  # noqa: BLE001
+                legacy = []
+            for url in legacy:
+                self.entries[url] = {"attempts": 1, "notBefore": 0, "status": 429, "error": "imported from failed_429_urls.json"}
+
+    def urls(self) -> List[str]:
+        with self.lock:
+            return sorted(self.entries)
+
+    def get(self, url: str) -> Dict[str, Any]:
+        with self.lock:
+            return dict(self.entries.get(url, {}))
+
+    def add(self, url: str, attempts: int, not_before: float, status: Optional[int], error: str) -> None:
+        with self.lock:
+            self.entries[url] = {"attempts": attempts, "notBefore": not_before, "status": status, "error": error}
+
+    def remove(self, url: str) -> None:
+        with self.lock:
+            self.entries.pop(url, None)
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.entries)
+
+    def save(self) -> None:
+        with self.lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.entries, indent=2, sort_keys=True), encoding="utf-8")
+            tmp.replace(self.path)
+
+
+@dataclass
+class CrawlResult:
+    url: str
+    html: str = ""
+    error: Optional[Exception] = None
+    attempts: int = 1
+
+    @property
+    def rate_limited(self) -> bool:
+        return getattr(self.error, "status", None) == 429
+
+
+@dataclass
+class _Job:
+    url: str
+    attempt: int  # 0 = first try; also the job's priority (lower runs first)
+    ready_at: float
+    seq: int
+
+
+def crawl(
+    urls: Iterable[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rps: float = DEFAULT_RPS,
+    retries: int = DEFAULT_RETRIES,
+    on_result: Optional[Callable[[CrawlResult], None]] = None,
+    retry_queue: Optional[RetryQueue] = None,
+    seed_hosts: Optional[Set[str]] = None,
+    stop: Optional[threading.Event] = None,
+) -> List[CrawlResult]:
+    """
+    Fetch every URL concurrently through a priority scheduler; results come back in input order
+    (URLs seeded from `retry_queue` follow), failures carry their exception.
+
+    Fresh URLs run first. A retryable failure is re-enqueued at lower priority after a jittered
+    exponential backoff, up to `retries` times per run, and a successful retry flows into
+    `on_result` like any other page. `on_result` runs on the worker thread as soon as each page
+    finishes (e.g. to parse and journal it). With a `retry_queue`, its URLs are crawled too
+    (only those on `seed_hosts` when given), recovered ones are dropped from it and the ones
+    still failing are saved for the next run. Once `stop` is set, no new page is started and the
+    retry queue is not saved (the caller has given up on this crawl).
+    """
+    url_list = list(dict.fromkeys(urls))
+    if retry_queue is not None:
+        seen = set(url_list)
+        url_list += [
+            u for u in retry_queue.urls() if u not in seen and (seed_hosts is None or urlparse(u).netloc in seed_hosts)
+        ]
+    if not url_list:
+        return []
+    limiter = HostRateLimiter(rps)
+    cond = threading.Condition()
+    now = time.monotonic()
+    jobs: List[_Job] = []
+    for seq, url in enumerate(url_list):
+        queued = retry_queue.get(url) if retry_queue is not None else {}
+        # Persisted failures run after fresh work and respect whatever backoff is left on them.
+        wait = min(max(queued.get("notBefore", 0) - time.time(), 0.0), BACKOFF_CAP) if queued else 0.0
+        jobs.append(_Job(url=url, attempt=1 if queued else 0, ready_at=now + wait, seq=seq))
+    results: Dict[str, CrawlResult] = {}
+    state = {"inflight": 0, "seq": len(jobs)}
+
+    def next_job() -> Optional[_Job]:
+        with cond:
+            while True:
+                if stop is not None and stop.is_set():
+                    return None
+                if not jobs:
+                    if state["inflight"] == 0:
+                        return None
+                    cond.wait()
+                    continue
+                current = time.monotonic()
+                ready = [j for j in jobs if j.ready_at <= current]
+                if ready:
+                    job = min(ready, key=lambda j: (j.attempt, j.seq))
+                    jobs.remove(job)
+                    state["inflight"] += 1
+                    return job
+                cond.wait(min(j.ready_at for j in jobs) - current)
+
+    def finish(job: _Job, result: Optional[CrawlResult], retry_in: float = 0.0) -> None:
+        with cond:
+            if result is None:
+                state["seq"] += 1
+                jobs.append(_Job(url=job.url, attempt=job.attempt + 1, ready_at=time.monotonic() + retry_in, seq=state["seq"]))
+            else:
+                results[job.url] = result
+            state["inflight"] -= 1
+            cond.notify_all()
+
+    def worker() -> None:
+        while True:
+            job = next_job()
+            if job is None:
+                return
+            try:
+                html = fetch_once(job.url, limiter)
+            except RetryableError as exc:
+                if job.attempt < retries:
+                    delay = backoff_delay(job.attempt, exc.retry_after)
+                    print(f"[WARN] Re-queueing {job.url} (attempt {job.attempt + 1}/{retries + 1}) in {delay:.1f}s: {exc}")
+                    finish(job, None, delay)
+                    continue
+                result = CrawlResult(url=job.url, error=exc, attempts=job.attempt + 1)
+                if retry_queue is not None:
+                    prev = retry_queue.get(job.url).get("attempts", 0)
+                    not_before = time.time() + backoff_delay(job.attempt, exc.retry_after)
+                    retry_queue.add(job.url, prev + job.attempt + 1, not_before, exc.status, str(exc))
+            except Exception as exc:  # noqa: BLE001
+                result = CrawlResult(url=job.url, error=exc, attempts=job.attempt + 1)
+                if retry_queue is not None:
+                    retry_queue.remove(job.url)  # permanent failure (404 etc.); retrying will not help
+            else:
+                result = CrawlResult(url=job.url, html=html, attempts=job.attempt + 1)
+                if retry_queue is not None:
+                    retry_queue.remove(job.url)
+            try:
+                if on_result is not None:
+                    on_result(result)
+            finally:
+                finish(job, result)
+
+    workers = max(1, min(concurrency, len(url_list)))
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(worker) for _ in range(workers)]
+        for future in futures:
+            future.result()  # surface exceptions raised by on_result
+    finally:
+        if retry_queue is not None and not (stop is not None and stop.is_set()):
+            retry_queue.save()
+    return [results[url] for url in url_list if url in results]
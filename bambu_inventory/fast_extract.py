@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Streaming extractors for store pages that skip BeautifulSoup tree building.
+
+The store parsers only need `<a href>` values (collection page) and the text of one `<script>` blob
+(product page). Both are pulled straight from the stdlib HTMLParser tokenizer, so no DOM is built,
+and script extraction is fed in chunks so it can stop as soon as the caller has what it needs.
+Output matches `soup.find_all("a", href=True)` / `script.string` on the html.parser builder.
+"""
+from html.parser import HTMLParser
+from typing import Iterator, List, Optional
+
+CHUNK_SIZE = 64 * 1024
+
+
+class _HrefCollector(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.hrefs: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        if tag != "a":
+            return
+        href = None
+        for name, value in attrs:
+            if name == "href":
+                href = value or ""  # later duplicates win, as in bs4
+        if href is not None:
+            self.hrefs.append(href)
+
+    handle_startendtag = handle_starttag
+
+
+class _ScriptCollector(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.done: List[str] = []
+        self._parts: Optional[List[str]] = None
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        if tag == "script":
+            self._parts = []
+
+    def handle_data(self, data: str) -> None:
+        if self._parts is not None:
+            self._parts.append(data)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "script" and self._parts is not None:
+            self.done.append("".join(self._parts))
+            self._parts = None
+
+    def close(self) -> None:
+        super().close()
+        if self._parts is not None:
+            self.done.append("".join(self._parts))
+            self._parts = None
+
+
+def extract_hrefs(html: str) -> List[str]:
+    """href of every <a> that has one, in document order."""
+    parser = _HrefCollector()
+    parser.feed(html)
+    parser.close()
+    return parser.hrefs
+
+
+def iter_scripts(html: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Yield the text of each <script> element as soon as its end tag is tokenized."""
+    parser = _ScriptCollector()
+    for start in range(0, len(html), chunk_size):
+        parser.feed(html[start : start + chunk_size])
+        while parser.done:
+            yield parser.done.pop(0)
+    parser.close()
+    while parser.done:
+        yield parser.done.pop(0)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Download the latest README.md from queengooborg/Bambu-Lab-RFID-Library, parse filament table, and save as queengooborg.json.
+Then use this to supplement store_index.json generation.
+
+The README body is hashed (sha256, kept in data/queengooborg.meta.json); when it has not changed since the last
+parse, the table is not parsed again and the catalog's queen source (catalog_db.py, exported to queengooborg.json)
+is left untouched.
+"""
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .catalog_db import has_source, save_source
+from .http_cache import cached_get
+
+ROOT = Path(__file__).resolve().parents[1]
+README_URL = "https://raw.githubusercontent.com/queengooborg/Bambu-Lab-RFID-Library/main/README.md"
+OUT_JSON = ROOT / "data" / "queengooborg.json"
+META_JSON = ROOT / "data" / "queengooborg.meta.json"
+
+
+def fetch_readme(url=README_URL):
+    resp = cached_get(url)
+    resp.raise_for_status()
+    return resp.text
+
+
+def readme_sha256(readme_text: str) -> str:
+    return hashlib.sha256(readme_text.encode("utf-8")).hexdigest()
+
+
+def parse_table(readme_text: str) -> List[Dict[str, str]]:
+    """Rows of every `| Color | Filament Code | Variant ID |` table, tagged with the `####` heading above it."""
+    lines = readme_text.splitlines()
+    materials: List[Dict[str, str]] = []
+    current_category = ""
+    in_table = False
+    for line in lines:
+        if line.startswith("#### "):
+            current_category = line[5:].strip()
+        if re.match(r"\|\s*Color\s*\|\s*Filament Code\s*\|\s*Variant ID\s*\|", line):
+            in_table = True
+            continue
+        if in_table and re.match(r"\|\s*-+\s*\|", line):
+            continue
+        if in_table and line.strip().startswith("|"):
+            parts = [p.strip() for p in line.strip("|").split("|")]
+            if len(parts) >= 4 and parts[1].isdigit():
+                materials.append(
+                    {
+                        "color": parts[0],
+                        "filamentCode": parts[1],
+                        "variantId": parts[2] if parts[2] and parts[2] != "?" else "",
+                        "category": current_category,
+                    }
+                )
+            continue
+        if in_table and not line.strip().startswith("|"):
+            in_table = False
+    return materials
+
+
+def stored_sha256(meta_json: Path = META_JSON) -> str:
+    try:
+        return json.loads(meta_json.read_text(encoding="utf-8")).get("sha256", "")
+    except Exception:  # noqa: BLE001
+        return ""
+
+
+def parse_changed_readme(readme_text: str, meta_json: Path = META_JSON) -> Optional[List[Dict[str, str]]]:
+    """The README's table rows, or None when it has the hash of the last saved parse. Writes nothing."""
+    if has_source("queen") and stored_sha256(meta_json) == readme_sha256(readme_text):
+        return None
+    return parse_table(readme_text)
+
+
+def save_queen_json(
+    materials: List[Dict[str, str]], digest: str, out_json: Path = OUT_JSON, meta_json: Path = META_JSON
+) -> None:
+    """Save parsed rows as the catalog's queen source (exported to `out_json`) and record the README hash."""
+    save_source("queen", materials, out_json)
+    meta_json.write_text(json.dumps({"sha256": digest, "records": len(materials)}, indent=2), encoding="utf-8")
+
+
+def update_queen_json(
+    readme_text: str, out_json: Path = OUT_JSON, meta_json: Path = META_JSON
+) -> Optional[List[Dict[str, str]]]:
+    """
+    Parse the README into the catalog's queen source (exported to `out_json`); returns None (nothing parsed or
+    written) when the hash is unchanged.
+    """
+    materials = parse_changed_readme(readme_text, meta_json)
+    if materials is not None:
+        save_queen_json(materials, readme_sha256(readme_text), out_json, meta_json)
+    return materials
+
+
+def main():
+    readme_text = fetch_readme()
+    materials = update_queen_json(readme_text)
+    if materials is None:
+        print(f"README unchanged (sha256 {readme_sha256(readme_text)[:12]}); kept the catalog's queen rows")
+        return
+    print(f"Saved {len(materials)} entries to the catalog ({OUT_JSON})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Fetches the latest data from the Google Sheet 'store index' tab via Apps Script Web App and saves it as the catalog's tab source
+(catalog_db.py; exported to store_index_tab.json).
+Relies on WEB_APP_URL in scripts/secret.env.
+"""
+import os
+import sys
+from pathlib import Path
+
+from . import http_client
+from .catalog_db import save_source
+from .common import SECRETS_ENV, debug_enabled, load_local_env
+
+ROOT = Path(__file__).resolve().parents[1]
+OUTPUT_PATH = ROOT / "data" / "store_index_tab.json"
+
+def main() -> int:
+    load_local_env(SECRETS_ENV)
+    fetch_url = os.environ.get("WEB_APP_URL")
+    if not fetch_url:
+        print("ERROR: WEB_APP_URL is not set. Populate scripts/secret.env.", file=sys.stderr)
+        return 1
+
+    params = {"action": "fetchStoreIndex"}
+    if debug_enabled():
+        print(f"[DEBUG] Requesting {fetch_url} with params {params}")
+    try:
+        resp = http_client.get(fetch_url, params=params)
+        if debug_enabled():
+            print(f"[DEBUG] Response status: {resp.status_code}")
+            print(f"[DEBUG] Response text: {resp.text[:200]}")
+        resp.raise_for_status()
+        json_data = resp.json()
+    except Exception as exc:
+        status = getattr(resp, "status_code", "?") if 'resp' in locals() else "?"
+        text = getattr(resp, "text", "") if 'resp' in locals() else ""
+        print(f"ERROR: fetch failed (status {status}): {exc}\n{text}", file=sys.stderr)
+        return 1
+
+    save_source("tab", json_data, OUTPUT_PATH)
+
+    print(f"Fetched {len(json_data)} rows from Store Index and saved them to the catalog ({OUTPUT_PATH})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+On-disk HTTP response cache with conditional revalidation (ETag / Last-Modified).
+
+Bodies live in data/http_cache/bodies/<sha1(url)>, validators and bookkeeping in data/http_cache/index.json.
+`cached_get` sends If-None-Match / If-Modified-Since for known URLs and serves the stored body on 304,
+so unchanged store pages and READMEs cost a header round-trip instead of a full download.
+
+Environment knobs (also settable from sync_all_data.py flags):
+- HTTP_CACHE_DISABLE=1   bypass the cache entirely
+- HTTP_CACHE_TTL=<sec>   serve entries younger than this without any request (default 0: always revalidate)
+- HTTP_CACHE_MAX_AGE=<sec>  evict entries not used for this long (default 30 days)
+- HTTP_CACHE_MAX_MB=<mb>    evict least-recently-used bodies above this size (default 200)
+
+Run `python scripts/http_cache.py --stats|--evict|--clear` to inspect or prune the cache.
+
+index.json is written every SAVE_EVERY index updates, on evict/clear and at exit (`flush`), not per request: a
+crash loses at most that many index updates, and their bodies are cleaned up by the next evict.
+"""
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from . import http_client
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = ROOT / "data" / "http_cache"
+DEFAULT_TTL = 0.0
+DEFAULT_MAX_AGE = 30 * 24 * 3600.0
+DEFAULT_MAX_MB = 200.0
+SAVE_EVERY = 50
+
+
+class HttpCache:
+    def __init__(
+        self,
+        root: Path = CACHE_DIR,
+        ttl: float = DEFAULT_TTL,
+        max_age: float = DEFAULT_MAX_AGE,
+        max_bytes: int = int(DEFAULT_MAX_MB * 1024 * 1024),
+    ) -> None:
+        self.root = Path(root)
+        self.bodies = self.root / "bodies"
+        self.index_path = self.root / "index.json"
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.index: Dict[str, Dict[str, Any]] = self._load_index()
+        self.unsaved = 0
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        if not self.index_path.exists():
+            return {}
+        try:
+            return json.loads(self.index_path.read_text(encoding="utf-8"))
+        except Exception:  # noqa: BLE001
+            return {}
+
+    def _save_index(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.index, sort_keys=True, separators=(",", ":")), encoding="utf-8")
+        tmp.replace(self.index_path)
+        self.unsaved = 0
+
+    def _changed(self) -> None:
+        """Count an index update (lock held); the index is written every SAVE_EVERY of them."""
+        self.unsaved += 1
+        if self.unsaved >= SAVE_EVERY:
+            self._save_index()
+
+    def flush(self) -> None:
+        """Write index.json if it has unsaved updates."""
+        with self.lock:
+            if self.unsaved:
+                self._save_index()
+
+    def count(self, outcome: str) -> None:
+        """Bump the hits / revalidated / misses counter; called from crawler threads."""
+        with self.lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def entry(self, url: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            entry = self.index.get(url)
+            if entry and not (self.bodies / entry["key"]).exists():
+                self.index.pop(url, None)
+                return None
+            return dict(entry) if entry else None
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return self.ttl > 0 and time.time() - entry.get("fetchedAt", 0) < self.ttl
+
+    def validators(self, entry: Dict[str, Any]) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("lastModified"):
+            headers["If-Modified-Since"] = entry["lastModified"]
+        return headers
+
+    def body(self, entry: Dict[str, Any]) -> bytes:
+        return (self.bodies / entry["key"]).read_bytes()
+
+    def store(self, url: str, resp: requests.Response) -> None:
+        etag = resp.headers.get("ETag", "")
+        last_modified = resp.headers.get("Last-Modified", "")
+        key = self.key(url)
+        now = time.time()
+        with self.lock:
+            self.bodies.mkdir(parents=True, exist_ok=True)
+            tmp = self.bodies / f"{key}.tmp"
+            tmp.write_bytes(resp.content)
+            tmp.replace(self.bodies / key)
+            self.index[url] = {
+                "key": key,
+                "etag": etag,
+                "lastModified": last_modified,
+                "contentType": resp.headers.get("Content-Type", ""),
+                "encoding": resp.encoding or "",
+                "size": len(resp.content),
+                "fetchedAt": now,
+                "usedAt": now,
+            }
+            self._changed()
+
+    def touch(self, url: str, resp: Optional[requests.Response] = None) -> None:
+        """Mark an entry as revalidated (304) or served; refresh validators the server re-sent."""
+        with self.lock:
+            entry = self.index.get(url)
+            if not entry:
+                return
+            now = time.time()
+            entry["usedAt"] = now
+            if resp is not None:
+                entry["fetchedAt"] = now
+                if resp.headers.get("ETag"):
+                    entry["etag"] = resp.headers["ETag"]
+                if resp.headers.get("Last-Modified"):
+                    entry["lastModified"] = resp.headers["Last-Modified"]
+            self._changed()
+
+    def evict(self) -> int:
+        """Drop entries unused for max_age, then least-recently-used ones until under max_bytes."""
+        removed = 0
+        with self.lock:
+            now = time.time()
+            for url, entry in list(self.index.items()):
+                if self.max_age > 0 and now - entry.get("usedAt", 0) > self.max_age:
+                    self._drop(url)
+                    removed += 1
+            total = sum(e.get("size", 0) for e in self.index.values())
+            if self.max_bytes > 0 and total > self.max_bytes:
+                for url, entry in sorted(self.index.items(), key=lambda kv: kv[1].get("usedAt", 0)):
+                    if total <= self.max_bytes:
+                        break
+                    total -= entry.get("size", 0)
+                    self._drop(url)
+                    removed += 1
+            if self.bodies.exists():
+                live = {e["key"] for e in self.index.values()}
+                for path in self.bodies.iterdir():
+                    if path.name not in live:
+                        path.unlink()
+            self._save_index()
+        return removed
+
+    def _drop(self, url: str) -> None:
+        entry = self.index.pop(url, None)
+        if entry:
+            (self.bodies / entry["key"]).unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        with self.lock:
+            for url in list(self.index):
+                self._drop(url)
+            self._save_index()
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "entries": len(self.index),
+                "bytes": sum(e.get("size", 0) for e in self.index.values()),
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+            }
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+_default_cache: Optional[HttpCache] = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> Optional[HttpCache]:
+    """Process-wide cache configured from the environment; None when HTTP_CACHE_DISABLE is set."""
+    global _default_cache
+    if os.environ.get("HTTP_CACHE_DISABLE", "").strip() not in ("", "0"):
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = HttpCache(
+                ttl=_env_float("HTTP_CACHE_TTL", DEFAULT_TTL),
+                max_age=_env_float("HTTP_CACHE_MAX_AGE", DEFAULT_MAX_AGE),
+                max_bytes=int(_env_float("HTTP_CACHE_MAX_MB", DEFAULT_MAX_MB) * 1024 * 1024),
+            )
+            _default_cache.evict()
+            atexit.register(_default_cache.flush)
+        return _default_cache
+
+
+def default_stats() -> Optional[Dict[str, Any]]:
+    """Counters of the process-wide cache if one was used, without creating (and evicting) it."""
+    with _default_lock:
+        return _default_cache.stats() if _default_cache is not None else None
+
+
+def configure(ttl: Optional[float] = None, disable: bool = False) -> None:
+    """Apply CLI overrides before the first request; they flow through the same env knobs."""
+    if disable:
+        os.environ["HTTP_CACHE_DISABLE"] = "1"
+    if ttl is not None:
+        os.environ["HTTP_CACHE_TTL"] = str(ttl)
+        if _default_cache is not None:
+            _default_cache.ttl = ttl
+
+
+def _cached_response(url: str, entry: Dict[str, Any], body: bytes) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.url = url
+    resp._content = body
+    resp.encoding = entry.get("encoding") or None
+    resp.headers = CaseInsensitiveDict(
+        {k: v for k, v in (("ETag", entry.get("etag")), ("Last-Modified", entry.get("lastModified")), ("Content-Type", entry.get("contentType"))) if v}
+    )
+    resp.from_cache = True  # type: ignore[attr-defined]
+    return resp
+
+
+def cached_get(url: str, cache: Optional[HttpCache] = None, **kwargs: Any) -> requests.Response:
+    """http_client.get with conditional revalidation; the returned response has `from_cache` set when served locally."""
+    cache = cache if cache is not None else default_cache()
+    if cache is None or kwargs.get("params"):
+        return http_client.get(url, **kwargs)
+    entry = cache.entry(url)
+    if entry and cache.is_fresh(entry):
+        cache.count("hits")
+        cache.touch(url)
+        return _cached_response(url, entry, cache.body(entry))
+    headers = dict(kwargs.pop("headers", None) or {})
+    if entry:
+        headers.update(cache.validators(entry))
+    resp = http_client.get(url, headers=headers, **kwargs)
+    if resp.status_code == 304 and entry:
+        cache.count("revalidated")
+        cache.touch(url, resp)
+        return _cached_response(url, entry, cache.body(entry))
+    cache.count("misses")
+    if resp.status_code == 200 and (resp.headers.get("ETag") or resp.headers.get("Last-Modified") or cache.ttl > 0):
+        cache.store(url, resp)
+    resp.from_cache = False  # type: ignore[attr-defined]
+    return resp
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Inspect or prune the on-disk HTTP cache (data/http_cache).")
+    parser.add_argument("--stats", action="store_true", help="Print entry count and total size")
+    parser.add_argument("--evict", action="store_true", help="Apply HTTP_CACHE_MAX_AGE / HTTP_CACHE_MAX_MB limits now")
+    parser.add_argument("--clear", action="store_true", help="Delete every cached response")
+    args = parser.parse_args()
+
+    cache = HttpCache(
+        max_age=_env_float("HTTP_CACHE_MAX_AGE", DEFAULT_MAX_AGE),
+        max_bytes=int(_env_float("HTTP_CACHE_MAX_MB", DEFAULT_MAX_MB) * 1024 * 1024),
+    )
+    if args.clear:
+        cache.clear()
+        print(f"Cleared {cache.root}")
+    if args.evict:
+        print(f"Evicted {cache.evict()} entries")
+    if args.stats or not (args.clear or args.evict):
+        stats = cache.stats()
+        print(f"{stats['entries']} entries, {stats['bytes'] / 1024:.1f} KiB in {cache.root}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
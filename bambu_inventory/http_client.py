@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP client for all scripts: one pooled, keep-alive requests.Session per process.
+
+- Connection pools sized for the concurrent crawler (HTTP_POOL_SIZE, default 16 per host).
+- Uniform (connect, read) timeout and User-Agent.
+- Connection and read errors are retried by urllib3 with backoff. HTTP statuses (5xx, 429) are not: the
+  callers retry those themselves (crawler.py re-enqueues through its per-host rate limit and pauses the host
+  on Retry-After, chunked_upload.py retries its chunks), so a failing page is not retried on two layers.
+- Timing hooks: every response is reported to registered callbacks and summed in `request_stats()`.
+- HTTP_RECORD / HTTP_REPLAY swap the transport for http_fixtures.py's recording or replaying adapter.
+"""
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import http_fixtures
+DEFAULT_TIMEOUT = (10.0, 30.0)
+USER_AGENT = "Mozilla/5.0 (compatible; bambu-inventory-sync)"
+POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", "16"))
+
+# callback(method, url, status_code, elapsed_seconds, body_bytes)
+TimingHook = Callable[[str, str, int, float, int], None]
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_hooks: List[TimingHook] = []
+_stats_lock = threading.Lock()
+_stats: Dict[str, float] = {"requests": 0, "bytes": 0, "seconds": 0.0}
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    retry = Retry(
+        total=2,
+        connect=2,
+        read=2,
+        status=0,  # transport-level retries only; status-based retries belong to the callers
+        backoff_factor=0.5,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False,
+        respect_retry_after_header=False,  # keeps urllib3 from sleeping on 429 itself
+    )
+    pool = {"pool_connections": 8, "pool_maxsize": POOL_SIZE, "max_retries": retry}
+    adapter = http_fixtures.adapter_from_env(**pool) or HTTPAdapter(**pool)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    session.hooks["response"].append(_on_response)
+    return session
+
+
+def session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = _build_session()
+        return _session
+
+
+def add_timing_hook(hook: TimingHook) -> None:
+    _hooks.append(hook)
+
+
+def _on_response(resp: requests.Response, *args: Any, **kwargs: Any) -> None:
+    elapsed = resp.elapsed.total_seconds() if resp.elapsed else 0.0
+    size = int(resp.headers.get("Content-Length") or 0) or len(resp.content)
+    with _stats_lock:
+        _stats["requests"] += 1
+        _stats["bytes"] += size
+        _stats["seconds"] += elapsed
+    for hook in list(_hooks):
+        hook(resp.request.method or "", resp.url, resp.status_code, elapsed, size)
+
+
+def request_stats() -> Dict[str, float]:
+    with _stats_lock:
+        return dict(_stats)
+
+
+def request(method: str, url: str, **kwargs: Any) -> requests.Response:
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    return session().request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs: Any) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs: Any) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def log_timing(method: str, url: str, status: int, elapsed: float, size: int) -> None:
+    """Ready-made hook for verbose runs: one line per request."""
+    print(f"[HTTP] {method} {status} {elapsed * 1000:.0f}ms {size}B {url}")
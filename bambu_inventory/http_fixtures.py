@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Record/replay HTTP fixtures for offline syncs and benchmarks.
+
+Every script talks HTTP through the shared session in http_client.py, so both modes are a transport adapter
+mounted on that session; the scripts themselves do not change.
+
+- Record (HTTP_RECORD=<bundle>, or `--record <bundle>` on sync/scrape/preview): real requests go out as usual
+  and each final response (after urllib3's retries) is archived with its request into a gzipped JSON-lines bundle,
+  written when the process exits. Child processes inherit the setting and add to the same bundle.
+- Replay (HTTP_REPLAY=<bundle>, `--replay <bundle>`): nothing touches the network. A request is answered with
+  the recorded response for the same method, URL and body; requests whose body changes every run (chunked
+  upload sessions) get the recorded responses for that method and URL in order. A request missing from the
+  bundle fails like an unreachable host (ConnectionError), so the pipeline's offline fallbacks are exercised.
+- Simulated latency (HTTP_REPLAY_LATENCY, `--replay-latency`): `recorded` sleeps each response's recorded
+  time, a number sleeps that many milliseconds per request, 0 (default) replays as fast as possible.
+
+Both modes turn the on-disk HTTP cache off, so a bundle holds full bodies and a replay does not depend on
+what data/http_cache/ happened to contain when it was recorded.
+
+    python scripts/sync_all_data.py --record data/fixtures/http/sync.jsonl.gz
+    python scripts/sync_all_data.py --replay data/fixtures/http/sync.jsonl.gz --replay-latency recorded
+    python scripts/http_fixtures.py data/fixtures/http/sync.jsonl.gz     # list a bundle
+    python scripts/http_fixtures.py --check                              # record + replay a local server
+"""
+import argparse
+import atexit
+import base64
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Headers describing the wire encoding; bodies are stored decoded
+DROPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive")
+
+
+def body_sha256(body: Any) -> str:
+    if body is None:
+        return ""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    return hashlib.sha256(body).hexdigest()
+
+
+def load_bundle(path: Path) -> List[Dict[str, Any]]:
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def save_bundle(path: Path, entries: List[Dict[str, Any]]) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    # mtime=0 keeps the gzip header free of timestamps, so recording the same responses gives the same bytes
+    with open(tmp, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as fh:
+        for entry in entries:
+            fh.write((json.dumps(entry, ensure_ascii=False, sort_keys=True) + "\n").encode("utf-8"))
+    tmp.replace(path)
+
+
+class RecordingAdapter(HTTPAdapter):
+    """HTTPAdapter that archives every final response; `save()` writes the bundle (registered atexit)."""
+
+    def __init__(self, path: Path, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.path = Path(path)
+        self.entries: List[Dict[str, Any]] = []
+        self.saved = 0
+        self.started = time.time()
+        self.lock = threading.Lock()
+        atexit.register(self.save)
+
+    def send(self, request: requests.PreparedRequest, *args: Any, **kwargs: Any) -> requests.Response:
+        resp = super().send(request, *args, **kwargs)
+        content = resp.content  # reads the whole body; it stays available to the caller
+        entry = {
+            "method": request.method or "GET",
+            "url": request.url or "",
+            "body": body_sha256(request.body),
+            "status": resp.status_code,
+            "reason": resp.reason or "",
+            "headers": {k: v for k, v in resp.headers.items() if k.lower() not in DROPPED_HEADERS},
+            "content": base64.b64encode(content).decode("ascii"),
+            "elapsed": round(resp.elapsed.total_seconds(), 4) if resp.elapsed else 0.0,
+        }
+        with self.lock:
+            self.entries.append(entry)
+        return resp
+
+    def save(self) -> None:
+        """Write the bundle, keeping responses a child process recorded into the same file during this run."""
+        with self.lock:
+            if len(self.entries) == self.saved:
+                return
+            existing = load_bundle(self.path) if self.path.exists() and self.path.stat().st_mtime >= self.started else []
+            foreign = existing[: len(existing) - self.saved]
+            save_bundle(self.path, foreign + self.entries)
+            self.saved = len(self.entries)
+            print(f"[INFO] Recorded {len(self.entries)} HTTP responses to {self.path}")
+
+
+class ReplayAdapter(BaseAdapter):
+    """Serves responses from a bundle; `latency` is seconds per request or "recorded"."""
+
+    def __init__(self, path: Path, latency: Any = 0.0) -> None:
+        super().__init__()
+        self.path = Path(path)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.exact: Dict[Tuple[str, str, str], Deque[Dict[str, Any]]] = defaultdict(deque)
+        self.by_url: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = defaultdict(deque)
+        for entry in load_bundle(self.path):
+            self.exact[(entry["method"], entry["url"], entry["body"])].append(entry)
+            self.by_url[(entry["method"], entry["url"])].append(entry)
+        self.served = 0
+        self.missing = 0
+
+    def _take(self, method: str, url: str, body: str) -> Optional[Dict[str, Any]]:
+        """Recorded response for the request. Repeated requests walk through the recorded ones and then keep the last."""
+        with self.lock:
+            for queue_, key in ((self.exact, (method, url, body)), (self.by_url, (method, url))):
+                entries = queue_.get(key)
+                if entries:
+                    return entries.popleft() if len(entries) > 1 else entries[0]
+            return None
+
+    def send(self, request: requests.PreparedRequest, *args: Any, **kwargs: Any) -> requests.Response:
+        method, url = request.method or "GET", request.url or ""
+        entry = self._take(method, url, body_sha256(request.body))
+        if entry is None:
+            with self.lock:
+                self.missing += 1
+            raise requests.exceptions.ConnectionError(f"{method} {url} is not in fixture bundle {self.path.name}", request=request)
+        delay = entry.get("elapsed", 0.0) if self.latency == "recorded" else float(self.latency)
+        if delay > 0:
+            time.sleep(delay)
+        with self.lock:
+            self.served += 1
+        return self.build_response(request, entry, delay)
+
+    @staticmethod
+    def build_response(request: requests.PreparedRequest, entry: Dict[str, Any], delay: float) -> requests.Response:
+        resp = requests.Response()
+        resp.status_code = entry["status"]
+        resp.reason = entry.get("reason", "")
+        resp.headers = CaseInsensitiveDict(entry.get("headers", {}))
+        resp._content = base64.b64decode(entry.get("content", ""))
+        resp.encoding = get_encoding_from_headers(resp.headers)
+        resp.url = request.url or entry["url"]
+        resp.request = request
+        resp.elapsed = datetime.timedelta(seconds=delay)
+        return resp
+
+    def close(self) -> None:
+        pass
+
+
+def parse_latency(value: Any) -> Any:
+    """"recorded" or seconds from a millisecond value ("", None and 0 mean no delay)."""
+    if isinstance(value, str) and value.strip().lower() == "recorded":
+        return "recorded"
+    try:
+        return max(0.0, float(value or 0)) / 1000.0
+    except ValueError:
+        raise SystemExit(f"Replay latency must be milliseconds or 'recorded', got {value!r}")
+
+
+def adapter_from_env(**kwargs: Any) -> Optional[BaseAdapter]:
+    """The adapter HTTP_RECORD / HTTP_REPLAY ask for, or None for live traffic; kwargs go to the recording HTTPAdapter."""
+    replay = os.environ.get("HTTP_REPLAY", "").strip()
+    record = os.environ.get("HTTP_RECORD", "").strip()
+    if replay and record:
+        raise SystemExit("HTTP_RECORD and HTTP_REPLAY are exclusive")
+    if replay:
+        adapter = ReplayAdapter(Path(replay), parse_latency(os.environ.get("HTTP_REPLAY_LATENCY", "0")))
+        print(f"[INFO] Replaying HTTP from {replay} ({sum(len(q) for q in adapter.by_url.values())} responses).")
+        return adapter
+    if record:
+        print(f"[INFO] Recording HTTP to {record}.")
+        return RecordingAdapter(Path(record), **kwargs)
+    return None
+
+
+def configure(record: Optional[str] = None, replay: Optional[str] = None, latency: Optional[str] = None) -> None:
+    """Apply CLI flags before the first request; like http_cache.configure they set the env knobs."""
+    if record:
+        os.environ["HTTP_RECORD"] = record
+    if replay:
+        os.environ["HTTP_REPLAY"] = replay
+    if latency is not None:
+        os.environ["HTTP_REPLAY_LATENCY"] = latency
+    if os.environ.get("HTTP_RECORD") or os.environ.get("HTTP_REPLAY"):
+        os.environ["HTTP_CACHE_DISABLE"] = "1"
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--record", default=None, metavar="BUNDLE", help="Archive every HTTP response into a gzipped fixture bundle")
+    parser.add_argument("--replay", default=None, metavar="BUNDLE", help="Serve HTTP from a fixture bundle; no network access")
+    parser.add_argument(
+        "--replay-latency",
+        default=None,
+        metavar="MS|recorded",
+        help="Simulated latency per replayed request: milliseconds, or 'recorded' for the recorded times (default 0)",
+    )
+
+
+def check() -> int:
+    """Record a local server, stop it, and replay the same requests offline."""
+    import http.server
+    import tempfile
+
+    from . import http_client
+    class Handler(http.server.BaseHTTPRequestHandler):
+        hits = 0
+
+        def do_GET(self) -> None:  # noqa: N802
+            Handler.hits += 1
+            body = json.dumps({"path": self.path, "hit": Handler.hits}).encode("utf-8")
+            self.send_response(200 if self.path != "/missing" else 404)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self) -> None:  # noqa: N802
+            data = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(json.dumps({"ok": True, "echo": json.loads(data or b"null")}).encode("utf-8"))
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    requests_ = [("GET", "/a?x=1", None), ("GET", "/a?x=1", None), ("GET", "/missing", None), ("POST", "/push", {"seq": 0}), ("POST", "/push", {"seq": 1})]
+
+    def run(session: requests.Session, posts: List[Any]) -> List[Tuple[int, str]]:
+        out = []
+        for (method, path, body), post in zip(requests_, posts):
+            resp = session.request(method, base + path, json=post if method == "POST" else None, timeout=5)
+            out.append((resp.status_code, resp.text))
+        return out
+
+    failures: List[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        bundle = Path(tmp) / "check.jsonl.gz"
+        recorder = RecordingAdapter(bundle)
+        live = requests.Session()
+        live.mount("http://", recorder)
+        expected = run(live, [b for _, _, b in requests_])
+        recorder.save()
+        server.shutdown()
+        server.server_close()
+
+        replay = requests.Session()
+        adapter = ReplayAdapter(bundle, latency=0.05)
+        replay.mount("http://", adapter)
+        started = time.perf_counter()
+        # second upload session: the POST bodies differ, so they are matched by URL in recorded order
+        got = run(replay, [None, None, None, {"seq": 0, "session": "b"}, {"seq": 1, "session": "b"}])
+        elapsed = time.perf_counter() - started
+        if got != expected:
+            failures.append(f"replayed responses differ: {got} != {expected}")
+        if elapsed < 0.05 * len(requests_):
+            failures.append(f"simulated latency not applied ({elapsed:.3f}s)")
+        try:
+            replay.get(base + "/never-recorded", timeout=5)
+            failures.append("unrecorded request did not fail")
+        except requests.exceptions.ConnectionError:
+            pass
+        if load_bundle(bundle) != recorder.entries:
+            failures.append("bundle does not round-trip")
+
+        os.environ["HTTP_REPLAY"] = str(bundle)
+        try:
+            session = http_client._build_session()
+            if session.get(base + "/a?x=1").status_code != 200:
+                failures.append("http_client session did not mount the replay adapter")
+        finally:
+            del os.environ["HTTP_REPLAY"]
+    for failure in failures:
+        print(f"[ERROR] {failure}")
+    if not failures:
+        print(f"[INFO] {len(requests_)} requests recorded and replayed identically offline ({elapsed:.2f}s with 50 ms latency).")
+    return 1 if failures else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="List an HTTP fixture bundle, or self-check record/replay.")
+    parser.add_argument("bundle", nargs="?", help="Bundle to list (.jsonl.gz)")
+    parser.add_argument("--check", action="store_true", help="Record a local server and replay it offline")
+    args = parser.parse_args()
+    if args.check:
+        return check()
+    if not args.bundle:
+        parser.error("give a bundle to list, or --check")
+    entries = load_bundle(Path(args.bundle))
+    for entry in entries:
+        size = len(base64.b64decode(entry.get("content", "")))
+        print(f"{entry['status']:>3} {entry['method']:<5} {entry.get('elapsed', 0) * 1000:>6.0f}ms {size:>8}B  {entry['url']}")
+    total = sum(entry.get("elapsed", 0) for entry in entries)
+    print(f"{len(entries)} responses, {total:.1f}s recorded network time")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
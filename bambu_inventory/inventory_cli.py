@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+One entry point for the scripts: `bambu-inventory <command> [args]` after `pip install -e .`, or
+`python scripts/inventory_cli.py <command> [args]` (or `python -m bambu_inventory.inventory_cli`) without
+installing.
+
+    sync       sync_all_data.py                  fetch, crawl, merge, export and push everything
+    scrape     scrape_store.py                   scrape the pages scrape_preview.py listed
+    preview    scrape_preview.py                 diff the tab against the collection page (no product pages)
+    retry      retry_failed_429.py               drain data/retry_queue.json
+    merge      merge_store_index.py              merge the tab into store_index.json (offline)
+    calibrate  calc_slope_from_calibration.py    load-cell slope/intercept
+
+A command's module is imported only when that command runs, and arguments after the command go to the
+script's own parser (`bambu-inventory sync --help`). So `merge` never loads requests/bs4, and only `calibrate`
+loads numpy/pandas/matplotlib. `python benchmarks/bench_startup.py` measures each command's cold start.
+"""
+import argparse
+import importlib
+import sys
+from typing import List, Optional
+
+PROG = "bambu-inventory"
+COMMANDS = {
+    "sync": ("sync_all_data", "Fetch tab, Queen README and store, merge, export and push"),
+    "scrape": ("scrape_store", "Scrape the product pages listed by preview"),
+    "preview": ("scrape_preview", "Compare the tab with the collection page"),
+    "retry": ("retry_failed_429", "Retry product pages left in data/retry_queue.json"),
+    "merge": ("merge_store_index", "Merge the tab into store_index.json"),
+    "calibrate": ("calc_slope_from_calibration", "Load-cell slope/intercept from calibration points"),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog=PROG,
+        description="Bambu Lab filament inventory tools.",
+        epilog="\n".join(f"  {name:<10} {help_}" for name, (_, help_) in COMMANDS.items()),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("command", choices=list(COMMANDS), metavar="command", help="One of: " + ", ".join(COMMANDS))
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="Arguments for the command (see <command> --help)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(sys.argv[1:] if argv is None else argv)
+    module = importlib.import_module(f".{COMMANDS[args.command][0]}", __package__)
+    # The scripts parse sys.argv themselves
+    sys.argv = [f"{PROG} {args.command}", *args.args]
+    return module.main() or 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Compact binary materials index for the ESP32 (arduino/RFID_Bambu_reader_TFT_weight/materials.idx).
+
+The firmware reads it straight from SPIFFS with materials_index.h: a binary search over fixed-width records,
+seeking and reading 16 bytes per probe into stack buffers, with no JSON document, no String and no heap.
+
+Layout (little-endian):
+
+    header   16 B   magic "BMIX", u16 version (1), u16 record size (16), u32 count, u32 string table offset
+    records  count x 16 B, sorted by code:  u32 code, u32 material, u32 color, u32 variantId
+    strings  NUL-terminated UTF-8; the three u32 fields are offsets into this table (deduplicated, so
+             "PLA Basic" is stored once); offset 0 is the empty string
+
+Only rows with a numeric filament code are indexed (the firmware matches on the number); for duplicate codes the
+first row wins, as with materials.json's linear scan. The sync writes the index from the same pass as
+materials.json (`MaterialsIndexSink`), so both always hold the same rows.
+
+    python scripts/materials_index.py --verify         # rebuild from materials.json, compare, read every row back
+    python scripts/materials_index.py --build          # write materials.idx from materials.json
+    python scripts/materials_index.py --lookup 10100   # reference reader: one binary search on the file
+"""
+import argparse
+import json
+import struct
+import sys
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+from .artifacts import Row, Sink, canonical
+
+ROOT = Path(__file__).resolve().parents[1]
+FIRMWARE_DIR = ROOT / "arduino" / "RFID_Bambu_reader_TFT_weight"
+MATERIALS_JSON = FIRMWARE_DIR / "materials.json"
+MATERIALS_IDX = FIRMWARE_DIR / "materials.idx"
+
+MAGIC = b"BMIX"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII")
+RECORD = struct.Struct("<IIII")
+FIELDS = ("material", "color", "variantId")
+# materials.json keys (as written by the sync) and the older tab-style keys material_lookup.h also accepts
+JSON_KEYS = {"filamentCode": ("filamentCode", "Code", "code"), "material": ("material", "Name"), "color": ("color", "Color"), "variantId": ("variantId", "VariantId")}
+MAX_CODE = 0xFFFFFFFF
+
+Entry = Dict[str, Any]
+
+
+class IndexFormatError(ValueError):
+    pass
+
+
+def json_entry(obj: Dict[str, Any]) -> Entry:
+    """The indexed fields of one materials.json object, whichever key spelling it uses."""
+    out: Entry = {}
+    for field, keys in JSON_KEYS.items():
+        value = next((obj[key] for key in keys if key in obj), "")
+        out[field] = "" if value is None else str(value).strip()
+    return out
+
+
+def index_entries(entries: Iterable[Entry]) -> List[Tuple[int, Entry]]:
+    """(code, entry) for every numeric code, first one per code, sorted by code."""
+    by_code: Dict[int, Entry] = {}
+    for entry in entries:
+        code = str(entry.get("filamentCode", "")).strip()
+        if not code.isdigit() or int(code) > MAX_CODE:
+            continue
+        by_code.setdefault(int(code), entry)
+    return sorted(by_code.items())
+
+
+def build(entries: Iterable[Entry]) -> bytes:
+    rows = index_entries(entries)
+    strings = bytearray(b"\0")
+    offsets: Dict[str, int] = {"": 0}
+    records = bytearray()
+    for code, entry in rows:
+        fields = []
+        for field in FIELDS:
+            text = str(entry.get(field, ""))
+            if text not in offsets:
+                offsets[text] = len(strings)
+                strings += text.encode("utf-8") + b"\0"
+            fields.append(offsets[text])
+        records += RECORD.pack(code, *fields)
+    header = HEADER.pack(MAGIC, VERSION, RECORD.size, len(rows), HEADER.size + len(records))
+    return header + bytes(records) + bytes(strings)
+
+
+class IndexReader:
+    """Reference implementation of materials_index.h: binary search with seeks, one record in memory at a time."""
+
+    def __init__(self, fh: BinaryIO) -> None:
+        self.fh = fh
+        fh.seek(0)
+        raw = fh.read(HEADER.size)
+        if len(raw) < HEADER.size:
+            raise IndexFormatError("truncated header")
+        magic, version, record_size, self.count, self.strings = HEADER.unpack(raw)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            raise IndexFormatError(f"not a v{VERSION} materials index (magic {magic!r}, version {version}, record {record_size} B)")
+
+    def record(self, i: int) -> Tuple[int, int, int, int]:
+        self.fh.seek(HEADER.size + i * RECORD.size)
+        return RECORD.unpack(self.fh.read(RECORD.size))
+
+    def string(self, offset: int) -> str:
+        self.fh.seek(self.strings + offset)
+        out = bytearray()
+        while True:
+            chunk = self.fh.read(32)
+            end = chunk.find(b"\0")
+            if end >= 0 or not chunk:
+                out += chunk[: end if end >= 0 else len(chunk)]
+                return out.decode("utf-8")
+            out += chunk
+
+    def entry(self, i: int) -> Entry:
+        code, *offsets = self.record(i)
+        out: Entry = {"filamentCode": str(code)}
+        for field, offset in zip(FIELDS, offsets):
+            out[field] = self.string(offset)
+        return out
+
+    def find(self, code: int) -> Optional[Entry]:
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            found = self.record(mid)[0]
+            if found == code:
+                return self.entry(mid)
+            if found < code:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+
+class MaterialsIndexSink(Sink):
+    """fan_out sink writing materials.idx; rows are projected with `columns` like the materials.json sink."""
+
+    def __init__(self, path: Path, columns: Dict[str, str]) -> None:
+        super().__init__(path)
+        self.columns = columns
+        self.entries: List[Entry] = []
+
+    def open(self) -> None:
+        self.rows = 0
+        self.entries = []
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fh = self.tmp.open("wb")
+
+    def write(self, row: Row) -> None:
+        self.entries.append(json_entry(canonical(row, self.columns)))
+        self.rows += 1
+
+    def finish(self) -> None:
+        self.fh.write(build(self.entries))
+
+    def describe(self) -> str:
+        return f"{self.path.name} ({len(index_entries(self.entries))} codes)"
+
+
+def load_json_entries(path: Path) -> List[Entry]:
+    return [json_entry(obj) for obj in json.loads(path.read_text(encoding="utf-8")) if isinstance(obj, dict)]
+
+
+def verify(json_path: Path, idx_path: Path) -> List[str]:
+    """Differences between materials.json and materials.idx, read back through IndexReader."""
+    expected = index_entries(load_json_entries(json_path))
+    data = build(entry for _, entry in expected)
+    problems: List[str] = []
+    if not idx_path.exists():
+        return [f"{idx_path} is missing"]
+    if idx_path.read_bytes() != data:
+        problems.append(f"{idx_path.name} is not the index of {json_path.name} (rebuild with --build or run the sync)")
+    with idx_path.open("rb") as fh:
+        reader = IndexReader(fh)
+        if reader.count != len(expected):
+            problems.append(f"{reader.count} records, expected {len(expected)}")
+        for i, (code, entry) in enumerate(expected):
+            want = {"filamentCode": str(code), **{field: entry[field] for field in FIELDS}}
+            if i < reader.count and reader.entry(i) != want:
+                problems.append(f"record {i}: {reader.entry(i)} != {want}")
+            if reader.find(code) != want:
+                problems.append(f"lookup {code}: {reader.find(code)} != {want}")
+        codes = {code for code, _ in expected}
+        for probe in (0, 1, MAX_CODE, *(code + 1 for code in codes), *(code - 1 for code in codes if code)):
+            if probe not in codes and reader.find(probe) is not None:
+                problems.append(f"lookup {probe} found a row that is not in {json_path.name}")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build, check or query the binary materials index for the ESP32.")
+    parser.add_argument("--json", default=str(MATERIALS_JSON), help="materials.json to index (default: the firmware's)")
+    parser.add_argument("--index", default=str(MATERIALS_IDX), help="Index file (default: the firmware's materials.idx)")
+    parser.add_argument("--build", action="store_true", help="Write the index from --json")
+    parser.add_argument("--verify", action="store_true", help="Check the index round-trips with --json")
+    parser.add_argument("--lookup", type=int, default=None, metavar="CODE", help="Binary-search the index for a filament code")
+    args = parser.parse_args()
+    json_path, idx_path = Path(args.json), Path(args.index)
+
+    if args.build:
+        sink = MaterialsIndexSink(idx_path, {key: key for key in JSON_KEYS})
+        sink.open()
+        for entry in load_json_entries(json_path):
+            sink.write(entry)
+        sink.close()
+        sink.commit()
+        print(f"{'Wrote' if sink.changed else 'Unchanged:'} {idx_path} ({sink.describe()}, {sink.bytes} B)")
+    if args.lookup is not None:
+        with idx_path.open("rb") as fh:
+            entry = IndexReader(fh).find(args.lookup)
+        print(json.dumps(entry, ensure_ascii=False) if entry else f"{args.lookup}: not in {idx_path.name}")
+        if entry is None:
+            return 1
+    if args.verify:
+        problems = verify(json_path, idx_path)
+        for problem in problems[:20]:
+            print(f"[ERROR] {problem}", file=sys.stderr)
+        if problems:
+            return 1
+        size = idx_path.stat().st_size
+        print(f"OK: {idx_path.name} ({size} B) round-trips with {json_path.name} ({json_path.stat().st_size} B).")
+    if not (args.build or args.verify or args.lookup is not None):
+        parser.print_help()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
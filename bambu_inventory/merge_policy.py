@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Declarative field precedence for merging filament sources, with per-field provenance and a conflicts report.
+
+A MergePolicy names its sources in precedence order (`base`) and, per output field, the ordered `Fill`s that may
+fill the field when it is empty. For each code, the row comes from the first source that has it. Each field then
+takes the first eligible Fill candidate that is not empty. Resolution runs column by column over
+SourceColumns, so rows that need no fill are never touched.
+
+sync_all_data.merge_sources, scrape_store.main and merge_store_index.merge each declare their own policy here
+instead of hand-coding the precedence rules. Conflicts are lower-precedence values that differ from the kept
+value. They go to a JSON report (ConflictReport, e.g. data/merge_conflicts.json) instead of one warning per line:
+
+    python scripts/merge_policy.py data/merge_conflicts.json [--field imageurl] [--code 10100]
+"""
+import argparse
+import json
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# (code, field, kept source, kept value, other source, other value)
+Conflict = Tuple[str, str, str, Any, str, Any]
+
+
+@dataclass(frozen=True)
+class Fill:
+    """Fill a field from `column` of `source` when the current value is empty."""
+
+    source: str
+    column: str
+    blank: bool = False  # whitespace-only values count as empty too
+    when: Optional[str] = None  # only for codes that this other source also has
+    clean: Optional[Callable[[Any], Any]] = None  # applied to the filled value
+    counts: Optional[str] = None  # stats key counting the fills
+
+
+def is_blank(value: Any) -> bool:
+    return not value or not str(value).strip()
+
+
+class SourceColumns:
+    """
+    One merge source by code: `index` maps code -> position, `rows` holds the rows by position, and columns
+    are built on first use by `column(field)` (missing keys read as ""). A code listed twice keeps its last
+    row, like building a dict keyed by code. Rows of an `owned` source are private copies the merge may hand
+    out and edit; borrowed rows are copied first.
+    """
+
+    def __init__(self, by_code: Dict[str, Dict[str, Any]], owned: bool = False) -> None:
+        self.index: Dict[str, int] = {code: pos for pos, code in enumerate(by_code)}
+        self.rows: List[Dict[str, Any]] = list(by_code.values())
+        self.cols: Dict[str, List[Any]] = {}
+        self.owned = owned
+
+    def column(self, field: str) -> List[Any]:
+        col = self.cols.get(field)
+        if col is None:
+            col = self.cols[field] = [r.get(field, "") for r in self.rows]
+        return col
+
+
+class MergePolicy:
+    """
+    `base`: sources in precedence order; a code's row is a copy of the first one that has it.
+    `fields`: output field -> Fills tried in order while the field is still empty.
+    `build`: source -> output keys; rows of these sources are built from their columns instead of copied.
+    `columns`: source -> {output field: source column}. Fields not listed read the column of the same name,
+    and None means the source has no such field.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        base: Tuple[str, ...],
+        fields: Dict[str, Tuple[Fill, ...]],
+        build: Optional[Dict[str, Tuple[str, ...]]] = None,
+        columns: Optional[Dict[str, Dict[str, Optional[str]]]] = None,
+    ) -> None:
+        self.name = name
+        self.base = base
+        self.fields = fields
+        self.build = build or {}
+        self.columns = columns or {}
+
+    def column_of(self, source: str, field: str) -> Optional[str]:
+        return self.columns.get(source, {}).get(field, field)
+
+    def resolve(self, sources: Dict[str, SourceColumns], codes: List[str], conflicts: bool = False) -> "Resolution":
+        """Resolve `codes` (each present in at least one base source) in the given order."""
+        positions = {name: [src.index.get(code) for code in codes] for name, src in sources.items()}
+        base_src: List[str] = []
+        base_pos: List[int] = []
+        order = [(name, positions[name]) for name in self.base if name in sources]
+        for p in range(len(codes)):
+            for name, pos in order:
+                j = pos[p]
+                if j is not None:
+                    base_src.append(name)
+                    base_pos.append(j)
+                    break
+            else:
+                raise KeyError(f"{codes[p]!r} is in none of the {self.name} base sources")
+
+        empty: Dict[str, List[Any]] = {}
+
+        def col(name: str, field: str) -> List[Any]:
+            column = self.column_of(name, field)
+            if column is None:
+                if name not in empty:
+                    empty[name] = [""] * len(sources[name].rows)
+                return empty[name]
+            return sources[name].column(column)
+
+        # Base rows: built ones in their declared key order, owned ones as they are, borrowed ones copied.
+        makers: Dict[str, Callable[[int], Dict[str, Any]]] = {}
+        for name in self.base:
+            if name not in sources:
+                continue
+            src = sources[name]
+            if name in self.build:
+                keys = self.build[name]
+                key_cols = [(key, None if key == "code" else col(name, key)) for key in keys]
+                inverse = list(src.index)
+                makers[name] = lambda j, key_cols=key_cols, inverse=inverse: {
+                    key: inverse[j] if c is None else c[j] for key, c in key_cols
+                }
+            elif src.owned:
+                makers[name] = src.rows.__getitem__
+            else:
+                makers[name] = lambda j, rows=src.rows: dict(rows[j])
+        rows = [makers[name](j) for name, j in zip(base_src, base_pos)]
+
+        counts: Counter = Counter(base_src)
+        stats: Counter = Counter()
+        settled_by_field: Dict[str, Dict[int, str]] = {}
+        values: Dict[str, List[Any]] = {}
+        for field, rule in self.fields.items():
+            base_cols = {name: col(name, field) for name, _ in order}
+            vals = [base_cols[name][j] for name, j in zip(base_src, base_pos)]
+            need_empty = need_blank = None
+            settled: Dict[int, str] = {}
+            for fill in rule:
+                if fill.source not in sources or (fill.when is not None and fill.when not in sources):
+                    continue
+                if fill.blank:
+                    if need_blank is None:
+                        need_blank = [p for p, v in enumerate(vals) if is_blank(v)]
+                    candidates = need_blank
+                else:
+                    if need_empty is None:
+                        need_empty = [p for p, v in enumerate(vals) if not v]
+                    candidates = need_empty
+                fill_pos = positions[fill.source]
+                when_pos = positions[fill.when] if fill.when is not None else None
+                fill_col = sources[fill.source].column(fill.column)
+                filled = 0
+                for p in candidates:
+                    if p in settled:
+                        continue
+                    j = fill_pos[p]
+                    if j is None or (when_pos is not None and when_pos[p] is None):
+                        continue
+                    value = fill_col[j]
+                    if not value:
+                        continue
+                    settled[p] = fill.source
+                    rows[p][field] = vals[p] = fill.clean(value) if fill.clean else value
+                    filled += 1
+                if fill.counts:
+                    stats[fill.counts] += filled
+            settled_by_field[field] = settled
+            values[field] = vals
+
+        found: List[Conflict] = []
+        if conflicts:
+            for field, rule in self.fields.items():
+                found.extend(self._conflicts(field, rule, sources, codes, positions, base_src, settled_by_field[field], values[field], col))
+        fills = {field: {codes[p]: name for p, name in settled.items()} for field, settled in settled_by_field.items()}
+        return Resolution(codes, rows, base_src, fills, dict(counts), dict(stats), found)
+
+    def _conflicts(
+        self,
+        field: str,
+        rule: Tuple[Fill, ...],
+        sources: Dict[str, SourceColumns],
+        codes: List[str],
+        positions: Dict[str, List[Optional[int]]],
+        base_src: List[str],
+        settled: Dict[int, str],
+        vals: List[Any],
+        col: Callable[[str, str], List[Any]],
+    ) -> List[Conflict]:
+        """Non-blank values other sources hold for `field` that differ from the kept one (first per source and code)."""
+        offers: Dict[str, List[Tuple[List[Any], Optional[Callable[[Any], Any]]]]] = {}
+        for name in self.base:
+            if name in sources and self.column_of(name, field) is not None:
+                offers.setdefault(name, []).append((col(name, field), None))
+        for fill in rule:
+            if fill.source in sources:
+                offers.setdefault(fill.source, []).append((sources[fill.source].column(fill.column), fill.clean))
+        found: List[Conflict] = []
+        for name, columns in offers.items():
+            for p, j in enumerate(positions[name]):
+                if j is None:
+                    continue
+                kept_src = settled.get(p) or base_src[p]
+                if kept_src == name:
+                    continue
+                kept = vals[p]
+                if is_blank(kept):
+                    continue  # a gap the policy left unfilled, not a disagreement
+                for column, clean in columns:
+                    value = column[j]
+                    if is_blank(value):
+                        continue
+                    if clean is not None:
+                        value = clean(value)
+                    if value != kept:
+                        found.append((codes[p], field, kept_src, kept, name, value))
+                    break
+        return found
+
+
+class Resolution:
+    """Merged rows plus where each value came from: the row's base source, or the source that filled the field."""
+
+    def __init__(
+        self,
+        codes: List[str],
+        rows: List[Dict[str, Any]],
+        base: List[str],
+        fills: Dict[str, Dict[str, str]],
+        bases: Dict[str, int],
+        stats: Dict[str, int],
+        conflicts: List[Conflict],
+    ) -> None:
+        self.codes = codes
+        self.rows = rows
+        self.base = base
+        self.fills = fills  # field -> {code: source}, for filled values only
+        self.bases = bases  # rows per base source
+        self.stats = stats  # Fill.counts totals
+        self.conflicts = conflicts
+        self._positions: Optional[Dict[str, int]] = None
+
+    def provenance(self, code: str, field: str) -> str:
+        """Source the merged value of `field` came from."""
+        filled = self.fills.get(field, {}).get(code)
+        if filled:
+            return filled
+        if self._positions is None:
+            self._positions = {c: p for p, c in enumerate(self.codes)}
+        return self.base[self._positions[code]]
+
+    def fill_counts(self) -> Dict[str, Dict[str, int]]:
+        """field -> {source: fills}."""
+        return {field: dict(Counter(by_code.values())) for field, by_code in self.fills.items() if by_code}
+
+
+class ConflictReport:
+    """
+    Conflicts of one policy, kept per code in a compact JSON file. An incremental merge replaces only the codes
+    it re-resolved (`update`) and drops codes that left the union (`retain`).
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.by_code: Dict[str, List[List[Any]]] = {}
+        self.bases: Dict[str, int] = {}
+        self.fills: Dict[str, Dict[str, int]] = {}
+
+    def load(self) -> bool:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception:  # noqa: BLE001
+            return False
+        self.by_code = {}
+        for conflict in data.get("conflicts", []):
+            self.by_code.setdefault(conflict[0], []).append(conflict)
+        return True
+
+    def update(self, resolution: Resolution) -> None:
+        for code in resolution.codes:
+            self.by_code.pop(code, None)
+        for conflict in resolution.conflicts:
+            self.by_code.setdefault(conflict[0], []).append(list(conflict))
+        self.bases = resolution.bases
+        self.fills = resolution.fill_counts()
+
+    def retain(self, codes: Iterable[str]) -> None:
+        keep = set(codes)
+        self.by_code = {code: found for code, found in self.by_code.items() if code in keep}
+
+    def conflicts(self) -> List[List[Any]]:
+        return [conflict for code in sorted(self.by_code) for conflict in self.by_code[code]]
+
+    def summary(self) -> Dict[str, int]:
+        """"field: kept < other" -> conflicts."""
+        return dict(Counter(f"{c[1]}: {c[2]} < {c[4]}" for found in self.by_code.values() for c in found).most_common())
+
+    def save(self, policy: str) -> None:
+        conflicts = self.conflicts()
+        report = {
+            "policy": policy,
+            "generated": int(time.time()),
+            "fields": ["code", "field", "keptSource", "kept", "otherSource", "other"],
+            "total": len(conflicts),
+            "summary": self.summary(),
+            "lastRun": {"rowsFrom": self.bases, "filledFrom": self.fills},
+            "conflicts": conflicts,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        # one conflict per line: compact, but still diffable and greppable
+        body = ",\n".join(json.dumps(c, ensure_ascii=False, separators=(",", ":")) for c in conflicts)
+        head = json.dumps({k: v for k, v in report.items() if k != "conflicts"}, ensure_ascii=False)[:-1]
+        tmp.write_text(f'{head}, "conflicts": [\n{body}\n]}}\n', encoding="utf-8")
+        tmp.replace(self.path)
+
+    def log(self, policy: str) -> None:
+        """One line on stdout instead of one warning per conflict."""
+        total = sum(len(found) for found in self.by_code.values())
+        if not total:
+            return
+        top = ", ".join(f"{key} ({n})" for key, n in list(self.summary().items())[:3])
+        print(f"[WARN] {policy}: {total} field conflicts kept the higher-precedence value ({top}); see {self.path}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Show a merge conflicts report.")
+    parser.add_argument("report", type=Path, help="Report file, e.g. data/merge_conflicts.json")
+    parser.add_argument("--field", help="Only conflicts on this field")
+    parser.add_argument("--code", help="Only conflicts for this code")
+    parser.add_argument("--limit", type=int, default=50, help="Conflicts to list (default: 50, 0 = all)")
+    args = parser.parse_args()
+
+    report = ConflictReport(args.report)
+    if not report.load():
+        print(f"[ERROR] Cannot read {args.report}")
+        return 1
+    for key, count in report.summary().items():
+        print(f"{count:>7}  {key}")
+    rows = [c for c in report.conflicts() if (not args.field or c[1] == args.field) and (not args.code or c[0] == args.code)]
+    for code, field, kept_src, kept, other_src, other in rows[: args.limit or None]:
+        print(f"{code} {field}: {kept_src}={kept!r} kept over {other_src}={other!r}")
+    if args.limit and len(rows) > args.limit:
+        print(f"... {len(rows) - args.limit} more")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Incremental-merge state for sync_all_data.py (data/merge_state.json).
+
+After every merge the state records one fingerprint per source row (tab, store, Queen; keyed by code), one
+per whole source (an unchanged source skips per-row fingerprinting on the next run) and which codes had their empty producturl defaulted to the collection URL on output. On the next run,
+the previous filament.json plus that list gives back the previous merged rows, and merge_sources only
+re-resolves the codes whose fingerprint changed, appeared or disappeared in any source.
+
+The state is ignored (full merge) when it is missing, was written by another MERGE_STATE_VERSION, or
+filament.json no longer hashes to what the state recorded (e.g. edited by hand or written elsewhere).
+"""
+import argparse
+import hashlib
+import json
+import marshal
+import zlib
+from itertools import repeat
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+ROOT = Path(__file__).resolve().parents[1]
+MERGE_STATE_JSON = ROOT / "data" / "merge_state.json"
+MERGE_STATE_VERSION = 1
+MARSHAL_FORMAT = 2
+SOURCES = ("tab", "store", "queen")
+
+
+def fingerprint(value: Any) -> int:
+    """
+    Cheap content fingerprint of a source row, or of a whole source (key order included). marshal format 2
+    writes no object refs, so equal values give equal bytes whatever their string identities.
+    """
+    return zlib.crc32(marshal.dumps(value, MARSHAL_FORMAT))
+
+
+def file_sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+class MergeState:
+    def __init__(self, path: Path = MERGE_STATE_JSON) -> None:
+        self.path = Path(path)
+        self.sources: Dict[str, int] = {}
+        self.fingerprints: Dict[str, Dict[str, int]] = {}
+        self.previous: Optional[Dict[str, Dict[str, Any]]] = None
+        self.default_product_url = ""
+        self.changed: Optional[int] = None  # codes re-resolved by the last incremental merge_sources call
+
+    def load(self, output_path: Path) -> bool:
+        """Read the state and the filament.json it describes; False (full merge) when they do not match."""
+        try:
+            state = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception:  # noqa: BLE001
+            return False
+        if state.get("version") != MERGE_STATE_VERSION or state.get("output") != str(Path(output_path).resolve()):
+            return False
+        if not Path(output_path).exists() or file_sha256(Path(output_path)) != state.get("outputSha256"):
+            print(f"[INFO] {output_path} changed since the last merge; running a full merge.")
+            return False
+        defaulted = set(state.get("productUrlDefaulted", []))
+        previous: Dict[str, Dict[str, Any]] = {}
+        for row in json.loads(Path(output_path).read_text(encoding="utf-8")):
+            code = str(row.get("code", ""))
+            if code in defaulted:
+                row["producturl"] = ""  # undo the output-only default so the row equals the merge result
+            previous[code] = row
+        self.default_product_url = state.get("productUrlDefault", "")
+        self.sources = state.get("sources", {})
+        self.fingerprints = state.get("fingerprints", {})
+        self.previous = previous
+        return True
+
+    def changed_codes(self, fingerprints: Dict[str, Dict[str, int]]) -> Set[str]:
+        """Codes whose row was added, removed or edited in any source since the saved state."""
+        changed: Set[str] = set()
+        for source in SOURCES:
+            old = self.fingerprints.get(source, {})
+            new = fingerprints.get(source, {})
+            changed.update(code for code, _ in new.items() ^ old.items())
+        return changed
+
+    def up_to_date(self, default_product_url: str) -> bool:
+        """True when the last merge_sources call changed nothing, so the previous outputs are still exact."""
+        return self.previous is not None and self.changed == 0 and self.default_product_url == default_product_url
+
+    def save(self, output_path: Path, defaulted_codes: Iterable[str], default_product_url: str) -> None:
+        state = {
+            "version": MERGE_STATE_VERSION,
+            "output": str(Path(output_path).resolve()),
+            "outputSha256": file_sha256(Path(output_path)),
+            "productUrlDefault": default_product_url,
+            "productUrlDefaulted": sorted(defaulted_codes),
+            "sources": self.sources,
+            "fingerprints": self.fingerprints,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state, separators=(",", ":")), encoding="utf-8")
+        tmp.replace(self.path)
+
+
+def row_fingerprints(codes: Iterable[str], rows: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+    """{code: fingerprint(row)} for parallel codes/rows, computed in chained maps so no Python frame runs per row."""
+    return dict(zip(codes, map(zlib.crc32, map(marshal.dumps, rows, repeat(MARSHAL_FORMAT)))))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Show the saved incremental-merge state.")
+    parser.add_argument("--output", default=str(ROOT / "data" / "filament.json"), help="filament.json the state belongs to")
+    args = parser.parse_args()
+    state = MergeState()
+    usable = state.load(Path(args.output))
+    counts: List[str] = [f"{source}={len(state.fingerprints.get(source, {}))}" for source in SOURCES]
+    print(f"State: {state.path} ({'usable' if usable else 'not usable; next merge is full'})")
+    print(f"Fingerprints: {', '.join(counts)}")
+    if state.previous is not None:
+        print(f"Previous rows: {len(state.previous)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Merge store_index_tab.json (tab) and store_index.json (local), filling missing fields; mismatches are written to
+data/store_index_conflicts.json (merge_policy.py).
+Reads both through the catalog (catalog_db.py); the merged rows replace the catalog's store source and are
+exported to store_index.json and store_index_tab.tsv in the same pass (artifacts.py).
+"""
+import argparse
+from pathlib import Path
+
+from .artifacts import CollectSink, CsvSink, JsonArraySink, Manifest, fan_out, summarize
+from .catalog_db import CATALOG_MIRROR, Catalog, load_source
+from .merge_policy import ConflictReport, Fill, MergePolicy, SourceColumns
+
+ROOT = Path(__file__).resolve().parents[1]
+TSV_OUT = ROOT / "data" / "store_index_tab.tsv"
+MERGED_JSON = ROOT / "data" / "store_index.json"
+
+FIELDS = [
+    "code", "name", "color", "material", "variantId", "imageUrl", "productUrl"
+]
+CONFLICTS_JSON = ROOT / "data" / "store_index_conflicts.json"
+
+# Tab wins, local fills whatever the tab leaves empty; mismatches go to CONFLICTS_JSON
+POLICY = MergePolicy(
+    "merge_store_index",
+    base=("tab", "local"),
+    fields={f: (Fill("local", f),) for f in FIELDS if f != "code"},
+    build={"tab": tuple(FIELDS), "local": tuple(FIELDS)},
+)
+
+
+def normalize_tab_row(row):
+    # Map capitalized tab keys to lowercase, flatten Image
+    out = {}
+    for k, v in row.items():
+        lk = k.lower()
+        if lk == "image":
+            out["imageUrl"] = ""  # Ignore formula/image cell
+        else:
+            out[lk] = v if not isinstance(v, dict) else ""
+    # Ensure all expected fields
+    for f in FIELDS:
+        if f not in out:
+            out[f] = ""
+    return out
+
+def merge(tab, local, report=None):
+    sources = {
+        "tab": SourceColumns({str(row["code"]): row for row in map(normalize_tab_row, tab)}, owned=True),
+        "local": SourceColumns({str(r["code"]): r for r in local}),
+    }
+    codes = sorted(sources["tab"].index.keys() | sources["local"].index.keys())
+    resolution = POLICY.resolve(sources, codes, conflicts=report is not None)
+    if report is not None:
+        report.update(resolution)
+        report.retain(codes)
+    return resolution.rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge the tab into store_index.json and export store_index_tab.tsv.")
+    parser.parse_args()
+    tab = load_source("tab")
+    local = load_source("store")
+    conflicts = ConflictReport(CONFLICTS_JSON)
+    merged = merge(tab, local, conflicts)
+    conflicts.save(POLICY.name)
+    conflicts.log(POLICY.name)
+    # One pass: catalog store source, its store_index.json export (unless CATALOG_MIRROR=0) and this script's TSV
+    with Catalog() as catalog:
+        sinks = [CollectSink("catalog store", lambda rows: catalog.replace("store", rows)), CsvSink(TSV_OUT, FIELDS, "\t")]
+        if CATALOG_MIRROR:
+            sinks.append(JsonArraySink(MERGED_JSON))
+        fan_out(merged, sinks, Manifest().load())
+    print(f"Saved merged store index with {len(merged)} records; {summarize(sinks)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Drain the persistent retry queue (data/retry_queue.json) outside a full sync.
+
+sync_all_data.py already retries failed product pages inside the crawl and re-tries anything left in
+the queue on its next run; use this only to flush the queue on its own. Pages go through the same
+scheduler (jittered backoff, lower priority for retries) and their variants are parsed like the sync's
+crawl does: variants whose codes are in neither the tab nor the store index are added to the catalog's
+store source (data/store_index.json), which the next sync reads into its store lookup, so a page
+recovered here is not lost once it leaves the queue. Legacy data/failed_429_urls.json entries are
+imported automatically.
+"""
+import argparse
+from typing import Dict, List
+from urllib.parse import urlparse
+
+from .catalog_db import load_source, save_source
+from .common import clean_code
+from .common import normalize_tab_row as normalize_row
+from .crawler import DEFAULT_CONCURRENCY, DEFAULT_RPS, DEFAULT_RETRIES, RetryQueue, crawl
+from .sync_all_data import build_store_lookup, new_variant_rows, parse_product_variants
+
+
+def store_index_row(row: Dict[str, str]) -> Dict[str, str]:
+    """A new_variant_rows row in store_index.json's layout (the keys scrape_store.py writes)."""
+    return {
+        "code": row.get("code", ""),
+        "name": row.get("name", ""),
+        "color": row.get("color", ""),
+        "variantId": row.get("variantid", ""),
+        "imageUrl": row.get("imageurl", ""),
+        "productUrl": row.get("producturl", ""),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Retry product pages left in data/retry_queue.json.")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--rps", type=float, default=DEFAULT_RPS)
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help="Re-enqueues per URL in this run")
+    args = parser.parse_args()
+
+    queue = RetryQueue()
+    if not len(queue):
+        print("No queued URLs to retry.")
+        return 0
+    store_records = load_source("store")
+    existing_codes = set(build_store_lookup(store_records))
+    existing_codes |= {clean_code(normalize_row(r).get("code", "")) for r in load_source("tab")}
+    new_rows: List[Dict[str, str]] = []
+    print(f"Retrying {len(queue)} URLs...")
+    for result in crawl([], concurrency=args.concurrency, rps=args.rps, retries=args.retries, retry_queue=queue):
+        if result.error is not None:
+            print(f"FAILED: {result.url} ({result.attempts} attempts): {result.error}")
+            continue
+        variants = parse_product_variants(result.html)
+        parsed = urlparse(result.url)
+        rows = new_variant_rows(variants, result.url, existing_codes, f"{parsed.scheme}://{parsed.netloc}")
+        new_rows.extend(rows)
+        codes = ", ".join(row["code"] for row in rows) or "none new"
+        print(f"SUCCESS: {result.url} ({len(variants)} variants; new codes: {codes})")
+    if new_rows:
+        save_source("store", store_records + [store_index_row(row) for row in new_rows])
+        print(f"Added {len(new_rows)} new codes to the store index; the next sync merges them.")
+    print(f"Done. {len(queue)} URLs still queued.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
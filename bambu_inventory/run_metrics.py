@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Per-stage metrics for a sync run: a JSON file per run plus a short summary table.
+
+    metrics = RunMetrics("sync")
+    with metrics.stage("merge") as stage:
+        merged = ...
+        stage.rows = len(merged)
+    metrics.write()          # data/metrics/sync-<UTC time>.json
+    print(metrics.table())
+
+- Stages: wall time, process CPU time, rows and status (ok / error, or the StageRunner outcome such as
+  fallback). Stages that run concurrently share the process, so their CPU times overlap.
+- With a stage_profile.Profiler (`--profile`), every stage is also profiled (see stage_profile.py).
+- HTTP, for the whole run: request count, bytes, time waiting on responses, status-code histogram, 429 count
+  (from an http_client timing hook) and the on-disk cache hit rate (fresh hits and 304 revalidations over
+  cache lookups, from http_cache).
+
+Inspect a metrics file with `python scripts/run_metrics.py [data/metrics/sync-....json]` (default: the latest).
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from . import http_cache
+from . import http_client
+from . import stage_profile
+ROOT = Path(__file__).resolve().parents[1]
+METRICS_DIR = ROOT / "data" / "metrics"
+
+
+class StageMetrics:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.status = "running"
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.rows: Optional[int] = None
+        self.error = ""
+
+    def as_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"status": self.status, "wall_s": round(self.wall, 4), "cpu_s": round(self.cpu, 4), "rows": self.rows}
+        if self.error:
+            out["error"] = self.error
+        return out
+
+
+class RunMetrics:
+    def __init__(self, command: str, profiler: Optional[stage_profile.Profiler] = None) -> None:
+        self.command = command
+        self.profiler = profiler
+        self.started_at = datetime.datetime.now(datetime.timezone.utc)
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+        self.stages: Dict[str, StageMetrics] = {}
+        self.lock = threading.Lock()
+        self.statuses: Counter = Counter()
+        self.requests = 0
+        self.bytes = 0
+        self.waiting = 0.0
+        http_client.add_timing_hook(self._on_response)
+
+    def _on_response(self, method: str, url: str, status: int, elapsed: float, size: int) -> None:
+        with self.lock:
+            self.statuses[str(status)] += 1
+            self.requests += 1
+            self.bytes += size
+            self.waiting += elapsed
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[StageMetrics]:
+        """Time the block as stage `name`; usable from any thread (StageRunner passes it as `around`)."""
+        record = StageMetrics(name)
+        with self.lock:
+            self.stages[name] = record
+        started, cpu_started = time.perf_counter(), time.process_time()
+        try:
+            with stage_profile.stage(self.profiler, name):
+                yield record
+        except BaseException as exc:
+            record.status = "error"
+            record.error = f"{type(exc).__name__}: {exc}"
+            raise
+        else:
+            if record.status == "running":  # the block may have set failed itself
+                record.status = "ok"
+        finally:
+            record.wall = time.perf_counter() - started
+            record.cpu = time.process_time() - cpu_started
+
+    def rows(self, name: str, count: int) -> None:
+        if name in self.stages:
+            self.stages[name].rows = count
+
+    def outcomes(self, outcomes: Dict[str, Any]) -> None:
+        """Take the final status of StageRunner stages (fallback, abandoned, skipped...) and their wall time."""
+        for name, outcome in outcomes.items():
+            record = self.stages.setdefault(name, StageMetrics(name))
+            record.status = outcome.status
+            record.error = outcome.error or record.error
+            record.wall = max(record.wall, outcome.seconds)
+
+    def http(self) -> Dict[str, Any]:
+        cache = http_cache.default_stats()
+        stats = cache or {"hits": 0, "revalidated": 0, "misses": 0}
+        served = stats["hits"] + stats["revalidated"]
+        lookups = served + stats["misses"]
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "bytes": self.bytes,
+                "waiting_s": round(self.waiting, 3),
+                "status": dict(sorted(self.statuses.items())),
+                "throttled_429": self.statuses.get("429", 0),
+                "cache": {
+                    "used": cache is not None,
+                    "hits": stats["hits"],
+                    "revalidated": stats["revalidated"],
+                    "misses": stats["misses"],
+                    "hit_rate": round(served / lookups, 3) if lookups else None,
+                },
+            }
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "command": self.command,
+            "started": self.started_at.isoformat(timespec="seconds"),
+            "wall_s": round(time.perf_counter() - self.started, 3),
+            "cpu_s": round(time.process_time() - self.cpu_started, 3),
+            "stages": {name: record.as_dict() for name, record in self.stages.items()},
+            "http": self.http(),
+        }
+
+    def write(self, path: Optional[Path] = None) -> Path:
+        path = Path(path) if path else METRICS_DIR / f"{self.command}-{self.started_at:%Y%m%dT%H%M%SZ}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(self.as_dict(), indent=2) + "\n", encoding="utf-8")
+        tmp.replace(path)
+        return path
+
+    def table(self) -> str:
+        return format_table(self.as_dict())
+
+
+def format_table(report: Dict[str, Any]) -> str:
+    lines = [f"{'stage':<10}{'status':<11}{'wall s':>9}{'cpu s':>9}{'rows':>8}"]
+    for name, stage in report["stages"].items():
+        rows = "-" if stage.get("rows") is None else str(stage["rows"])
+        lines.append(f"{name:<10}{stage['status']:<11}{stage['wall_s']:>9.2f}{stage['cpu_s']:>9.2f}{rows:>8}")
+    lines.append(f"{'total':<21}{report['wall_s']:>9.2f}{report['cpu_s']:>9.2f}")
+    http = report["http"]
+    statuses = " ".join(f"{code}x{count}" for code, count in http["status"].items()) or "-"
+    cache = http["cache"]
+    hit_rate = "unused" if not cache["used"] else "-" if cache["hit_rate"] is None else f"{cache['hit_rate']:.0%}"
+    lines.append(
+        f"HTTP: {http['requests']} requests, {http['bytes'] / 1024:.1f} KiB, {http['waiting_s']:.2f}s waiting; "
+        f"status {statuses}; 429s {http['throttled_429']}; cache hit rate {hit_rate}"
+    )
+    return "\n".join(lines)
+
+
+def latest(directory: Path = METRICS_DIR) -> Optional[Path]:
+    files: List[Path] = sorted(directory.glob("*.json")) if directory.exists() else []
+    return files[-1] if files else None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Print the summary table of a run's metrics file.")
+    parser.add_argument("path", nargs="?", default=None, help="Metrics JSON (default: the latest in data/metrics)")
+    args = parser.parse_args()
+    path = Path(args.path) if args.path else latest()
+    if path is None:
+        print(f"No metrics files in {METRICS_DIR}.")
+        return 1
+    report = json.loads(path.read_text(encoding="utf-8"))
+    print(f"{path.name}: {report['command']} started {report['started']}")
+    print(format_table(report))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
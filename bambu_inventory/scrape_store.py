@@ -0,0 +1,374 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from .catalog_db import has_source, load_source, save_source
+from .chunked_upload import upload
+from .common import normalize_product_url
+from . import http_fixtures
+from . import stage_profile
+from .http_cache import cached_get
+from .merge_policy import ConflictReport, Fill, MergePolicy, SourceColumns
+
+
+# --- Globals and config ---
+ROOT = Path(__file__).resolve().parents[1]
+STORE_BASE = os.environ.get("STORE_BASE", "https://store.bambulab.com")
+COLLECTION_PATH = "/collections/bambu-lab-3d-printer-filament"
+PUSH_URL = os.environ.get("WEB_APP_URL")
+TAB_JSON = ROOT / "data" / "store_index_tab.json"
+OUT_JSON = ROOT / "data" / "store_index.json"
+QUEEN_JSON = ROOT / "data" / "queengooborg.json"
+MISSING_JSON = ROOT / "data" / "collection_missing_urls.json"
+CONFLICTS_JSON = ROOT / "data" / "scrape_store_conflicts.json"
+RECORD_KEYS = ("code", "name", "color", "material", "variantid", "imageurl", "producturl")
+
+# Tab rows win, then scraped product pages, then Queen, then the preview's reference variants; scraped pages
+# fill any empty tab field, Queen and the reference variants only the variant id (and the product URL).
+STORE_POLICY = MergePolicy(
+    "scrape_store",
+    base=("tab", "scraped", "queen", "reference"),
+    fields={
+        "name": (Fill("scraped", "name"),),
+        "color": (Fill("scraped", "color"),),
+        "material": (Fill("scraped", "material"),),
+        "variantid": (Fill("scraped", "variantid"), Fill("queen", "variantId"), Fill("reference", "variantId")),
+        "imageurl": (Fill("scraped", "imageurl"),),
+        "producturl": (Fill("scraped", "producturl"), Fill("reference", "productUrl")),
+    },
+    build={"queen": RECORD_KEYS, "reference": RECORD_KEYS},
+    columns={
+        "queen": {"name": "category", "material": "category", "variantid": "variantId", "imageurl": "imageUrl", "producturl": "productUrl"},
+        "reference": {"material": None, "variantid": "variantId", "imageurl": "imageUrl", "producturl": "productUrl"},
+    },
+)
+
+
+# --- HTTP helpers ---
+def fetch(url: str) -> str:
+    resp = cached_get(url)
+    resp.raise_for_status()
+    return resp.text
+
+
+# --- Parsing helpers ---
+def parse_colors_from_page(page_html: str) -> List[Any]:
+    """Parse color options from a Bambu Lab product page."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(page_html, "html.parser")
+    options: List[Any] = []
+    for swatch in soup.select('[data-variant-code]'):
+        code = swatch.get('data-variant-code', '').strip()
+        color = swatch.get('title', '').strip() or swatch.text.strip()
+        Option = type('Option', (), {})
+        opt = Option()
+        opt.code = code
+        opt.color = color
+        options.append(opt)
+    return options
+
+
+def parse_product_list(html: str) -> List["Product"]:
+    """Parse the filament collection page into Product entries."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    products: List[Product] = []
+    for prod in soup.select('a.product-item'):
+        name = prod.get('title', '').strip() or prod.select_one('.product-title').text.strip() if prod.select_one('.product-title') else ''
+        slug = prod.get('href', '').split('/')[-1]
+        product_url = prod.get('href', '')
+        media_files: List[str] = []
+        img = prod.select_one('img')
+        if img and img.get('src'):
+            media_files.append(img['src'])
+        products.append(Product(name=name, slug=slug, color_list=None, product_url=product_url, media_files=media_files))
+    return products
+
+
+# --- Product dataclass ---
+@dataclass
+class Product:
+    name: str = ""
+    slug: str = ""
+    color_list: Optional[List[dict]] = None
+    product_url: str = ""
+    media_files: Optional[List[str]] = None
+
+
+# --- Material guessing logic ---
+def guess_material(name: str, slug: str) -> str:
+    target = (name or "") + " " + (slug or "")
+    target = target.lower()
+    if "pla" in target:
+        return "PLA"
+    if "pet-cf" in target or "petcf" in target:
+        return "PET-CF"
+    if "petg" in target:
+        return "PETG"
+    if "paht" in target:
+        return "PAHT"
+    if "abs" in target:
+        return "ABS"
+    if "asa" in target:
+        return "ASA"
+    if "tpu" in target:
+        return "TPU"
+    if "pc" in target:
+        return "PC"
+    return name.split(" ")[0] if name else ""
+
+
+# --- Targeted scraping ---
+def scrape_product_pages(urls: List[str], variant_hints: Dict[str, Dict[str, str]]) -> List[dict]:
+    """Fetch only the requested product pages and build records; minimizes scraping to avoid throttling."""
+    records: List[dict] = []
+    seen: set[str] = set()
+    for raw_url in urls:
+        url = normalize_product_url(raw_url)
+        if not url or url in seen:
+            continue
+        seen.add(url)
+        hint = variant_hints.get(url, {})
+        try:
+            page_html = fetch(url)
+            time.sleep(0.3)
+        except Exception as exc:  # noqa: BLE001
+            print(f"WARN: failed to fetch product page {url}: {exc}", file=sys.stderr)
+            if hint:
+                records.append({
+                    "code": hint.get("code", ""),
+                    "name": hint.get("name", ""),
+                    "color": "",
+                    "material": guess_material(hint.get("name", ""), urlparse(url).path),
+                    "variantId": hint.get("variantId", ""),
+                    "imageUrl": "",
+                    "productUrl": url,
+                })
+            continue
+
+        options = parse_colors_from_page(page_html)
+        if options:
+            for opt in options:
+                records.append({
+                    "code": getattr(opt, "code", "") or hint.get("code", ""),
+                    "name": hint.get("name", ""),
+                    "color": getattr(opt, "color", ""),
+                    "material": guess_material(hint.get("name", ""), urlparse(url).path),
+                    "variantId": hint.get("variantId", ""),
+                    "imageUrl": "",
+                    "productUrl": url,
+                })
+        else:
+            records.append({
+                "code": hint.get("code", ""),
+                "name": hint.get("name", ""),
+                "color": "",
+                "material": guess_material(hint.get("name", ""), urlparse(url).path),
+                "variantId": hint.get("variantId", ""),
+                "imageUrl": "",
+                "productUrl": url,
+            })
+    return records
+
+
+# --- Tab and queen helpers ---
+def normalize_tab_row(row: dict) -> dict:
+    out: dict = {}
+    for k, v in row.items():
+        lk = k.lower()
+        if lk == "image":
+            continue
+        out[lk] = v if not isinstance(v, dict) else ""
+    for f in ["code", "name", "color", "material", "variantid", "imageurl", "producturl"]:
+        out.setdefault(f, "")
+    return out
+
+
+def load_tab_data(tab_path: Path) -> dict:
+    if not has_source("tab") and not tab_path.exists():
+        print(f"[WARN] {tab_path} not found. Run fetch_store_index_tab.py first.")
+        return {}
+    tab_data = load_source("tab")
+    return {str(normalize_tab_row(entry)["code"]): normalize_tab_row(entry) for entry in tab_data}
+
+
+def load_queen_data(path: Path) -> dict:
+    data = load_source("queen")
+    return {str(e.get("filamentCode")): e for e in data}
+
+
+def load_missing_data() -> dict:
+    if not MISSING_JSON.exists():
+        return {"missingProductUrls": [], "missingReferenceVariants": [], "missingQueenCodes": []}
+    try:
+        data = json.loads(MISSING_JSON.read_text(encoding="utf-8"))
+    except Exception:  # noqa: BLE001
+        return {"missingProductUrls": [], "missingReferenceVariants": [], "missingQueenCodes": []}
+    for key in ["missingProductUrls", "missingReferenceVariants", "missingQueenCodes"]:
+        data.setdefault(key, [])
+    return data
+
+
+def find_missing_variantids(tab_lookup: dict) -> List[str]:
+    return [code for code, entry in tab_lookup.items() if not entry.get("variantid")]
+
+
+# --- Fallback full scraping (unused in main) ---
+def build_records(products: Iterable[Product]) -> List[dict]:
+    records: List[dict] = []
+    for product in products:
+        if not product.slug:
+            continue
+        url = normalize_product_url(product.product_url) or f"{STORE_BASE}/products/{product.slug}"
+        try:
+            page_html = fetch(url)
+            time.sleep(0.25)
+        except Exception as exc:  # noqa: BLE001
+            print(f"WARN: failed to fetch product page {url}: {exc}", file=sys.stderr)
+            continue
+        options = parse_colors_from_page(page_html)
+        if not options:
+            print(f"WARN: no color options found in {url}", file=sys.stderr)
+            continue
+        color_entries = product.color_list or []
+        if len(color_entries) != len(options):
+            print(f"WARN: color count mismatch for {product.name} ({len(options)} options vs {len(color_entries)} feed)", file=sys.stderr)
+        image_url = ""
+        if product.media_files:
+            image_url = product.media_files[0]
+            if not image_url.startswith("http"):
+                image_url = f"{STORE_BASE.rstrip('/')}/{image_url.lstrip('/')}"
+        for idx, opt in enumerate(options):
+            color_entry = color_entries[idx] if idx < len(color_entries) else {}
+            records.append({
+                "code": getattr(opt, "code", ""),
+                "name": product.name,
+                "color": getattr(opt, "color", ""),
+                "material": guess_material(product.name, product.slug),
+                "variantId": color_entry.get("variantId", ""),
+                "imageUrl": image_url,
+                "productUrl": url,
+            })
+    return records
+
+
+# --- Output helpers ---
+def write_json(records: List[dict]) -> None:
+    save_source("store", records, OUT_JSON)
+
+
+def push_store_index(records: List[dict]) -> None:
+    payload = {"action": "uploadStoreIndex", "records": []}
+    for rec in records:
+        payload["records"].append({
+            "code": rec.get("code") or "",
+            "name": rec.get("name") or "",
+            "color": rec.get("color") or "",
+            "imageUrl": rec.get("imageUrl") or "",
+            "productUrl": rec.get("productUrl") or "",
+        })
+    try:
+        reply = upload(PUSH_URL, payload)
+        if not reply.get("ok"):
+            raise RuntimeError(reply)
+        print(f"Pushed {len(records)} records to Store Index via webhook")
+    except Exception as exc:  # noqa: BLE001
+        print(f"WARN: failed to push Store Index to webhook: {exc}", file=sys.stderr)
+
+
+def save_missing_data(data: dict) -> None:
+    try:
+        MISSING_JSON.parent.mkdir(parents=True, exist_ok=True)
+        MISSING_JSON.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    except Exception as exc:  # noqa: BLE001
+        print(f"WARN: failed to write missing data: {exc}", file=sys.stderr)
+
+
+# --- Main flow ---
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Scrape the product pages listed by scrape_preview.py and rebuild store_index.json.")
+    http_fixtures.add_arguments(parser)
+    stage_profile.add_arguments(parser)
+    args = parser.parse_args()
+    http_fixtures.configure(record=args.record, replay=args.replay, latency=args.replay_latency)
+    profiler = stage_profile.from_args("scrape", args)
+    try:
+        return scrape(profiler)
+    finally:
+        if profiler is not None:
+            profiler.close()
+
+
+def scrape(profiler: Optional[stage_profile.Profiler] = None) -> int:
+    with stage_profile.stage(profiler, "queen"):
+        subprocess.run([sys.executable, "-m", f"{__package__}.fetch_queengooborg_readme"], cwd=ROOT, check=True)
+
+    with stage_profile.stage(profiler, "load"):
+        tab_lookup = load_tab_data(TAB_JSON)
+        queen_lookup = load_queen_data(QUEEN_JSON)
+        missing_variantids = find_missing_variantids(tab_lookup)
+        if missing_variantids:
+            print(f"[INFO] Filaments missing VariantId in tab: {missing_variantids}")
+
+        missing_data = load_missing_data()
+        missing_refs = missing_data.get("missingReferenceVariants", [])
+        missing_urls = missing_data.get("missingProductUrls", [])
+
+        variant_hints: Dict[str, Dict[str, str]] = {}
+        for ref in missing_refs:
+            url = normalize_product_url(ref.get("productUrl", ""))
+            if not url:
+                continue
+            variant_hints[url] = {
+                "code": str(ref.get("code", "")),
+                "name": ref.get("name", ""),
+                "variantId": ref.get("variantId", ""),
+            }
+        target_urls = {normalize_product_url(u) for u in missing_urls if u}
+        target_urls.update(variant_hints.keys())
+
+    with stage_profile.stage(profiler, "scrape"):
+        scraped: List[dict] = scrape_product_pages(list(target_urls), variant_hints)
+    print(f"Scraped {len(scraped)} records from {len(target_urls)} targeted product pages.")
+
+    with stage_profile.stage(profiler, "merge"):
+        sources = {
+            "tab": SourceColumns(tab_lookup, owned=True),
+            "scraped": SourceColumns(
+                {str(rec.get("code", "")): {k.lower(): v for k, v in rec.items()} for rec in scraped if rec.get("code")},
+                owned=True,
+            ),
+            "queen": SourceColumns(queen_lookup),
+            "reference": SourceColumns({str(ref.get("code", "")).strip(): ref for ref in missing_refs if str(ref.get("code", "")).strip()}),
+        }
+        codes = list(dict.fromkeys(code for src in sources.values() for code in src.index))
+        conflicts = ConflictReport(CONFLICTS_JSON)
+        resolution = STORE_POLICY.resolve(sources, codes, conflicts=True)
+        conflicts.update(resolution)
+        conflicts.save(STORE_POLICY.name)
+        conflicts.log(STORE_POLICY.name)
+
+        missing_queen_codes = [code for code in queen_lookup if code not in tab_lookup]
+        missing_data["missingQueenCodes"] = missing_queen_codes
+        save_missing_data(missing_data)
+
+    with stage_profile.stage(profiler, "write"):
+        merged_list = resolution.rows
+        write_json(merged_list)
+        if PUSH_URL:
+            push_store_index(merged_list)
+    print(f"Wrote {len(merged_list)} records to {OUT_JSON}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
\ No newline at end of file
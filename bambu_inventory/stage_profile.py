@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+`--profile` mode for sync_all_data.py, scrape_store.py and scrape_preview.py: where each stage spends its time
+and memory.
+
+Every stage (tab, queen, store, crawl, merge, push, export in the sync; queen, load, scrape, merge, write in
+scrape_store; tab, collection in scrape_preview) gets, in data/profiles/<command>-<UTC time>/:
+
+    <stage>.pstats      cProfile of the stage's own thread: `python -m pstats <file>` or snakeviz (only one
+                        cProfile can be active per process on Python 3.12+, so of the stages running at the
+                        same time only the first to start is cProfiled; the others rely on their .collapsed)
+    <stage>.collapsed   sampled stacks of every thread working for the stage, one `frame;frame;... count`
+                        line per stack (flamegraph.pl, speedscope, inferno). Unlike cProfile, this includes
+                        worker threads (the crawl pool) and time blocked in socket reads.
+    <stage>.memory.txt  tracemalloc peak while the stage ran and the top allocation sites it left behind
+
+Samples are attributed to a stage by thread: a stage's own thread, and threads started while it was the only
+stage running (its worker pools); everything else (the main thread waiting on concurrent stages, threads
+started while several stages overlap) goes to `other.collapsed`. The tracemalloc peak is process-wide, so
+stages that run at the same time (tab/queen/store) see each other's allocations; on Python 3.8, which cannot
+reset it, it is the peak since profiling started. Profiling slows the run,
+tracemalloc most of all, so compare timings between profiled runs only.
+"""
+import argparse
+import contextlib
+import cProfile
+import datetime
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+ROOT = Path(__file__).resolve().parents[1]
+PROFILES_DIR = ROOT / "data" / "profiles"
+DEFAULT_INTERVAL_MS = 5.0
+TOP_ALLOCATORS = 15
+
+
+def frame_label(frame: Any) -> str:
+    code = frame.f_code
+    return f"{Path(code.co_filename).name}:{code.co_name}"
+
+
+class Profiler:
+    def __init__(self, command: str, out_dir: Optional[Path] = None, interval_ms: float = DEFAULT_INTERVAL_MS) -> None:
+        stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self.out_dir = Path(out_dir) if out_dir else PROFILES_DIR / f"{command}-{stamp}"
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.interval = max(0.0005, interval_ms / 1000)
+        self.lock = threading.Lock()
+        self.active: Dict[int, str] = {}  # thread ident -> stage running on it
+        # Threads by object, not ident: idents of finished threads are reused by new ones
+        self.owners: Dict[threading.Thread, str] = {}  # thread -> stage that was running alone when it appeared
+        self.known: Set[threading.Thread] = set(threading.enumerate())
+        self.busy: Set[int] = set()  # stage threads writing their profile (not sampled)
+        self.cprofiled = ""  # stage holding the process's one cProfile (Python 3.12+ allows no second)
+        self.samples: Dict[str, Counter] = {}
+        self.report: List[str] = []
+        self.stopped = threading.Event()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(1)
+        self.sampler = threading.Thread(target=self._sample, name="stage-profiler", daemon=True)
+        self.sampler.start()
+
+    def _sample(self) -> None:
+        me = threading.get_ident()
+        while not self.stopped.wait(self.interval):
+            with self.lock:
+                if not self.active:
+                    continue
+                active = dict(self.active)
+            threads = {thread.ident: thread for thread in threading.enumerate()}
+            running = set(active.values())
+            with self.lock:
+                for ident, thread in threads.items():
+                    if thread not in self.known:
+                        self.known.add(thread)
+                        if len(running) == 1 and ident not in active:
+                            self.owners[thread] = next(iter(running))
+                busy = set(self.busy)
+            for ident, frame in sys._current_frames().items():
+                if ident == me or ident in busy:
+                    continue
+                thread = threads.get(ident)
+                stage = active.get(ident) or (self.owners.get(thread) if thread is not None else None) or "(other)"
+                stack = []
+                while frame is not None:
+                    stack.append(frame_label(frame))
+                    frame = frame.f_back
+                stack.append(thread.name if thread is not None else str(ident))
+                with self.lock:
+                    self.samples.setdefault(stage, Counter())[";".join(reversed(stack))] += 1
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """cProfile this thread and track memory while the block runs as stage `name`."""
+        ident = threading.get_ident()
+        with self.lock:
+            self.active[ident] = name
+        before = tracemalloc.take_snapshot()
+        if hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+            tracemalloc.reset_peak()
+        profile = self._start_cprofile(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            wall = time.perf_counter() - started
+            with self.lock:
+                self.active.pop(ident, None)
+                self.busy.add(ident)
+                if profile is not None:
+                    self.cprofiled = ""
+            try:
+                _, peak = tracemalloc.get_traced_memory()
+                self._write_stage(name, profile, wall, peak, before, tracemalloc.take_snapshot())
+            finally:
+                with self.lock:
+                    self.busy.discard(ident)
+
+    def _start_cprofile(self, name: str) -> Optional[cProfile.Profile]:
+        """An enabled cProfile for stage `name`, or None while another stage (or another profiler) holds it."""
+        with self.lock:
+            if self.cprofiled:
+                return None
+            self.cprofiled = name
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # "Another profiling tool is already active" (a debugger, coverage)
+            with self.lock:
+                self.cprofiled = ""
+            return None
+        return profile
+
+    def _write_stage(self, name: str, profile: Optional[cProfile.Profile], wall: float, peak: int, before: Any, after: Any) -> None:
+        if profile is not None:
+            profile.dump_stats(str(self.out_dir / f"{name}.pstats"))
+        own = (tracemalloc.__file__, __file__)
+        growth = [s for s in after.compare_to(before, "lineno") if s.size_diff > 0 and s.traceback[0].filename not in own]
+        lines = [f"stage {name}: wall {wall:.2f}s, tracemalloc peak {peak / 1048576:.1f} MiB", "", "top allocation sites (net growth):"]
+        for stat in growth[:TOP_ALLOCATORS]:
+            frame = stat.traceback[0]
+            lines.append(f"{stat.size_diff / 1024:>10.1f} KiB {stat.count_diff:>+8} blocks  {frame.filename}:{frame.lineno}")
+        (self.out_dir / f"{name}.memory.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        if profile is not None:
+            stats = pstats.Stats(profile)
+            hottest = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:3]  # by own (tottime) time
+            top = ", ".join(f"{Path(file).name}:{func} {tottime:.2f}s" for (file, _, func), (_, _, tottime, _, _) in hottest)
+        else:
+            top = f"(not cProfiled: overlapped another stage; see {name}.collapsed)"
+        with self.lock:
+            self.report.append(f"{name:<10}{wall:>8.2f}s {peak / 1048576:>8.1f} MiB  {top or '-'}")
+
+    def close(self) -> None:
+        """Stop sampling, write the collapsed stacks and print where each stage's time went."""
+        self.stopped.set()
+        self.sampler.join()
+        with self.lock:
+            samples = dict(self.samples)
+            report = list(self.report)
+        for stage, stacks in samples.items():
+            lines = [f"{stack} {count}" for stack, count in stacks.most_common()]
+            (self.out_dir / f"{stage.strip('()')}.collapsed").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        print(f"[INFO] Profiles written to {self.out_dir}")
+        print(f"{'stage':<10}{'wall':>9} {'peak':>12}  hottest functions (own time, stage thread)")
+        for line in report:
+            print(line)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="cProfile, sampled stacks and tracemalloc per stage, written to data/profiles/ (slows the run)",
+    )
+    parser.add_argument(
+        "--profile-interval",
+        type=float,
+        default=DEFAULT_INTERVAL_MS,
+        metavar="MS",
+        help=f"Stack sampling interval for --profile (default: {DEFAULT_INTERVAL_MS:g} ms)",
+    )
+
+
+def from_args(command: str, args: argparse.Namespace) -> Optional[Profiler]:
+    return Profiler(command, interval_ms=args.profile_interval) if args.profile else None
+
+
+def stage(profiler: Optional[Profiler], name: str) -> Any:
+    """`profiler.stage(name)`, or a no-op context when not profiling."""
+    return profiler.stage(name) if profiler is not None else contextlib.nullcontext()
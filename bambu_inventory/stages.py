@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Small dependency-aware stage runner for the sync pipeline.
+
+A Stage names the stages it needs; `StageRunner.run()` starts every stage as soon as its dependencies have
+finished, so independent stages (the tab fetch, the Queen README and the local store index in
+sync_all_data.py) run concurrently. Each stage function gets the results of its dependencies by name and a
+`threading.Event` that the runner sets when it abandons the stage.
+
+- Per-stage timeouts: a stage that runs longer than `timeout` seconds is abandoned. It runs in a daemon thread,
+  so a hung request cannot keep the process alive, and its cancel event is set so it can stop early.
+- Commits: an abandoned stage's thread may still finish later, so a stage should not persist anything itself.
+  It returns what it fetched, and its `commit` (save to the catalog, journal it) runs in the runner's thread,
+  and only for a stage that finished in time. What commit returns becomes the stage's result.
+- Fallbacks: when a stage raises or times out, its `fallback` (typically the last good output cached on disk)
+  supplies the result and the pipeline continues; without one, nothing new is started and `run()` raises
+  StageError.
+- Every stage's status (ok / fallback / failed / skipped / abandoned) and wall time is kept in `runner.outcomes`.
+- `around(name)`, when given, is a context manager entered around each stage function in its own thread
+  (run_metrics.RunMetrics.stage times it there).
+
+`python scripts/stages.py --check` times a stage out and checks that its late result is never committed.
+"""
+import argparse
+import contextlib
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Sequence, Tuple
+
+Results = Dict[str, Any]
+
+
+class StageError(RuntimeError):
+    pass
+
+
+class StageTimeout(TimeoutError):
+    pass
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    # run(results of the deps, cancel event) -> value
+    run: Callable[[Results, threading.Event], Any]
+    deps: Tuple[str, ...] = ()
+    timeout: Optional[float] = None
+    # commit(value) -> result; runs in the runner's thread once the stage finished in time
+    commit: Optional[Callable[[Any], Any]] = None
+    # fallback(results of the deps, error) -> result; may raise to give up
+    fallback: Optional[Callable[[Results, BaseException], Any]] = None
+
+
+@dataclass
+class Outcome:
+    status: str = "pending"
+    seconds: float = 0.0
+    error: str = ""
+    started: float = field(default=0.0, repr=False)
+
+
+class StageRunner:
+    def __init__(self, stages: Sequence[Stage], around: Optional[Callable[[str], ContextManager[Any]]] = None) -> None:
+        self.around = around
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Stage names must be unique")
+        for stage in stages:
+            unknown = [dep for dep in stage.deps if dep not in self.stages]
+            if unknown:
+                raise ValueError(f"Stage {stage.name!r} depends on unknown stages: {', '.join(unknown)}")
+        self._check_acyclic()
+        self.outcomes: Dict[str, Outcome] = {name: Outcome() for name in self.stages}
+        self.results: Results = {}
+        self.cancel: Dict[str, threading.Event] = {name: threading.Event() for name in self.stages}
+
+    def _check_acyclic(self) -> None:
+        done: set = set()
+        remaining = dict(self.stages)
+        while remaining:
+            ready = [name for name, stage in remaining.items() if all(dep in done for dep in stage.deps)]
+            if not ready:
+                raise ValueError(f"Stage dependencies form a cycle: {', '.join(sorted(remaining))}")
+            for name in ready:
+                done.add(name)
+                del remaining[name]
+
+    def _start(self, stage: Stage, finished: "queue.Queue[Tuple[str, bool, Any]]") -> None:
+        inputs = {dep: self.results[dep] for dep in stage.deps}
+        cancel = self.cancel[stage.name]
+
+        def target() -> None:
+            try:
+                with self.around(stage.name) if self.around else contextlib.nullcontext():
+                    value = stage.run(inputs, cancel)
+                finished.put((stage.name, True, value))
+            except BaseException as exc:  # noqa: BLE001
+                finished.put((stage.name, False, exc))
+
+        self.outcomes[stage.name].status = "running"
+        self.outcomes[stage.name].started = time.monotonic()
+        threading.Thread(target=target, name=f"stage-{stage.name}", daemon=True).start()
+
+    def _settle(self, name: str, ok: bool, value: Any) -> None:
+        """Record a finished (or timed-out) stage, applying its fallback on failure."""
+        stage = self.stages[name]
+        outcome = self.outcomes[name]
+        outcome.seconds = time.monotonic() - outcome.started
+        if ok and stage.commit is not None:
+            try:
+                value = stage.commit(value)
+            except Exception as exc:  # noqa: BLE001
+                ok, value = False, exc
+        if ok:
+            outcome.status = "ok"
+            self.results[name] = value
+            return
+        outcome.error = f"{type(value).__name__}: {value}"
+        if stage.fallback is not None:
+            try:
+                self.results[name] = stage.fallback({dep: self.results[dep] for dep in stage.deps}, value)
+            except Exception as exc:  # noqa: BLE001
+                outcome.error += f"; fallback failed: {type(exc).__name__}: {exc}"
+            else:
+                outcome.status = "fallback"
+                print(f"[WARN] Stage {name} failed ({outcome.error}); using its last good cached output.")
+                return
+        outcome.status = "failed"
+
+    def run(self) -> Results:
+        finished: "queue.Queue[Tuple[str, bool, Any]]" = queue.Queue()
+        pending = dict(self.stages)
+        running: Dict[str, float] = {}  # name -> deadline (inf without a timeout)
+        failed: List[str] = []
+        while (pending or running) and not failed:
+            for name, stage in list(pending.items()):
+                if all(self.outcomes[dep].status in ("ok", "fallback") for dep in stage.deps):
+                    del pending[name]
+                    self._start(stage, finished)
+                    running[name] = time.monotonic() + stage.timeout if stage.timeout else float("inf")
+            wait = min(running.values()) - time.monotonic()
+            try:
+                name, ok, value = finished.get(timeout=None if wait == float("inf") else max(wait, 0.0))
+            except queue.Empty:
+                now = time.monotonic()
+                for name in [n for n, deadline in running.items() if deadline <= now]:
+                    del running[name]
+                    self.cancel[name].set()
+                    self._settle(name, False, StageTimeout(f"no result after {self.stages[name].timeout:g}s"))
+                    if self.outcomes[name].status == "failed":
+                        failed.append(name)
+                continue
+            if name not in running:
+                continue  # finished after its timeout was already handled
+            del running[name]
+            self._settle(name, ok, value)
+            if self.outcomes[name].status == "failed":
+                failed.append(name)
+        # After a failure nothing new starts; stages still running are abandoned (daemon threads)
+        for name in pending:
+            self.outcomes[name].status = "skipped"
+        for name in running:
+            self.outcomes[name].status = "abandoned"
+            self.cancel[name].set()
+        if failed:
+            errors = "; ".join(f"{name}: {self.outcomes[name].error}" for name in failed)
+            raise StageError(f"Stage failed: {errors}")
+        return self.results
+
+    def summary(self) -> str:
+        parts = []
+        for name, outcome in self.outcomes.items():
+            note = "" if outcome.status == "ok" else f" {outcome.status}"
+            parts.append(f"{name} {outcome.seconds:.2f}s{note}")
+        return ", ".join(parts)
+
+
+def check() -> int:
+    """A stage that outlives its timeout is cancelled, falls back, and its late result is never committed."""
+    committed: List[str] = []
+    failures: List[str] = []
+
+    def commit(name: str) -> Callable[[Any], Any]:
+        def apply(value: Any) -> Any:
+            if value == "broken":
+                raise RuntimeError("commit failed")
+            committed.append(name)
+            return f"{value} (committed)"
+
+        return apply
+
+    def late(results: Results, cancel: threading.Event) -> str:
+        time.sleep(0.3)
+        return "late"
+
+    runner = StageRunner(
+        [
+            Stage("fast", lambda r, c: "fresh", commit=commit("fast")),
+            Stage("slow", late, timeout=0.05, commit=commit("slow"), fallback=lambda r, e: "cached"),
+            Stage("broken", lambda r, c: "broken", commit=commit("broken"), fallback=lambda r, e: "cached"),
+            Stage("after", lambda r, c: f"after {r['slow']}", deps=("slow",), commit=commit("after")),
+        ]
+    )
+    results = runner.run()
+    time.sleep(0.5)  # let the abandoned stage finish
+    expected = {"fast": "fresh (committed)", "slow": "cached", "broken": "cached", "after": "after cached (committed)"}
+    if results != expected:
+        failures.append(f"results {results}, expected {expected}")
+    if sorted(committed) != ["after", "fast"]:
+        failures.append(f"committed {sorted(committed)}, expected ['after', 'fast']")
+    if not runner.cancel["slow"].is_set() or runner.cancel["fast"].is_set():
+        failures.append("only the timed-out stage should be cancelled")
+    statuses = {name: outcome.status for name, outcome in runner.outcomes.items()}
+    if statuses != {"fast": "ok", "slow": "fallback", "broken": "fallback", "after": "ok"}:
+        failures.append(f"statuses {statuses}")
+    for failure in failures:
+        print(f"[ERROR] {failure}")
+    if not failures:
+        print("[INFO] Timed-out stage cancelled and fell back; its late result was not committed.")
+    return 1 if failures else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Stage runner for the sync pipeline.")
+    parser.add_argument("--check", action="store_true", help="Time out a stage and check its late result is dropped")
+    args = parser.parse_args()
+    if args.check:
+        return check()
+    parser.print_help()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Diff-based push of the Store Index tab (Apps Script action `patchStoreIndex`, see src/code.gs).
+
+Instead of posting the whole union for `uploadStoreIndex` (clearContents + rewrite, which re-evaluates every
+=IMAGE()/=HYPERLINK() cell), the union is diffed against the tab rows fetched at the start of the run:
+- updates: rows whose code is still wanted but whose name/color/variantId/productUrl/imageUrl differ
+- deletes: rows whose code is no longer in the union, blank rows and repeated codes
+- inserts: codes the tab does not have yet
+Rows are addressed by their 1-based sheet row as fetched. Apps Script refuses the patch with `error: "stale"`
+when the tab changed in between, and the caller falls back to the full upload. Both are sent with the chunked
+upload protocol in chunked_upload.py.
+
+    python scripts/store_index_patch.py --check    # run code.gs against the SpreadsheetApp mock (needs node)
+"""
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .chunked_upload import upload
+
+ROOT = Path(__file__).resolve().parents[1]
+MOCK_JS = ROOT / "src" / "spreadsheet_mock.js"
+SHEET_NAME = "Store Index"
+HEADERS = ["Code", "Name", "Color", "VariantId", "Image", "ProductUrl", "ImageUrl"]
+# record key -> tab column compared for it (the Code/Image formulas are derived from productUrl/imageUrl)
+COMPARED = {"code": "Code", "name": "Name", "color": "Color", "variantId": "VariantId", "productUrl": "ProductUrl", "imageUrl": "ImageUrl"}
+
+
+def cell(value: Any) -> str:
+    """Tab cell or record value as compared text (numbers as the sheet shows them; image objects as empty)."""
+    if value is None or isinstance(value, (dict, list)):
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def diff_store_index(tab_rows: List[Dict[str, Any]], records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Patch turning the fetched tab rows into `records` (uploadStoreIndex payload records); None-free, JSON-ready."""
+    wanted: Dict[str, Dict[str, Any]] = {}
+    for rec in records:
+        wanted.setdefault(cell(rec.get("code")), rec)
+    updates: List[Dict[str, Any]] = []
+    deletes: List[Dict[str, Any]] = []
+    seen = set()
+    for i, row in enumerate(tab_rows):
+        sheet_row = i + 2  # row 1 holds the headers
+        code = cell(row.get("Code"))
+        if not code or code in seen or code not in wanted:
+            deletes.append({"row": sheet_row, "code": code})
+            continue
+        seen.add(code)
+        rec = wanted[code]
+        if any(cell(row.get(column)) != cell(rec.get(key)) for key, column in COMPARED.items()):
+            updates.append({"row": sheet_row, "record": rec})
+    inserts = [rec for code, rec in wanted.items() if code and code not in seen]
+    return {"expectedRows": len(tab_rows), "updates": updates, "deletes": deletes, "inserts": inserts}
+
+
+def is_empty(patch: Dict[str, Any]) -> bool:
+    return not (patch["updates"] or patch["deletes"] or patch["inserts"])
+
+
+def describe(patch: Dict[str, Any]) -> str:
+    return f"{len(patch['updates'])} updates, {len(patch['deletes'])} deletes, {len(patch['inserts'])} inserts"
+
+
+def patchable(tab_rows: List[Dict[str, Any]]) -> bool:
+    """The fetched tab has the columns the patch addresses (otherwise only a full upload fixes it)."""
+    return bool(tab_rows) and all(header in tab_rows[0] for header in HEADERS)
+
+
+def push_patch(push_url: str, patch: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Send the patch (chunked, see chunked_upload.py); returns the Apps Script reply, or None when the tab is stale."""
+    body = upload(push_url, {"action": "patchStoreIndex", **patch})
+    if body.get("error") == "stale":
+        print(f"[WARN] Store Index changed since it was fetched ({body.get('reason', '')}); falling back to a full upload.")
+        return None
+    if not body.get("ok"):
+        raise RuntimeError(f"patchStoreIndex failed: {body}")
+    return body
+
+
+# --- Mock harness ---
+def run_mock(sheet: List[List[Any]], requests: List[Any]) -> Dict[str, Any]:
+    """Run code.gs under src/spreadsheet_mock.js with a Store Index tab holding `sheet`."""
+    proc = subprocess.run(
+        ["node", str(MOCK_JS)],
+        input=json.dumps({"sheets": {SHEET_NAME: sheet}, "requests": requests}),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(proc.stdout)
+
+
+def sample_records(count: int = 40) -> List[Dict[str, str]]:
+    """Store Index payload records from data/store_index.json (or synthetic ones), sorted by code."""
+    path = ROOT / "data" / "store_index.json"
+    rows = json.loads(path.read_text(encoding="utf-8")) if path.exists() else []
+    records = [
+        {
+            "code": cell(r.get("code")),
+            "name": r.get("name") or "",
+            "color": r.get("color") or "",
+            "variantId": r.get("variantId") or "",
+            "imageUrl": r.get("imageUrl") or "",
+            "productUrl": r.get("productUrl") or "",
+        }
+        for r in rows[:count]
+    ]
+    records += [
+        {"code": str(90000 + i), "name": "PLA Basic", "color": f"Color {i}", "variantId": f"A00-X{i}", "imageUrl": "", "productUrl": ""}
+        for i in range(count - len(records))
+    ]
+    return sorted(records, key=lambda r: int(r["code"]) if r["code"].isdigit() else 0)
+
+
+def check() -> int:
+    """Old tab -> patch and full upload under the mock must give the same rows; the patch must write fewer formulas."""
+    if not shutil.which("node"):
+        print("[ERROR] node is required for the SpreadsheetApp mock (src/spreadsheet_mock.js).")
+        return 1
+    wanted = sample_records()
+    # Mix plain codes (no productUrl: a number cell in Sheets) with =HYPERLINK() ones (text), among the kept rows
+    # and the inserts, which the mock sorts apart the way Sheets does
+    for i in (2, 5, 12, 21, 22):
+        wanted[i]["productUrl"] = ""
+    old = [dict(r) for r in wanted]
+    old[3]["color"] = "Old color"
+    old[7]["productUrl"] = ""
+    old[8]["imageUrl"] = "https://cdn.example/old.png"
+    del old[30]
+    del old[20:23]  # codes the tab is missing -> inserts, in two gaps
+    old.insert(10, {"code": "99999", "name": "Retired", "color": "", "variantId": "", "imageUrl": "", "productUrl": ""})
+    old.append(dict(old[0]))  # repeated code
+    seeded = run_mock([], [{"action": "uploadStoreIndex", "records": old}, "GET"])
+    old_sheet = seeded["sheets"][SHEET_NAME]
+    old_sheet.insert(15, [""] * len(HEADERS))  # blank row inside the data
+    tab_rows = run_mock(old_sheet, ["GET"])["responses"][0]
+
+    failures = 0
+    patch = diff_store_index(tab_rows, wanted)
+    print(f"Patch: {describe(patch)} for {len(tab_rows)} tab rows")
+    patched = run_mock(old_sheet, [{"action": "patchStoreIndex", **patch}])
+    full = run_mock(old_sheet, [{"action": "uploadStoreIndex", "records": wanted}])
+    if patched["responses"][0].get("ok") is not True:
+        print(f"FAIL: patch rejected: {patched['responses'][0]}")
+        failures += 1
+    if patched["sheets"][SHEET_NAME] != full["sheets"][SHEET_NAME]:
+        print("FAIL: patched tab differs from the full upload")
+        failures += 1
+    p_calls, f_calls = patched["calls"], full["calls"]
+    print(
+        f"Formula cells written: patch {p_calls['formulasWritten']} vs full upload {f_calls['formulasWritten']} "
+        f"(cells {p_calls['cellsWritten']} vs {f_calls['cellsWritten']}; patch used {p_calls['setValues']} setValues, "
+        f"{p_calls['deleteRows']} deleteRows, {p_calls['insertRows']} insertRows, {p_calls['sort']} sort)"
+    )
+    if p_calls["formulasWritten"] >= f_calls["formulasWritten"]:
+        print("FAIL: patch did not write fewer formula cells")
+        failures += 1
+    if not is_empty(diff_store_index(run_mock(full["sheets"][SHEET_NAME], ["GET"])["responses"][0], wanted)):
+        print("FAIL: diff of an up-to-date tab is not empty")
+        failures += 1
+
+    # A tab edited after the fetch must be refused untouched
+    edited = [line[:] for line in old_sheet]
+    edited.insert(2, ["12345", "Manual", "", "", "", "", ""])
+    stale = run_mock(edited, [{"action": "patchStoreIndex", **patch}])
+    if stale["responses"][0].get("error") != "stale" or stale["sheets"][SHEET_NAME] != edited:
+        print(f"FAIL: stale patch was not refused: {stale['responses'][0]}")
+        failures += 1
+    if failures:
+        return 1
+    print("OK: patch result matches the full upload; stale tabs are refused.")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Diff-based Store Index push.")
+    parser.add_argument("--check", action="store_true", help="Check patchStoreIndex in src/code.gs against the SpreadsheetApp mock")
+    parser.add_argument("--tab", type=Path, help="Fetched tab JSON to diff (default: the catalog's tab source)")
+    parser.add_argument("--records", type=Path, help="uploadStoreIndex records JSON to diff against the tab")
+    args = parser.parse_args()
+    if args.check:
+        return check()
+    if not args.records:
+        parser.error("--records is required unless --check is given")
+    if args.tab:
+        tab_rows = json.loads(args.tab.read_text(encoding="utf-8"))
+    else:
+        from .catalog_db import load_source
+
+        tab_rows = load_source("tab")
+    patch = diff_store_index(tab_rows, json.loads(args.records.read_text(encoding="utf-8")))
+    print(json.dumps(patch, indent=2, ensure_ascii=False))
+    print(describe(patch), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
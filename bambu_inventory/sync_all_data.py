@@ -0,0 +1,1117 @@
+#!/usr/bin/env python3
+"""
+Sync all filament data sources (tab, store, Queen README), merge into union, update outputs, and push to tab (Google Sheet) via Apps Script Web App.
+
+Outputs:
+- data/filament.json (structured payload)
+- data/filament.csv (sheet-friendly flat table)
+- arduino/RFID_Bambu_reader_TFT_weight/materials.json (compact, one object per line, for SPIFFS)
+- All three are written from one pass over the output rows (artifacts.py).
+- Updates the tab (store_index) in Google Sheets with any missing codes from the union.
+- Source and merged rows are stored in the SQLite catalog (data/catalog.sqlite3, see catalog_db.py).
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from .artifacts import CollectSink, CsvSink, JsonArraySink, Manifest, Sink, fan_out, summarize
+from .bulk_products import fetch_bulk_products, load_bulk_products, map_bulk_products
+from .catalog_db import Catalog, has_source, load_source, save_source
+from .chunked_upload import upload
+from .common import LOG_LEVELS, ROW_FIELDS, SECRETS_ENV, clean_code, debug_enabled, load_local_env, normalize_product_url, set_log_level
+from .common import normalize_tab_row as normalize_row
+from .crawl_journal import CrawlJournal
+from .crawler import DEFAULT_CONCURRENCY, DEFAULT_RPS, CrawlResult, RetryQueue, crawl
+from .fast_extract import extract_hrefs, iter_scripts
+from .fetch_queengooborg_readme import parse_changed_readme, readme_sha256, save_queen_json
+from .materials_index import MATERIALS_IDX, MaterialsIndexSink
+from .merge_policy import ConflictReport, Fill, MergePolicy, SourceColumns
+from .merge_state import MergeState, fingerprint, row_fingerprints
+from .store_index_patch import describe, diff_store_index, is_empty, patchable, push_patch
+from . import http_cache
+from . import http_client
+from . import http_fixtures
+from . import stage_profile
+from .http_cache import cached_get
+from .scrape_preview import extract_variant_from_url, parse_collection_property_ids
+from .run_metrics import RunMetrics
+from .stages import Stage, StageError, StageRunner
+
+ROOT = Path(__file__).resolve().parents[1]
+TAB_JSON = ROOT / "data" / "store_index_tab.json"
+QUEEN_JSON = ROOT / "data" / "queengooborg.json"
+QUEEN_INDEX_JSON = ROOT / "data" / "queen_index.json"
+FILAMENT_JSON = ROOT / "data" / "filament.json"
+FILAMENT_CSV = ROOT / "data" / "filament.csv"
+FILAMENT_FIELDS = ["code", "name", "color", "material", "variantid", "producturl", "imageurl"]
+# Canonical key order of filament.json rows (the order the merge has always produced)
+FILAMENT_JSON_KEYS = ("code", "name", "color", "variantid", "image", "producturl", "imageurl", "material")
+MATERIALS_JSON = ROOT / "arduino" / "RFID_Bambu_reader_TFT_weight" / "materials.json"
+# materials.json key read by the firmware (materials_json_loader.h) -> output row key
+MATERIALS_COLUMNS = {"material": "material", "color": "color", "filamentCode": "code", "variantId": "variantid"}
+README_URL = "https://raw.githubusercontent.com/queengooborg/Bambu-Lab-RFID-Library/main/README.md"
+STORE_BASE = os.environ.get("STORE_BASE", "https://store.bambulab.com")
+# Comma-separated list of regional stores to crawl in parallel; the first one wins cross-region conflicts.
+STORE_BASES = [b.strip() for b in os.environ.get("STORE_BASES", STORE_BASE).split(",") if b.strip()]
+COLLECTION_PATH = os.environ.get("STORE_COLLECTION_PATH", "/collections/bambu-lab-3d-printer-filament")
+COLLECTION_URL = f"{STORE_BASE.rstrip('/')}{COLLECTION_PATH}"
+# Seconds before a pipeline stage is abandoned for its cached fallback (0 = no limit); see pipeline_stages()
+STAGE_TIMEOUTS = {"tab": 120.0, "queen": 120.0, "store": 60.0, "crawl": 0.0}
+# Tags merge_regions puts on scraped store rows; they stay in the crawl journal, not in the merged catalog
+REGION_KEYS = ("region", "regions")
+
+
+def fetch_tab() -> List[Dict[str, str]]:
+    fetch_url = os.environ.get("WEB_APP_URL")
+    print("[INFO] Fetching tab from Apps Script...")
+    if not fetch_url:
+        raise RuntimeError("WEB_APP_URL is not set; populate scripts/secret.env")
+    params = {"action": "fetchStoreIndex"}
+    resp = http_client.get(fetch_url, params=params)
+    resp.raise_for_status()
+    data = resp.json()
+    print(f"[INFO] Tab fetched: {len(data)} rows.")
+    return data
+
+
+@dataclass(frozen=True)
+class QueenFetch:
+    index: Dict[str, Dict[str, str]]
+    # README sha256 when the index was built by this fetch ("" = reused from data/queen_index.json)
+    digest: str = ""
+    # Rows parsed from a changed README, for the catalog (None = README unchanged)
+    records: Optional[List[Dict[str, str]]] = None
+
+
+def fetch_queen() -> QueenFetch:
+    """
+    Queen index for merge_sources, cached in data/queen_index.json by README sha256: an unchanged README
+    skips the table parse, the queengooborg.json rewrite and the index build. Nothing is written here;
+    save_queen() persists what the fetch built.
+    """
+    print(f"[INFO] Fetching Queen README from {README_URL} ...")
+    resp = cached_get(README_URL)
+    resp.raise_for_status()
+    readme_text = resp.text
+    digest = readme_sha256(readme_text)
+    cached = load_queen_index(digest)
+    if cached is not None:
+        print(f"[INFO] Queen README unchanged (sha256 {digest[:12]}); reusing {len(cached)} indexed codes.")
+        return QueenFetch(cached)
+    records = parse_changed_readme(readme_text)
+    if records is not None:
+        print(f"[INFO] Queen README parsed: {len(records)} records.")
+    return QueenFetch(build_queen_index(load_source("queen") if records is None else records), digest, records)
+
+
+def save_queen(fetched: QueenFetch) -> Dict[str, Dict[str, str]]:
+    """Write the rows and index a fetch_queen() built (catalog queen source, queen_index.json); returns the index."""
+    if fetched.records is not None:
+        save_queen_json(fetched.records, fetched.digest, QUEEN_JSON)
+    if fetched.digest:
+        QUEEN_INDEX_JSON.write_text(
+            json.dumps({"sha256": fetched.digest, "codes": fetched.index}, ensure_ascii=False), encoding="utf-8"
+        )
+    return fetched.index
+
+
+def load_queen_index(digest: Optional[str] = None) -> Optional[Dict[str, Dict[str, str]]]:
+    """The persisted Queen index, or None when missing/unreadable or built from a README with another hash."""
+    try:
+        data = json.loads(QUEEN_INDEX_JSON.read_text(encoding="utf-8"))
+    except Exception:  # noqa: BLE001
+        return None
+    if digest is not None and data.get("sha256") != digest:
+        return None
+    return data.get("codes")
+
+
+def fetch_html(url: str, retries: int = 2, delay: float = 1.0) -> str:
+    for attempt in range(retries + 1):
+        try:
+            resp = cached_get(url)
+            if resp.status_code == 429:
+                print(f"[ERROR] 429 Too Many Requests for {url}")
+            resp.raise_for_status()
+            return resp.text
+        except requests.exceptions.HTTPError as e:
+            if hasattr(e.response, 'status_code') and e.response.status_code == 429:
+                print(f"[ERROR] 429 Too Many Requests for {url}")
+            if attempt >= retries:
+                raise
+            time.sleep(delay)
+        except Exception:
+            if attempt >= retries:
+                raise
+            time.sleep(delay)
+
+
+def collection_url(store_base: str) -> str:
+    return f"{store_base.rstrip('/')}{COLLECTION_PATH}"
+
+
+def region_of(store_base: str) -> str:
+    """Short region tag from the store host: us.store.bambulab.com -> "us", store.bambulab.com -> "global"."""
+    label = urlparse(store_base).netloc.split(".")[0].lower()
+    return "global" if label in ("", "store", "www") else label
+
+
+def parse_collection_products(html: str, store_base: Optional[str] = None) -> List[str]:
+    links: Set[str] = set()
+    for href in extract_hrefs(html):
+        if "/products/" not in href:
+            continue
+        # Only keep product links that have a variant/id query param (not just the heading page)
+        if ("?variant=" not in href and "?id=" not in href):
+            url = normalize_product_url(href.split("?")[0], store_base)
+            # Skip known multi-filament/bundle pages that will never be in queen readme
+            if "beginner-s-filament-pack" in url or "bundle" in url:
+                pass  # skip bundle/multi-filament page silently
+            else:
+                pass  # skip heading/parent product page silently
+            continue
+        url = normalize_product_url(href.split("?")[0], store_base)
+        links.add(url)
+    return sorted(links)
+
+
+def parse_product_variants(html: str) -> List[Dict[str, str]]:
+    variants: List[Dict[str, str]] = []
+
+    # Shopify embeds variant JSON in a script tag with "variants" key.
+    for text in iter_scripts(html):
+        if "variants" not in text or "product" not in text:
+            continue
+        match = re.search(r"product\s*=\s*(\{.*?\});", text, re.DOTALL)
+        if not match:
+            continue
+        try:
+            product_data = json.loads(match.group(1))
+        except Exception:  # noqa: BLE001
+            continue
+        for variant in product_data.get("variants", []):
+            code = str(variant.get("sku") or variant.get("barcode") or "").strip()
+            color = str(variant.get("title") or variant.get("option1") or "").strip()
+            image_url = ""
+            if variant.get("featured_media") and variant["featured_media"].get("src"):
+                image_url = variant["featured_media"].get("src", "")
+            if not image_url and variant.get("featured_image"):
+                image_url = variant["featured_image"].get("src", "")
+            variants.append(
+                {
+                    "code": code,
+                    "color": color,
+                    "variantid": variant.get("sku", ""),
+                    "imageurl": image_url,
+                }
+            )
+        break
+
+    return variants
+
+
+def known_variant_ids(rows: List[Dict[str, str]]) -> Set[str]:
+    """Store variant (propertyValueId) ids already recorded in tab/store rows, taken from ?variant= in productUrl."""
+    ids: Set[str] = set()
+    for r in rows:
+        vid = extract_variant_from_url(normalize_row(r).get("producturl", ""))
+        if vid:
+            ids.add(vid)
+    return ids
+
+
+def product_slug(url: str) -> str:
+    return urlparse(url).path.rstrip("/").split("/")[-1]
+
+
+def select_product_pages(product_urls: List[str], collection_html: str, known_ids: Set[str]) -> List[str]:
+    """
+    Keep only product pages whose collection-level variant ids include at least one unknown id.
+    Products the collection JSON says nothing about are kept, since we cannot tell without fetching.
+    """
+    ids_by_slug: Dict[str, Set[str]] = {}
+    for pid, seo in parse_collection_property_ids(collection_html):
+        ids_by_slug.setdefault(seo, set()).add(pid)
+    if not ids_by_slug:
+        print("[WARN] Collection page has no variant id JSON; fetching every product page.")
+        return product_urls
+    selected = []
+    for url in product_urls:
+        ids = ids_by_slug.get(product_slug(url))
+        if ids is None or ids - known_ids:
+            selected.append(url)
+    return selected
+
+
+def scrape_store_new(
+    existing_codes: Set[str],
+    known_ids: Optional[Set[str]] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rps: float = DEFAULT_RPS,
+    journal: Optional[CrawlJournal] = None,
+    store_base: str = STORE_BASE,
+    retry_queue: Optional[RetryQueue] = None,
+    cancel: Optional[threading.Event] = None,
+) -> List[Dict[str, str]]:
+    """New store rows from one store's HTML crawl. Once `cancel` is set, nothing more is journaled or crawled."""
+    region = region_of(store_base)
+    cancelled = cancel.is_set if cancel is not None else lambda: False
+    # Single-store runs keep the original journal stage name so older journals still resume.
+    collection_stage = "collection" if store_base == STORE_BASE else f"collection:{region}"
+    if journal and journal.stage_done(collection_stage):
+        product_urls = journal.stage(collection_stage).get("urls", [])
+        print(f"[INFO] [{region}] Using {len(product_urls)} product URLs from the crawl journal.")
+    else:
+        url = collection_url(store_base)
+        print(f"[INFO] [{region}] Scraping store collection: {url}")
+        collection_html = fetch_html(url)
+        product_urls = parse_collection_products(collection_html, store_base)
+        print(f"[INFO] [{region}] Found {len(product_urls)} product URLs in collection.")
+        if known_ids is not None:
+            candidates = select_product_pages(product_urls, collection_html, known_ids)
+            saved = len(product_urls) - len(candidates)
+            print(
+                f"[INFO] [{region}] Collection diff: {len(candidates)} product pages have unknown variants; "
+                f"skipping {saved} fully known pages ({saved} requests saved)."
+            )
+            product_urls = candidates
+        if journal and not cancelled():
+            journal.record_stage(collection_stage, urls=product_urls)
+
+    parsed: Dict[str, List[Dict[str, str]]] = {}
+    if journal:
+        for url in product_urls:
+            variants = journal.page_variants(url)
+            if variants is not None:
+                parsed[url] = variants
+        if parsed:
+            print(f"[INFO] [{region}] Replaying {len(parsed)} product pages from the crawl journal.")
+
+    def on_result(result: CrawlResult) -> None:
+        # Runs in the crawler's worker threads: parse and journal each page the moment it lands.
+        if result.error is not None:
+            if journal and not cancelled():
+                journal.record_page(result.url, error=str(result.error))
+            return
+        variants = parse_product_variants(result.html)
+        parsed[result.url] = variants
+        if journal and not cancelled():
+            journal.record_page(result.url, variants)
+
+    if retry_queue is None:
+        retry_queue = RetryQueue()
+    host = urlparse(store_base).netloc
+    for url in parsed:
+        retry_queue.remove(url)
+    pending = [url for url in product_urls if url not in parsed]
+    queued = [url for url in retry_queue.urls() if urlparse(url).netloc == host]
+    if queued:
+        print(f"[INFO] [{region}] Retry queue: {len(queued)} product pages left over from earlier runs will be retried.")
+    print(f"[INFO] [{region}] Crawling {len(pending)} product pages (concurrency={concurrency}, rps={rps})...")
+    results = crawl(
+        pending,
+        concurrency=concurrency,
+        rps=rps,
+        on_result=on_result,
+        retry_queue=retry_queue,
+        seed_hosts={host},
+        stop=cancel,
+    )
+    if cancelled():
+        return []
+    errors = {r.url: r for r in results if r.error is not None}
+    new_rows: List[Dict[str, str]] = []
+
+    # Pages recovered from the retry queue may not be in this run's candidate list; parse them too.
+    candidates = set(product_urls)
+    for url in product_urls + [r.url for r in results if r.url not in candidates]:
+        if url in errors:
+            result = errors[url]
+            print(f"[ERROR] Failed to fetch product page {url} after {result.attempts} attempts: {result.error}", file=sys.stderr)
+            continue
+        # Only scrape if at least one variant code is missing from existing_codes
+        # (i.e., not present in tab or store cache)
+        variants = parsed.get(url, [])
+        variant_codes = [clean_code(v.get("code", "")) for v in variants]
+        # If all variant codes are already present, skip scraping this product page
+        if not any(code and code not in existing_codes for code in variant_codes):
+            print(f"[INFO] Skipping product page (all variants present in tab/store): {url}")
+            continue
+        print(f"[INFO] Scraping product page: {url}")
+        new_rows.extend(new_variant_rows(variants, url, existing_codes, store_base))
+
+    failing = [url for url in retry_queue.urls() if urlparse(url).netloc == host]
+    if failing:
+        print(f"[WARN] [{region}] {len(failing)} product pages still failing; queued in {retry_queue.path} for the next run.")
+    return new_rows
+
+
+def new_variant_rows(
+    variants: List[Dict[str, str]], url: str, existing_codes: Set[str], store_base: str = STORE_BASE
+) -> List[Dict[str, str]]:
+    """Turn parsed variants into store rows for codes not seen yet; marks them as seen."""
+    rows: List[Dict[str, str]] = []
+    material_guess = ""
+    for v in variants:
+        code = clean_code(v.get("code", ""))
+        if not code or code in existing_codes:
+            continue
+        rows.append(
+            {
+                "code": code,
+                "name": "",
+                "color": v.get("color", ""),
+                "variantid": clean_variant_id(v.get("variantid", "")),
+                "imageurl": v.get("imageurl", ""),
+                "producturl": normalize_product_url(v.get("producturl") or url, store_base),
+                "material": material_guess,
+                "region": region_of(store_base),
+            }
+        )
+        existing_codes.add(code)
+    return rows
+
+
+def scrape_store_bulk(
+    existing_codes: Set[str], products_path: Optional[Path] = None, store_base: str = STORE_BASE
+) -> List[Dict[str, str]]:
+    region = region_of(store_base)
+    url = collection_url(store_base)
+    if products_path:
+        print(f"[INFO] [{region}] Loading bulk products JSON from {products_path}")
+        products = load_bulk_products(products_path)
+    else:
+        print(f"[INFO] [{region}] Fetching bulk products JSON: {url}/products.json")
+        products = fetch_bulk_products(url)
+    if not products:
+        raise RuntimeError("bulk products feed returned no products")
+    variants = map_bulk_products(products, store_base)
+    print(f"[INFO] [{region}] Bulk feed: {len(products)} products, {len(variants)} variants.")
+    return new_variant_rows(variants, url, existing_codes, store_base)
+
+
+def scrape_region(
+    store_base: str,
+    existing_codes: Set[str],
+    args: argparse.Namespace,
+    known_ids: Optional[Set[str]],
+    journal: CrawlJournal,
+    retry_queue: RetryQueue,
+    products_path: Optional[Path] = None,
+    cancel: Optional[threading.Event] = None,
+) -> List[Dict[str, str]]:
+    """New store rows from one regional store: bulk feed first, HTML crawl as the fallback."""
+    if args.ingest != "html" or products_path:
+        try:
+            return scrape_store_bulk(existing_codes, products_path, store_base)
+        except Exception as exc:  # noqa: BLE001
+            if args.ingest == "json" or products_path:
+                raise
+            print(f"[WARN] [{region_of(store_base)}] Bulk products feed unavailable ({exc}); falling back to HTML crawl.")
+    return scrape_store_new(
+        existing_codes,
+        known_ids=known_ids,
+        concurrency=args.concurrency,
+        rps=args.rps,
+        journal=journal,
+        store_base=store_base,
+        retry_queue=retry_queue,
+        cancel=cancel,
+    )
+
+
+def without_regions(row: Dict[str, str]) -> Dict[str, str]:
+    """`row` without the store-only "region"/"regions" tags, so store rows share the tab rows' schema."""
+    if not any(key in row for key in REGION_KEYS):
+        return row
+    return {key: value for key, value in row.items() if key not in REGION_KEYS}
+
+
+def merge_regions(region_rows: List[List[Dict[str, str]]]) -> List[Dict[str, str]]:
+    """
+    Union per-region rows by code, deterministically: regions are taken in configured order, the first
+    region to list a code owns the row, later regions only fill its empty fields and add to "regions".
+    """
+    merged: Dict[str, Dict[str, str]] = {}
+    regions: Dict[str, List[str]] = {}
+    for rows in region_rows:
+        for row in rows:
+            code = clean_code(row.get("code", ""))
+            if not code:
+                continue
+            if code not in merged:
+                merged[code] = dict(row)
+                regions[code] = []
+            else:
+                for key, value in row.items():
+                    if value and not merged[code].get(key):
+                        merged[code][key] = value
+            region = row.get("region", "")
+            if region and region not in regions[code]:
+                regions[code].append(region)
+    for code, row in merged.items():
+        row["regions"] = ",".join(regions[code])
+    return list(merged.values())
+
+
+def rows_by_code(rows: Iterable[Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+    """Raw rows keyed by the code normalize_row would give them (last row per code wins), without normalizing."""
+    code_keys: Dict[Tuple[str, ...], Optional[str]] = {}
+    by_code: Dict[str, Dict[str, str]] = {}
+    for row in rows:
+        keys = tuple(row)
+        if keys not in code_keys:
+            # Like normalize_row: the last key that lowercases to "code" wins; none means code "".
+            code_keys[keys] = next((k for k in reversed(keys) if k.lower() == "code"), None)
+        key = code_keys[keys]
+        by_code[str(row[key]).strip() if key is not None else ""] = row
+    return by_code
+
+
+def normalize_rows(rows: Iterable[Dict[str, str]]) -> List[Dict[str, str]]:
+    """normalize_row over many rows; rows sharing a key layout (every tab row) reuse its lowercased keys."""
+    layouts: Dict[Tuple[str, ...], Tuple[Tuple[str, ...], Dict[str, str], bool]] = {}
+    normalized: List[Dict[str, str]] = []
+    for row in rows:
+        keys = tuple(row)
+        layout = layouts.get(keys)
+        if layout is None:
+            lowered = tuple(k.lower() for k in keys)
+            missing = {field: "" for field in ROW_FIELDS if field not in lowered}
+            layout = layouts[keys] = (lowered, missing, "image" in row)
+        lowered, missing, has_image = layout
+        out = dict(zip(lowered, row.values()))
+        if missing:
+            out.update(missing)
+        out["code"] = str(out["code"]).strip()
+        if has_image and not out["imageurl"]:
+            out["imageurl"] = row["image"] if isinstance(row["image"], str) else ""
+        normalized.append(out)
+    return normalized
+
+
+def clean_variant_id(variant: str) -> str:
+    if not variant:
+        return ""
+    token = variant.split()[0]
+    token = token.split("(")[0]
+    token = token.split(",")[0]
+    token = token.strip()
+    if len(token) > 6 and re.match(r"^[A-Z0-9]{3}-", token):
+        return token[:6]
+    return token
+
+
+def build_queen_index(queen_records: List[Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+    """code -> the Queen fields merge_sources fills from (last record per code wins), variant id pre-cleaned."""
+    index: Dict[str, Dict[str, str]] = {}
+    for r in queen_records:
+        index[clean_code(str(r.get("filamentCode", "")))] = {
+            "color": r.get("color", ""),
+            "category": r.get("category", ""),
+            "variantId": r.get("variantId", ""),
+            "variantid": clean_variant_id(r.get("variantId", "")),
+        }
+    return index
+
+
+def build_store_lookup(store_records: List[Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+    lookup = {}
+    for r in store_records:
+        norm = normalize_row(r)
+        code = clean_code(norm.get("code", ""))
+        if code:
+            lookup[code] = norm
+    return lookup
+
+
+def export_sinks(json_path: Path, csv_path: Path, materials_path: Path) -> List[Sink]:
+    """Everything derived from the output rows, written by one fan_out pass (artifacts.py)."""
+
+    def save_catalog(rows: List[Dict[str, str]]) -> None:
+        with Catalog() as catalog:
+            catalog.replace("filament", rows)
+
+    return [
+        JsonArraySink(json_path, key_order=FILAMENT_JSON_KEYS),
+        CsvSink(csv_path, FILAMENT_FIELDS),
+        JsonArraySink(materials_path, MATERIALS_COLUMNS, compact=True),
+        MaterialsIndexSink(materials_path.with_name(MATERIALS_IDX.name), MATERIALS_COLUMNS),
+        CollectSink("catalog filament", save_catalog),
+    ]
+
+
+FILAMENT_POLICY = MergePolicy(
+    "filament",
+    base=("tab", "store", "queen"),
+    fields={
+        "variantid": (
+            Fill("queen", "variantid", blank=True, clean=clean_variant_id, counts="filled_variant"),
+            Fill("store", "variantid", blank=True, when="queen", clean=clean_variant_id, counts="filled_variant"),
+            Fill("queen", "variantId", blank=True, clean=clean_variant_id, counts="filled_variant"),
+        ),
+        "name": (Fill("queen", "category", blank=True),),
+        "color": (Fill("queen", "color", blank=True),),
+        "material": (Fill("queen", "category", blank=True), Fill("store", "material")),
+        "imageurl": (Fill("store", "imageurl", counts="filled_image"),),
+        "producturl": (Fill("store", "producturl", counts="filled_product"),),
+    },
+    build={"queen": ("code", "name", "color", "variantid", "imageurl", "producturl", "material")},
+    columns={"queen": {"name": "category", "material": "category", "imageurl": None, "producturl": None}},
+)
+CONFLICTS_JSON = ROOT / "data" / "merge_conflicts.json"
+
+
+def columns_from_rows(rows: Iterable[Dict[str, str]]) -> SourceColumns:
+    # normalize_row already leaves "code" as a stripped string
+    return SourceColumns({n["code"]: n for n in normalize_rows(rows)}, owned=True)
+
+
+def columns_from_lookup(lookup: Dict[str, Dict[str, str]]) -> SourceColumns:
+    return SourceColumns({clean_code(str(code)): row for code, row in lookup.items()})
+
+
+def _source_by_code(name: str, rows: Any) -> Dict[str, Dict[str, str]]:
+    """Raw rows of one merge source keyed by clean code (tab: list of rows, store/queen: code -> row)."""
+    if name == "tab":
+        return rows_by_code(rows)
+    if name == "store":
+        return {clean_code(str(code)): row for code, row in rows.items()}
+    return rows
+
+
+def merge_sources(
+    tab_rows: List[Dict[str, str]],
+    store_lookup: Dict[str, Dict[str, str]],
+    queen_index: Dict[str, Dict[str, str]],
+    state: Optional[MergeState] = None,
+    report: Optional[ConflictReport] = None,
+) -> Tuple[List[Dict[str, str]], Dict[str, int]]:
+    """
+    Union of tab, store and Queen by code, in code order, resolved by FILAMENT_POLICY: the tab row wins, then
+    the store row, then a row built from Queen; empty fields are filled from Queen (name/color/material/variantid)
+    and the store (imageurl/producturl/material). With a `report`, conflicting lower-precedence values are
+    recorded in it.
+
+    With a loaded `state`, only codes whose source rows changed since the last merge are resolved; the
+    rest are taken from the previous result, and stats count the re-resolved codes only. The state's
+    fingerprints are replaced with this run's either way.
+    """
+    previous = state.previous if state is not None else None
+    store_lookup = {code: without_regions(row) for code, row in store_lookup.items()}
+    if state is None:
+        tab = columns_from_rows(tab_rows)
+        store = columns_from_lookup(store_lookup)
+        union = tab.index.keys() | store.index.keys() | queen_index.keys()
+        all_codes = codes = sorted(union)
+    else:
+        # Fingerprint raw source rows, so unchanged ones are never normalized or put into columns. A source
+        # whose whole fingerprint matches the last run keeps its saved per-row fingerprints as they are.
+        sources = {"tab": tab_rows, "store": store_lookup, "queen": queen_index}
+        raw: Dict[str, Dict[str, Dict[str, str]]] = {}
+        whole = {name: fingerprint(rows) for name, rows in sources.items()}
+        fingerprints: Dict[str, Dict[str, int]] = {}
+        for name, rows in sources.items():
+            if previous is not None and state.sources.get(name) == whole[name]:
+                fingerprints[name] = state.fingerprints.get(name, {})
+                continue
+            raw[name] = _source_by_code(name, rows)
+            fingerprints[name] = row_fingerprints(raw[name].keys(), raw[name].values())
+        union = set().union(*(fp.keys() for fp in fingerprints.values()))
+        all_codes = codes = sorted(union)
+        if previous is not None:
+            changed = state.changed_codes(fingerprints) | (union - previous.keys())
+            codes = sorted(changed & union)
+            print(f"[INFO] Incremental merge: {len(codes)} of {len(all_codes)} codes changed; reusing the rest.")
+            state.changed = len(codes)
+        state.sources, state.fingerprints = whole, fingerprints
+        if "tab" in raw:
+            raw_tab = raw["tab"]
+        elif any(code in fingerprints["tab"] for code in codes):
+            raw_tab = rows_by_code(tab_rows)
+        else:
+            raw_tab = {}
+        raw_store = raw["store"] if "store" in raw else _source_by_code("store", store_lookup)
+        if previous is not None:
+            raw_tab = {code: raw_tab[code] for code in codes if code in raw_tab}
+            raw_store = {code: raw_store[code] for code in codes if code in raw_store}
+        tab = columns_from_rows(raw_tab.values())
+        store = SourceColumns(raw_store)
+    if debug_enabled():
+        print(f"[DEBUG] Codes: union={len(all_codes)}, resolving {len(codes)} (tab={len(tab.index)}, store={len(store.index)})")
+
+    sources = {"tab": tab, "store": store, "queen": SourceColumns(queen_index)}
+    resolution = FILAMENT_POLICY.resolve(sources, codes, conflicts=report is not None)
+    merged = resolution.rows
+    stats = {
+        "filled_variant": resolution.stats.get("filled_variant", 0),
+        "filled_image": resolution.stats.get("filled_image", 0),
+        "filled_product": resolution.stats.get("filled_product", 0),
+        "added_from_store": resolution.bases.get("store", 0),
+        # once for the new row, once in the per-source tally (as before)
+        "added_from_queen": 2 * resolution.bases.get("queen", 0),
+    }
+    if report is not None:
+        report.update(resolution)
+        report.retain(all_codes)
+    if previous is not None:
+        previous.update(zip(codes, merged))
+        merged = [previous[code] for code in all_codes]
+    return merged, stats
+
+
+def tab_stage(journal: CrawlJournal) -> List[Dict[str, str]]:
+    if journal.stage_done("tab"):
+        tab_rows = load_source("tab")
+        print(f"[INFO] Tab already fetched in this run; using the catalog copy ({len(tab_rows)} rows).")
+        return tab_rows
+    return fetch_tab()
+
+
+def commit_tab(journal: CrawlJournal, tab_rows: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Commit of the tab stage: save the fetched rows to the catalog and journal the stage."""
+    if not journal.stage_done("tab"):
+        save_source("tab", tab_rows, TAB_JSON)
+        journal.record_stage("tab", rows=len(tab_rows))
+    return tab_rows
+
+
+def cached_tab(error: BaseException) -> List[Dict[str, str]]:
+    """The tab rows saved by the last successful fetch (catalog tab source)."""
+    tab_rows = load_source("tab")
+    if not tab_rows:
+        raise RuntimeError("no cached tab rows") from error
+    return tab_rows
+
+
+def queen_stage(journal: CrawlJournal) -> QueenFetch:
+    if journal.stage_done("queen"):
+        queen_index = load_queen_index()
+        if queen_index is None:
+            queen_index = build_queen_index(load_source("queen"))
+        print(f"[INFO] Queen README already parsed in this run; using {len(queen_index)} indexed codes.")
+        return QueenFetch(queen_index)
+    return fetch_queen()
+
+
+def commit_queen(journal: CrawlJournal, fetched: QueenFetch) -> Dict[str, Dict[str, str]]:
+    """Commit of the queen stage: persist what the fetch built and journal the stage."""
+    queen_index = save_queen(fetched)
+    if not journal.stage_done("queen"):
+        journal.record_stage("queen", codes=len(queen_index))
+    return queen_index
+
+
+def cached_queen(error: BaseException) -> Dict[str, Dict[str, str]]:
+    """The last persisted Queen index, or one built from the catalog's queen source."""
+    queen_index = load_queen_index()
+    if queen_index is None:
+        queen_index = build_queen_index(load_source("queen"))
+    if not queen_index:
+        raise RuntimeError("no cached Queen rows") from error
+    return queen_index
+
+
+def store_stage() -> Tuple[List[Dict[str, str]], Dict[str, Dict[str, str]]]:
+    store_records = load_source("store")
+    return store_records, build_store_lookup(store_records)
+
+
+def crawl_stage(
+    args: argparse.Namespace,
+    journal: CrawlJournal,
+    tab_rows: List[Dict[str, str]],
+    store_records: List[Dict[str, str]],
+    store_lookup: Dict[str, Dict[str, str]],
+    cancel: Optional[threading.Event] = None,
+) -> List[Dict[str, str]]:
+    """New store rows from every configured region (or replayed from the journal on --resume); see commit_crawl()."""
+    if journal.stage_done("store"):
+        scraped_new = journal.stage("store").get("rows", [])
+        print(f"[INFO] Store stage already done in this run; replaying {len(scraped_new)} new rows from the crawl journal.")
+        return scraped_new
+    tab_codes = {clean_code(normalize_row(r).get("code", "")) for r in tab_rows}
+    existing_codes = set(store_lookup.keys()) | tab_codes
+    store_bases = list(dict.fromkeys(args.store_base or STORE_BASES))
+    known_ids = None if args.full_crawl else known_variant_ids(tab_rows + store_records)
+    products_path = Path(args.products_json) if args.products_json else None
+    retry_queue = RetryQueue()
+    # Regions are different hosts, so each gets its own rate limit and they crawl concurrently;
+    # each works on its own copy of existing_codes so a code is reported by every region carrying it.
+    with ThreadPoolExecutor(max_workers=len(store_bases)) as pool:
+        futures = [
+            pool.submit(
+                scrape_region,
+                base,
+                set(existing_codes),
+                args,
+                known_ids,
+                journal,
+                retry_queue,
+                products_path if i == 0 else None,
+                cancel,
+            )
+            for i, base in enumerate(store_bases)
+        ]
+        region_rows: List[List[Dict[str, str]]] = []
+        failed = 0
+        for base, future in zip(store_bases, futures):
+            try:
+                region_rows.append(future.result())
+            except Exception as exc:  # noqa: BLE001
+                if len(store_bases) == 1:
+                    raise
+                failed += 1
+                region_rows.append([])
+                print(f"[ERROR] [{region_of(base)}] Store scrape failed: {exc}", file=sys.stderr)
+    if failed == len(store_bases):
+        raise RuntimeError("Store scrape failed in every region")
+    scraped_new = merge_regions(region_rows)
+    if len(store_bases) > 1:
+        counts = ", ".join(f"{region_of(b)}={len(r)}" for b, r in zip(store_bases, region_rows))
+        print(f"[INFO] Regions merged: {counts} -> {len(scraped_new)} unique new rows.")
+    return scraped_new
+
+
+def commit_crawl(journal: CrawlJournal, scraped_new: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Commit of the crawl stage: journal the new rows so --resume can replay them."""
+    if not journal.stage_done("store"):
+        journal.record_stage("store", rows=scraped_new)
+    return scraped_new
+
+
+def parse_stage_timeouts(specs: Optional[List[str]]) -> Dict[str, float]:
+    timeouts = dict(STAGE_TIMEOUTS)
+    for spec in specs or []:
+        name, _, seconds = spec.partition("=")
+        if name not in timeouts or not seconds:
+            raise SystemExit(f"--stage-timeout expects one of {', '.join(timeouts)} as NAME=SECONDS, got {spec!r}")
+        timeouts[name] = float(seconds)
+    return timeouts
+
+
+def pipeline_stages(args: argparse.Namespace, journal: CrawlJournal) -> List[Stage]:
+    """
+    Fetch/crawl DAG run by main(): tab, queen and store concurrently, then the crawl. A failed or timed-out
+    live fetch falls back to its last good output: the catalog tab, the persisted Queen index, and for the
+    crawl no new rows (store_index.json as it is). The stages only fetch; their commits save the results and
+    journal them in the runner's thread, so a stage abandoned on timeout cannot write after the run moved on.
+    """
+    timeouts = parse_stage_timeouts(args.stage_timeout)
+
+    def no_new_rows(results: Dict[str, Any], error: BaseException) -> List[Dict[str, str]]:
+        return []
+
+    return [
+        Stage(
+            "tab",
+            lambda _, cancel: tab_stage(journal),
+            timeout=timeouts["tab"] or None,
+            commit=lambda rows: commit_tab(journal, rows),
+            fallback=lambda _, e: cached_tab(e),
+        ),
+        Stage(
+            "queen",
+            lambda _, cancel: queen_stage(journal),
+            timeout=timeouts["queen"] or None,
+            commit=lambda fetched: commit_queen(journal, fetched),
+            fallback=lambda _, e: cached_queen(e),
+        ),
+        Stage("store", lambda _, cancel: store_stage(), timeout=timeouts["store"] or None),
+        Stage(
+            "crawl",
+            lambda r, cancel: crawl_stage(args, journal, r["tab"], *r["store"], cancel),
+            deps=("tab", "store"),
+            timeout=timeouts["crawl"] or None,
+            commit=lambda rows: commit_crawl(journal, rows),
+            fallback=no_new_rows,
+        ),
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Fetch tab, Queen README, crawl store for new filaments, and emit filament.json/filament.csv."
+    )
+    parser.add_argument("--json-output", default=str(FILAMENT_JSON), help="Path for merged JSON (default: data/filament.json)")
+    parser.add_argument("--csv-output", default=str(FILAMENT_CSV), help="Path for merged CSV (default: data/filament.csv)")
+    parser.add_argument(
+        "--concurrency", type=int, default=DEFAULT_CONCURRENCY, help=f"Parallel product-page fetches (default: {DEFAULT_CONCURRENCY})"
+    )
+    parser.add_argument(
+        "--rps", type=float, default=DEFAULT_RPS, help=f"Max requests per second per store host, 0 = unlimited (default: {DEFAULT_RPS})"
+    )
+    parser.add_argument(
+        "--cache-ttl", type=float, default=None, help="Serve cached store/README pages younger than this many seconds without revalidating"
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk HTTP cache (data/http_cache)")
+    parser.add_argument(
+        "--full-crawl", action="store_true", help="Fetch every product page instead of only those with unknown collection variant ids"
+    )
+    parser.add_argument(
+        "--ingest",
+        choices=["auto", "json", "html"],
+        default="auto",
+        help="Store source: bulk products.json feed, per-page HTML crawl, or json with html fallback (default: auto)",
+    )
+    parser.add_argument("--products-json", default=None, help="Ingest a saved products.json file instead of the live feed (offline)")
+    parser.add_argument(
+        "--resume", action="store_true", help="Continue an interrupted run from data/crawl_journal.jsonl instead of starting over"
+    )
+    parser.add_argument("--log-http", action="store_true", help="Print method, status, latency and size for every HTTP request")
+    parser.add_argument(
+        "--full-merge",
+        action="store_true",
+        help="Re-merge every code instead of only those whose tab/store/Queen rows changed (data/merge_state.json)",
+    )
+    parser.add_argument(
+        "--full-push",
+        action="store_true",
+        help="Clear and rewrite the whole Store Index tab instead of pushing only the changed rows",
+    )
+    parser.add_argument(
+        "--stage-timeout",
+        action="append",
+        default=None,
+        metavar="NAME=SECONDS",
+        help="Per-stage timeout for tab, queen, store or crawl; 0 disables it (defaults: "
+        + ", ".join(f"{k}={v:g}" for k, v in STAGE_TIMEOUTS.items())
+        + ")",
+    )
+    parser.add_argument(
+        "--store-base",
+        action="append",
+        default=None,
+        help="Regional store to crawl; repeat for several, crawled in parallel (default: STORE_BASES or STORE_BASE)",
+    )
+    parser.add_argument("--log-level", choices=LOG_LEVELS, default=None, help="DEBUG prints the verbose code lists (default: LOG_LEVEL or INFO)")
+    parser.add_argument("--metrics", default=None, help="Run metrics JSON (default: data/metrics/sync-<UTC time>.json)")
+    http_fixtures.add_arguments(parser)
+    stage_profile.add_arguments(parser)
+    args = parser.parse_args()
+
+    load_local_env(SECRETS_ENV)
+    set_log_level(args.log_level)
+    http_cache.configure(ttl=args.cache_ttl, disable=args.no_cache)
+    http_fixtures.configure(record=args.record, replay=args.replay, latency=args.replay_latency)
+    if args.log_http:
+        http_client.add_timing_hook(http_client.log_timing)
+
+    profiler = stage_profile.from_args("sync", args)
+    metrics = RunMetrics("sync", profiler)
+    try:
+        return run_sync(args, metrics)
+    finally:
+        path = metrics.write(Path(args.metrics) if args.metrics else None)
+        print(f"[INFO] Run metrics written to {path}")
+        print(metrics.table())
+        if profiler is not None:
+            profiler.close()
+
+
+def run_sync(args: argparse.Namespace, metrics: RunMetrics) -> int:
+    journal = CrawlJournal()
+    journal.start(resume=args.resume)
+
+    # Tab, Queen README and the local store index are independent; the crawl needs the first and the last
+    runner = StageRunner(pipeline_stages(args, journal), around=metrics.stage)
+    try:
+        results = runner.run()
+    except StageError as exc:
+        print(f"[ERROR] {exc}", file=sys.stderr)
+        return 1
+    finally:
+        print(f"[INFO] Stages: {runner.summary()}")
+        metrics.outcomes(runner.outcomes)
+    tab_rows = results["tab"]
+    queen_index = results["queen"]
+    store_records, store_lookup = results["store"]
+    scraped_new = results["crawl"]
+    for name, rows in (("tab", tab_rows), ("queen", queen_index), ("store", store_records), ("crawl", scraped_new)):
+        metrics.rows(name, len(rows))
+    if not tab_rows:
+        raise SystemExit("Tab data is empty after fetch; aborting.")
+    for row in scraped_new:
+        code = clean_code(row.get("code", ""))
+        if not code:
+            continue
+        store_lookup[code] = normalize_row(row)
+
+    json_path = Path(args.json_output)
+    csv_path = Path(args.csv_output)
+    merge_state = MergeState()
+    conflicts = ConflictReport(CONFLICTS_JSON)
+    with metrics.stage("merge") as stage:
+        # The report is patched per code like filament.json, so an incremental merge needs the previous one too
+        if conflicts.load() and not args.full_merge:
+            merge_state.load(json_path)
+        merged, stats = merge_sources(tab_rows, store_lookup, queen_index, merge_state, conflicts)
+        conflicts.save(FILAMENT_POLICY.name)
+        conflicts.log(FILAMENT_POLICY.name)
+        stage.rows = len(merged)
+    if debug_enabled():
+        codes_in_merged = set(str(r.get("code")) for r in merged)
+        print(f"[DEBUG] Codes in merged: {sorted(codes_in_merged)}")
+        if "12000" in codes_in_merged:
+            print("[DEBUG] Code 12000 is present in merged after merge_sources")
+        else:
+            print("[DEBUG] Code 12000 is MISSING in merged after merge_sources")
+
+    # --- PUSH FULL, SORTED, COMPACT UNION TO TAB ---
+    def build_payload(records):
+        payload = {"action": "uploadStoreIndex", "records": []}
+        for rec in records:
+            payload["records"].append({
+                "code": rec.get("code") or "",
+                "name": rec.get("name") or "",
+                "color": rec.get("color") or "",
+                "variantId": rec.get("variantid") or rec.get("variantId") or "",
+                "imageUrl": rec.get("imageurl") or rec.get("imageUrl") or "",
+                "productUrl": rec.get("producturl") or rec.get("productUrl") or "",
+            })
+        return payload
+
+    # Keep all manual tab entries (code+name+variantid, but missing URLs) in the union, never delete/overwrite them
+    # The Apps Script should fill in missing URLs for these partial rows based on code
+    # Remove empty/blank rows from the union
+    def is_real_filament(row):
+        return any(str(row.get(f, "")).strip() for f in ["code", "name", "variantid"])
+
+    # Build a compact, sorted union (no empty rows, no duplicates)
+    code_seen = set()
+    compact_union = []
+    for row in merged:
+        code = str(row.get("code", "")).strip()
+        if not code or code in code_seen:
+            continue
+        if is_real_filament(row):
+            compact_union.append(row)
+            code_seen.add(code)
+
+    # Sort by code (as string, but numerically if possible)
+    def code_key(row):
+        try:
+            return int(str(row.get("code", "0")))
+        except Exception:
+            return str(row.get("code", ""))
+    compact_union.sort(key=code_key)
+
+    payload = build_payload(compact_union)
+    push_url = os.environ.get("WEB_APP_URL")
+    if not push_url:
+        print("ERROR: WEB_APP_URL is not set. Populate scripts/secret.env.", file=sys.stderr)
+        return 1
+    with metrics.stage("push") as stage:
+        if journal.stage_done("push"):
+            print(f"[INFO] Tab already updated in this run ({journal.stage('push').get('records', 0)} records); skipping push.")
+        elif runner.outcomes["tab"].status == "fallback":
+            # The union was built from the catalog's old copy of the tab: the patch would be refused as stale and
+            # the full-upload fallback would delete every row added to the sheet since that copy was fetched
+            print("[WARN] Tab fetch fell back to the catalog copy; skipping the push so the sheet is not overwritten with stale rows.")
+            stage.status = "skipped"
+        else:
+            mode = "full"
+            try:
+                if not args.full_push and patchable(tab_rows):
+                    patch = diff_store_index(tab_rows, payload["records"])
+                    if is_empty(patch):
+                        print("[INFO] Store Index tab already matches the union; nothing to push.")
+                        mode = "none"
+                    else:
+                        print(f"[INFO] Patching tab: {describe(patch)}...")
+                        reply = push_patch(push_url, patch)
+                        if reply is not None:
+                            print(f"Patched Store Index via {push_url}: {describe(patch)} in {reply.get('writes', '?')} range writes")
+                            mode = "patch"
+                if mode == "full":
+                    print(f"[INFO] Overwriting tab with {len(compact_union)} sorted, compact records (no empty rows)...")
+                    if debug_enabled():
+                        for i, rec in enumerate(payload["records"][:10]):
+                            print(f"[DEBUG] Payload {i}: code={rec.get('code')}, variantId={rec.get('variantId')}, productUrl={rec.get('productUrl')}, imageUrl={rec.get('imageUrl')}")
+                    reply = upload(push_url, payload)
+                    if debug_enabled():
+                        print(f"[DEBUG] Response: {reply}")
+                    if not reply.get("ok"):
+                        raise RuntimeError(f"uploadStoreIndex failed: {reply}")
+                    print(f"Pushed {len(compact_union)} records to Store Index via {push_url}")
+            except Exception as exc:
+                print(f"ERROR: push failed: {exc}", file=sys.stderr)
+                stage.status, stage.error = "failed", str(exc)
+                return 1
+            journal.record_stage("push", records=len(compact_union), mode=mode)
+            stage.rows = len(compact_union)
+
+    # Filter out empty/non-filament records (all key fields empty)
+    def is_real_filament(row):
+        return any(str(row.get(f, "")).strip() for f in ["code", "name", "color", "variantid"])
+
+    filtered = [row for row in merged if is_real_filament(row)]
+    if debug_enabled():
+        codes_in_filtered = set(str(r.get("code")) for r in filtered)
+        print(f"[DEBUG] Codes in filtered: {sorted(codes_in_filtered)}")
+        if "12000" in codes_in_filtered:
+            print("[DEBUG] Code 12000 is present in filtered before output")
+        else:
+            print("[DEBUG] Code 12000 is MISSING in filtered before output")
+
+    defaulted_codes = []
+    for row in filtered:
+        if not row.get("producturl"):
+            row["producturl"] = COLLECTION_URL
+            defaulted_codes.append(str(row.get("code", "")))
+
+    with metrics.stage("export") as stage:
+        if merge_state.up_to_date(COLLECTION_URL) and csv_path.exists() and MATERIALS_JSON.exists() and MATERIALS_IDX.exists() and has_source("filament"):
+            print(f"[INFO] No source rows changed; {json_path}, {csv_path} and {MATERIALS_JSON.name} are already up to date.")
+            stage.rows = 0
+        else:
+            if debug_enabled():
+                print(f"[DEBUG] Writing filament.json to: {json_path.resolve()}")
+            sinks = export_sinks(json_path, csv_path, MATERIALS_JSON)
+            stage.rows = fan_out(filtered, sinks, Manifest().load())
+            # Double-check output for code 12000
+            if debug_enabled():
+                if any(str(r.get("code")) == "12000" for r in filtered):
+                    print("[DEBUG] Code 12000 is present in filament.json output!")
+                else:
+                    print("[DEBUG] Code 12000 is MISSING in filament.json output!")
+            print(f"[INFO] Exported {len(filtered)} rows in one pass; {summarize(sinks)}")
+        merge_state.save(json_path, defaulted_codes, COLLECTION_URL)
+
+    missing_store_codes = []
+    for row in merged:
+        code_str = str(row.get("code", "")).strip()
+        if code_str and code_str not in store_lookup:
+            missing_store_codes.append(code_str)
+
+    print(f"Wrote {len(merged)} rows to {json_path}")
+    print(f"Wrote CSV to {csv_path}")
+    print(
+        "Filled variantIds: {filled_variant}, images: {filled_image}, productUrls: {filled_product}, added from store: {added_from_store}".format(
+            **stats
+        )
+    )
+    if scraped_new:
+        print(f"Scraped {len(scraped_new)} new codes from store collection (not cached).")
+    else:
+        print("Scraped 0 new codes from store collection (none found).")
+    if missing_store_codes:
+        print(f"Codes absent from store lookup (likely queen-only or tab-only): {', '.join(sorted(missing_store_codes))}")
+    print("Uses store_index.json cache plus live crawl by default; add --no-scrape-store to disable crawling.")
+    journal.record_stage("done")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Compare the columnar merge_sources in sync_all_data.py against the previous per-code dict merge on synthetic catalogs.
+
+Each catalog has N codes: every code is in the tab, 30% of the tab rows miss their variant id / image / product URL,
+half the codes are also in the store index, and Queen lists 60% of them plus 5% extra codes only it knows.
+Both implementations must return identical rows and stats or the run exits 1. DEBUG output is discarded while timing.
+
+    python benchmarks/bench_merge.py
+    python benchmarks/bench_merge.py --sizes 10000,100000 --repeat 5
+"""
+import argparse
+import contextlib
+import gc
+import hashlib
+import io
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from bambu_inventory.sync_all_data import (  # noqa: E402
+    build_queen_index,
+    build_store_lookup,
+    clean_code,
+    clean_variant_id,
+    merge_sources,
+    normalize_row,
+)
+
+
+# --- Reference implementation (as before the columnar engine) ---
+def reference_merge_sources(
+    tab_rows: List[Dict[str, str]],
+    store_lookup: Dict[str, Dict[str, str]],
+    queen_lookup: Dict[str, str],
+    queen_records: List[Dict[str, str]],
+) -> Tuple[List[Dict[str, str]], Dict[str, int]]:
+    merged: List[Dict[str, str]] = []
+    stats = {"filled_variant": 0, "filled_image": 0, "filled_product": 0, "added_from_store": 0, "added_from_queen": 0}
+    tab_lookup = {clean_code(str(normalize_row(r).get("code", ""))): normalize_row(r) for r in tab_rows}
+    store_lookup_clean = {clean_code(str(k)): v for k, v in store_lookup.items()}
+    queen_lookup_clean = {clean_code(str(k)): v for k, v in queen_lookup.items()}
+    print(f"[DEBUG] Tab codes: {sorted(tab_lookup.keys())}")
+    print(f"[DEBUG] Store codes: {sorted(store_lookup_clean.keys())}")
+    print(f"[DEBUG] Queen codes: {sorted(queen_lookup_clean.keys())}")
+    all_codes = set(tab_lookup) | set(store_lookup_clean) | set(queen_lookup_clean)
+    print(f"[DEBUG] Union of all codes: {sorted(all_codes)}")
+    queen_records_by_code = {}
+    for qr in queen_records:
+        queen_records_by_code[clean_code(str(qr.get("filamentCode", "")))] = qr
+    for code in sorted(all_codes):
+        if str(code) == "12000" or code == 12000:
+            print(f"[DEBUG] Merging code 12000: tab={tab_lookup.get(code)}, store={store_lookup_clean.get(code)}")
+        src = tab_lookup.get(code, store_lookup_clean.get(code, {})).copy()
+        store_row = store_lookup_clean.get(code, {})
+        queen_row = queen_records_by_code.get(code, {})
+        if not src:
+            if queen_row:
+                src = {
+                    "code": code,
+                    "name": queen_row.get("category", ""),
+                    "color": queen_row.get("color", ""),
+                    "variantid": clean_variant_id(queen_row.get("variantId", "")),
+                    "imageurl": "",
+                    "producturl": "",
+                    "material": queen_row.get("category", ""),
+                }
+                stats["added_from_queen"] += 1
+            else:
+                src = {"code": code}
+        if queen_row:
+            if not src.get("variantid") or not str(src.get("variantid", "")).strip():
+                variant = queen_lookup_clean.get(code, "") or store_row.get("variantid", "") or queen_row.get("variantId", "")
+                if variant:
+                    src["variantid"] = clean_variant_id(variant)
+                    stats["filled_variant"] += 1
+            if not src.get("name") or not str(src.get("name", "")).strip():
+                if queen_row.get("category"):
+                    src["name"] = queen_row.get("category", "")
+            if not src.get("color") or not str(src.get("color", "")).strip():
+                if queen_row.get("color"):
+                    src["color"] = queen_row.get("color", "")
+            if not src.get("material") or not str(src.get("material", "")).strip():
+                if queen_row.get("category"):
+                    src["material"] = queen_row.get("category", "")
+        if not src.get("imageurl") and store_row.get("imageurl"):
+            src["imageurl"] = store_row["imageurl"]
+            stats["filled_image"] += 1
+        if not src.get("producturl") and store_row.get("producturl"):
+            src["producturl"] = store_row["producturl"]
+            stats["filled_product"] += 1
+        if not src.get("material") and store_row.get("material"):
+            src["material"] = store_row["material"]
+        if not src.get("variantid") and queen_lookup_clean.get(code, ""):
+            src["variantid"] = clean_variant_id(queen_lookup_clean[code])
+            stats["filled_variant"] += 1
+        if code not in tab_lookup and code in store_lookup_clean:
+            stats["added_from_store"] += 1
+        if code not in tab_lookup and code not in store_lookup_clean and code in queen_lookup_clean:
+            stats["added_from_queen"] += 1
+        merged.append(src)
+    return merged, stats
+
+
+# --- Synthetic catalog ---
+def synthetic_catalog(size: int, seed: int = 7) -> Tuple[List[Dict], Dict[str, Dict[str, str]], List[Dict[str, str]]]:
+    rng = random.Random(seed)
+    materials = ["PLA Basic", "PLA Matte", "PETG HF", "ABS", "TPU 95A", "PLA Silk+"]
+    tab_rows, store_rows, queen_records = [], [], []
+    for i in range(size):
+        code = str(10000 + i)
+        material = materials[i % len(materials)]
+        variant = f"A{i % 100:02d}-{chr(65 + i % 26)}{i % 10}"
+        sparse = rng.random() < 0.3
+        tab_rows.append(
+            {
+                "Code": code,
+                "Name": material,
+                "Color": f"Color {i}",
+                "VariantID": "" if sparse else variant,
+                "Image": "" if sparse else f"https://cdn.example/{code}.png",
+                "ProductURL": "" if sparse else f"https://store.example/products/{code}",
+                "Material": material,
+            }
+        )
+        if i % 2 == 0:
+            store_rows.append(
+                {
+                    "code": code,
+                    "color": f"Color {i}",
+                    "variantId": variant,
+                    "imageUrl": f"https://cdn.example/{code}.jpg",
+                    "productUrl": f"https://store.example/products/{code}",
+                }
+            )
+        if rng.random() < 0.6:
+            queen_records.append(
+                {"color": f"Color {i}", "filamentCode": code, "variantId": variant if i % 3 else "", "category": material}
+            )
+    for i in range(size // 20):
+        queen_records.append({"color": f"Extra {i}", "filamentCode": str(90000000 + i), "variantId": "", "category": "Other"})
+    return tab_rows, build_store_lookup(store_rows), queen_records
+
+
+def best_of(fn: Callable[[], object], repeat: int) -> Tuple[float, str]:
+    """Best wall time of `fn` plus a digest of its output; results are dropped between runs so GC sees the same heap."""
+    best, digest = float("inf"), ""
+    for _ in range(repeat):
+        gc.collect()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - start)
+        digest = hashlib.sha256(json.dumps(result).encode("utf-8")).hexdigest()
+        del result
+    return best, digest
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the columnar merge_sources against the previous dict merge.")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma-separated catalog sizes (default: 10k,100k,1M)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions; best run is reported (default: 3)")
+    args = parser.parse_args()
+
+    print(f"{'codes':>10}{'reference (s)':>15}{'columnar (s)':>14}{'speedup':>10}")
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        tab_rows, store_lookup, queen_records = synthetic_catalog(size)
+        queen_lookup = {clean_code(r["filamentCode"]): clean_variant_id(r["variantId"]) for r in queen_records}
+        ref_t, ref = best_of(lambda: reference_merge_sources(tab_rows, store_lookup, queen_lookup, queen_records), args.repeat)
+        new_t, new = best_of(lambda: merge_sources(tab_rows, store_lookup, build_queen_index(queen_records)), args.repeat)
+        if ref != new:
+            print(f"FAIL: outputs differ at {size} codes", file=sys.stderr)
+            return 1
+        print(f"{size:>10}{ref_t:>15.3f}{new_t:>14.3f}{ref_t / new_t if new_t else 0:>9.1f}x")
+    print("Outputs identical at every size.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Compare the streaming store-page parsers in sync_all_data.py against the previous BeautifulSoup versions.
+
+Pages come from, in order of preference:
+- `--pages <glob>`: saved HTML files (e.g. "saved/*.html")
+- the HTTP cache in data/http_cache (any HTML body cached by a previous sync)
+- synthetic collection/product pages shaped like the store's markup (`--synthetic N` products)
+
+Every page is parsed by both implementations; outputs must be identical or the run exits 1.
+
+    python benchmarks/bench_parsers.py
+    python benchmarks/bench_parsers.py --pages "saved/*.html" --repeat 20
+"""
+import argparse
+import glob
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Set, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from bambu_inventory.sync_all_data import normalize_product_url, parse_collection_products, parse_product_variants  # noqa: E402
+
+CACHE_INDEX = ROOT / "data" / "http_cache" / "index.json"
+
+
+# --- Reference implementations (BeautifulSoup, as before the fast path) ---
+def soup_parse_collection_products(html: str) -> List[str]:
+    soup = BeautifulSoup(html, "html.parser")
+    links: Set[str] = set()
+    for anchor in soup.find_all("a", href=True):
+        href = anchor.get("href", "")
+        if "/products/" not in href:
+            continue
+        if "?variant=" not in href and "?id=" not in href:
+            continue
+        links.add(normalize_product_url(href.split("?")[0]))
+    return sorted(links)
+
+
+def soup_parse_product_variants(html: str) -> List[Dict[str, str]]:
+    soup = BeautifulSoup(html, "html.parser")
+    variants: List[Dict[str, str]] = []
+    for script in soup.find_all("script"):
+        text = script.string or ""
+        if "variants" not in text or "product" not in text:
+            continue
+        match = re.search(r"product\s*=\s*(\{.*?\});", text, re.DOTALL)
+        if not match:
+            continue
+        try:
+            product_data = json.loads(match.group(1))
+        except Exception:  # noqa: BLE001
+            continue
+        for variant in product_data.get("variants", []):
+            code = str(variant.get("sku") or variant.get("barcode") or "").strip()
+            color = str(variant.get("title") or variant.get("option1") or "").strip()
+            image_url = ""
+            if variant.get("featured_media") and variant["featured_media"].get("src"):
+                image_url = variant["featured_media"].get("src", "")
+            if not image_url and variant.get("featured_image"):
+                image_url = variant["featured_image"].get("src", "")
+            variants.append({"code": code, "color": color, "variantid": variant.get("sku", ""), "imageurl": image_url})
+        break
+    return variants
+
+
+# --- Page sources ---
+def synthetic_pages(products: int) -> Tuple[List[str], List[str]]:
+    """One collection page linking `products` products, plus one product page per product."""
+    chrome = "".join(
+        f'<div class="nav-item"><a href="/pages/info-{i}">Info {i}</a><img src="/img/{i}.png" alt=""></div>' for i in range(200)
+    )
+    head = "<head>" + "".join(f'<script src="/assets/app-{i}.js"></script>' for i in range(15)) + "</head>"
+    cards = "".join(
+        f'<div class="card"><a href="/products/filament-{p}?variant={900000 + p}"><span>Filament {p}</span></a>'
+        f'<a href="/products/filament-{p}">Details</a></div>'
+        for p in range(products)
+    )
+    collection = f"<html>{head}<body>{chrome}{cards}{chrome}</body></html>"
+    product_pages = []
+    for p in range(products):
+        product = {
+            "id": p,
+            "title": f"Filament {p}",
+            "variants": [
+                {
+                    "sku": f"{10000 + p * 10 + v}",
+                    "title": f"Color {v}",
+                    "featured_image": {"src": f"https://cdn.example/{p}/{v}.jpg"},
+                }
+                for v in range(12)
+            ],
+        }
+        body = (
+            f"<html>{head}<body>{chrome}"
+            f'<script>window.analytics = {{"page": "product"}};</script>'
+            f"<script>var product = {json.dumps(product)};</script>"
+            f"{chrome}</body></html>"
+        )
+        product_pages.append(body)
+    return [collection], product_pages
+
+
+def cached_pages() -> List[str]:
+    if not CACHE_INDEX.exists():
+        return []
+    index = json.loads(CACHE_INDEX.read_text(encoding="utf-8"))
+    pages = []
+    for entry in index.values():
+        if "html" not in entry.get("contentType", ""):
+            continue
+        path = CACHE_INDEX.parent / "bodies" / entry["key"]
+        if path.exists():
+            pages.append(path.read_bytes().decode(entry.get("encoding") or "utf-8", errors="replace"))
+    return pages
+
+
+def time_call(fn: Callable[[str], object], pages: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for page in pages:
+            fn(page)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark streaming vs BeautifulSoup store-page parsers.")
+    parser.add_argument("--pages", default=None, help="Glob of saved HTML pages to benchmark on")
+    parser.add_argument("--synthetic", type=int, default=60, help="Products in the synthetic catalog (default: 60)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions; best run is reported (default: 5)")
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = [Path(p).read_text(encoding="utf-8", errors="replace") for p in sorted(glob.glob(args.pages))]
+        collection_pages, product_pages, source = pages, pages, f"saved pages ({args.pages})"
+    elif cached_pages():
+        pages = cached_pages()
+        collection_pages, product_pages, source = pages, pages, "data/http_cache"
+    else:
+        collection_pages, product_pages = synthetic_pages(args.synthetic)
+        source = f"synthetic catalog ({args.synthetic} products)"
+    print(f"Source: {source}; {len(collection_pages)} collection / {len(product_pages)} product pages")
+
+    mismatches = 0
+    for page in collection_pages:
+        mismatches += parse_collection_products(page) != soup_parse_collection_products(page)
+    for page in product_pages:
+        mismatches += parse_product_variants(page) != soup_parse_product_variants(page)
+    if mismatches:
+        print(f"FAIL: {mismatches} pages parsed differently", file=sys.stderr)
+        return 1
+
+    rows = [
+        ("parse_collection_products", soup_parse_collection_products, parse_collection_products, collection_pages),
+        ("parse_product_variants", soup_parse_product_variants, parse_product_variants, product_pages),
+    ]
+    print(f"{'function':<28}{'bs4 (s)':>10}{'fast (s)':>10}{'speedup':>10}")
+    for name, slow, fast, sample in rows:
+        slow_t = time_call(slow, sample, args.repeat)
+        fast_t = time_call(fast, sample, args.repeat)
+        print(f"{name:<28}{slow_t:>10.4f}{fast_t:>10.4f}{slow_t / fast_t if fast_t else 0:>9.1f}x")
+    print("Outputs identical on all pages.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Cold-start time of every `bambu-inventory` subcommand (bambu_inventory/inventory_cli.py).
+
+Each sample is a fresh interpreter running `inventory_cli <command> --help`: the dispatcher, the command's
+module and its argument parser, but no work. Reported next to the bare interpreter (`python -c pass`) and an
+eager CLI that imports every command module up front, with the heavy third-party modules each one loaded.
+The cases are sampled round-robin, so machine noise and drift hit every case alike.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 15
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from bambu_inventory.inventory_cli import COMMANDS  # noqa: E402
+
+HEAVY = ("requests", "urllib3", "bs4", "sqlite3", "numpy", "pandas", "matplotlib")
+PROBE = """
+import contextlib, io, json, runpy, sys
+sys.argv = ["bambu-inventory", *{args!r}]
+sys.path.insert(0, {root!r})
+with contextlib.redirect_stdout(io.StringIO()):
+    try:
+        {body}
+    except SystemExit:
+        pass
+print(json.dumps([m for m in {heavy!r} if m in sys.modules]), file=sys.stderr)
+"""
+
+
+def probe(body: str, args: Tuple[str, ...] = ()) -> str:
+    return PROBE.format(args=list(args), root=str(ROOT), body=body, heavy=HEAVY)
+
+
+def sample(code: str) -> Tuple[float, List[str]]:
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    elapsed = (time.perf_counter() - started) * 1000
+    return elapsed, json.loads(proc.stderr.strip().splitlines()[-1]) if proc.stderr.strip() else []
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure the cold start of each bambu-inventory subcommand.")
+    parser.add_argument("--repeat", type=int, default=9, help="Fresh interpreters per command (default 9)")
+    args = parser.parse_args()
+
+    cases: Dict[str, str] = {"python -c pass": "import sys; print('[]', file=sys.stderr)"}
+    cases["bambu-inventory --help"] = probe("runpy.run_module('bambu_inventory.inventory_cli', run_name='__main__')", ("--help",))
+    for command in COMMANDS:
+        cases[f"{command} --help"] = probe("runpy.run_module('bambu_inventory.inventory_cli', run_name='__main__')", (command, "--help"))
+    eager = "; ".join(f"__import__('bambu_inventory.{module}')" for module, _ in COMMANDS.values())
+    cases["eager: import all commands"] = probe(eager)
+
+    times: Dict[str, List[float]] = {name: [] for name in cases}
+    loaded: Dict[str, List[str]] = {}
+    for _ in range(args.repeat):
+        for name, code in cases.items():
+            elapsed, loaded[name] = sample(code)
+            times[name].append(elapsed)
+
+    print(f"{'case':<30}{'median ms':>11}{'min ms':>9}  heavy modules loaded")
+    for name in cases:
+        print(f"{name:<30}{statistics.median(times[name]):>11.0f}{min(times[name]):>9.0f}  {', '.join(loaded[name]) or '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
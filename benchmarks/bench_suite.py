@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the parsing and normalization hot paths, with a stored baseline to catch regressions.
+
+Inputs are built from the real data/ files (the Queen table from data/queengooborg.json, tab rows from
+data/store_index_tab.json, store rows, product URLs, collection and product pages from data/store_index.json)
+and from the same data scaled up `--scales` times with shifted codes and variant ids.
+
+One op is one call for whole-document functions (parse_*, merge_sources) and one row/URL/id for the per-item
+helpers (normalize_row, clean_variant_id, normalize_product_url). Each case is calibrated to samples of at
+least `--min-sample` ms, and p50/p95 are the per-op times over `--samples` samples. Peak memory is measured
+separately with tracemalloc over one sample, so it does not slow the timed runs. stdout of the measured
+functions (merge_sources DEBUG lines) is discarded.
+
+    python benchmarks/bench_suite.py                      # table, compared with benchmarks/baseline.json
+    python benchmarks/bench_suite.py --json results.json  # also write the machine-readable results
+    python benchmarks/bench_suite.py --save-baseline      # make this run the new baseline
+    python benchmarks/bench_suite.py --filter parse_ --scales 1
+
+With a baseline, a case whose p50 is more than `--threshold` percent slower is reported as a regression and
+the run exits 1. The baseline is machine-specific: regenerate it on the machine that runs the comparison.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from bambu_inventory.common import normalize_product_url  # noqa: E402
+from bambu_inventory.fetch_queengooborg_readme import parse_table as parse_queen_table  # noqa: E402
+from bambu_inventory.scrape_preview import parse_collection_property_ids  # noqa: E402
+from bambu_inventory.sync_all_data import (  # noqa: E402
+    build_queen_index,
+    build_store_lookup,
+    clean_variant_id,
+    merge_sources,
+    normalize_row,
+    parse_collection_products,
+    parse_product_variants,
+)
+
+DATA = ROOT / "data"
+BASELINE_JSON = ROOT / "benchmarks" / "baseline.json"
+
+Rows = List[Dict[str, Any]]
+# name -> (inputs for one scale) -> (callable running one sample, ops per sample)
+Case = Callable[["Inputs"], Tuple[Callable[[], Any], int]]
+
+
+def load_rows(name: str) -> Rows:
+    return json.loads((DATA / name).read_text(encoding="utf-8"))
+
+
+def scaled(rows: Rows, scale: int, keys: Tuple[str, ...]) -> Rows:
+    """`rows` repeated `scale` times; copies after the first get their `keys` values suffixed so codes stay unique."""
+    out = list(rows)
+    for n in range(1, scale):
+        for row in rows:
+            copy = dict(row)
+            for key in keys:
+                if copy.get(key):
+                    copy[key] = f"{copy[key]}{n}"
+            out.append(copy)
+    return out
+
+
+class Inputs:
+    """Every benchmark input at one scale, derived from the data/ files."""
+
+    def __init__(self, scale: int) -> None:
+        self.scale = scale
+        self.queen = scaled(load_rows("queengooborg.json"), scale, ("filamentCode",))
+        self.tab = scaled(load_rows("store_index_tab.json"), scale, ("Code",))
+        self.store = scaled(load_rows("store_index.json"), scale, ("code",))
+        self.urls = [row.get("productUrl", "") for row in self.store] + [
+            "/products/" + row.get("productUrl", "").split("/products/")[-1] for row in self.store
+        ]
+        self.variant_ids = [row.get("variantId", "") for row in self.queen] + [
+            f"{row.get('variantId', '')}-EXTRA (old), alt" for row in self.queen
+        ]
+        self.readme = queen_readme(self.queen)
+        self.collection = collection_page(self.store)
+        self.product_pages = product_pages(self.store)
+        self.store_lookup = build_store_lookup(self.store)
+        self.queen_index = build_queen_index(self.queen)
+
+
+def queen_readme(records: Rows) -> str:
+    """The upstream README layout: a `#### <category>` heading over a Color/Filament Code/Variant ID table."""
+    lines = ["# Bambu Lab RFID Library", "", "Intro text.", ""]
+    category = None
+    for record in records:
+        if record.get("category") != category:
+            category = record.get("category")
+            lines += ["", f"#### {category}", "", "| Color | Filament Code | Variant ID | Status |", "| --- | --- | --- | --- |"]
+        lines.append(f"| {record.get('color', '')} | {record.get('filamentCode', '')} | {record.get('variantId') or '?'} | ✅ |")
+    return "\n".join(lines) + "\n"
+
+
+def product_groups(store: Rows) -> Dict[str, Rows]:
+    groups: Dict[str, Rows] = {}
+    for row in store:
+        groups.setdefault(row.get("productUrl", "").split("?")[0] or "/products/unknown", []).append(row)
+    return groups
+
+
+PAGE_CHROME = "".join(f'<div class="nav-item"><a href="/pages/info-{i}">Info {i}</a></div>' for i in range(100))
+
+
+def collection_page(store: Rows) -> str:
+    """Collection page with a card per variant link and the storefront's seoCode/colorList JSON per product."""
+    cards, blobs = [], []
+    for url, rows in product_groups(store).items():
+        slug = url.rsplit("/", 1)[-1]
+        for row in rows:
+            cards.append(f'<div class="card"><a href="{row.get("productUrl", "")}">{row.get("color", "")}</a></div>')
+        cards.append(f'<a href="{url}">Details</a>')
+        colors = [{"name": row.get("color", ""), "propertyValueId": row.get("productUrl", "").rpartition("=")[2]} for row in rows]
+        blobs.append({"seoCode": slug, "title": slug, "colorList": colors})
+    data = json.dumps({"products": blobs})
+    return f"<html><head></head><body>{PAGE_CHROME}{''.join(cards)}<script>window.__DATA__ = {data};</script></body></html>"
+
+
+def product_pages(store: Rows) -> List[str]:
+    pages = []
+    for url, rows in product_groups(store).items():
+        product = {
+            "title": url.rsplit("/", 1)[-1],
+            "variants": [
+                {"sku": row.get("code", ""), "title": row.get("color", ""), "featured_image": {"src": row.get("imageUrl", "")}}
+                for row in rows
+            ],
+        }
+        pages.append(
+            f"<html><head></head><body>{PAGE_CHROME}<script>window.analytics = {{}};</script>"
+            f"<script>var product = {json.dumps(product)};</script></body></html>"
+        )
+    return pages
+
+
+def each(fn: Callable[[Any], Any], items: List[Any]) -> Tuple[Callable[[], Any], int]:
+    return (lambda: [fn(item) for item in items]), len(items)
+
+
+CASES: Dict[str, Case] = {
+    "parse_queen_table": lambda i: ((lambda: parse_queen_table(i.readme)), 1),
+    "parse_product_variants": lambda i: ((lambda: [parse_product_variants(page) for page in i.product_pages]), len(i.product_pages)),
+    "parse_collection_products": lambda i: ((lambda: parse_collection_products(i.collection)), 1),
+    "parse_collection_property_ids": lambda i: ((lambda: parse_collection_property_ids(i.collection)), 1),
+    "normalize_row": lambda i: each(normalize_row, i.tab),
+    "clean_variant_id": lambda i: each(clean_variant_id, i.variant_ids),
+    "normalize_product_url": lambda i: each(normalize_product_url, i.urls),
+    "merge_sources": lambda i: ((lambda: merge_sources(i.tab, i.store_lookup, i.queen_index)), 1),
+}
+
+
+def calibrate(run: Callable[[], Any], min_seconds: float) -> int:
+    """Repetitions of `run` per sample so one sample takes at least `min_seconds`."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds or number >= 1 << 20:
+            return number
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_seconds / elapsed) + 1))
+
+
+def measure(run: Callable[[], Any], ops: int, samples: int, min_seconds: float) -> Dict[str, Any]:
+    with contextlib.redirect_stdout(io.StringIO()):
+        number = calibrate(run, min_seconds)
+        per_op: List[float] = []
+        gc.collect()
+        for _ in range(samples):
+            start = time.perf_counter()
+            for _ in range(number):
+                run()
+            per_op.append((time.perf_counter() - start) / (number * ops))
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    per_op.sort()
+    p50 = statistics.median(per_op)
+    return {
+        "ops_per_sec": round(1 / p50, 1) if p50 else 0.0,
+        "p50_us": round(p50 * 1e6, 3),
+        "p95_us": round(per_op[min(len(per_op) - 1, int(0.95 * len(per_op)))] * 1e6, 3),
+        "peak_kib": round(peak / 1024, 1),
+        "ops_per_sample": number * ops,
+    }
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]]) -> Dict[str, Optional[float]]:
+    """Percent change of p50 against the baseline per case (None when the case is not in it)."""
+    changes: Dict[str, Optional[float]] = {}
+    for key, result in results.items():
+        base = baseline.get(key)
+        changes[key] = (result["p50_us"] / base["p50_us"] - 1) * 100 if base and base.get("p50_us") else None
+    return changes
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the parsing/normalization hot paths and compare with a baseline.")
+    parser.add_argument("--scales", default="1,10", help="Comma-separated input scales; 1 is the real data/ files (default: 1,10)")
+    parser.add_argument("--samples", type=int, default=15, help="Timed samples per case (default: 15)")
+    parser.add_argument("--min-sample", type=float, default=20.0, help="Minimum milliseconds per sample (default: 20)")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text")
+    parser.add_argument("--json", default=None, metavar="PATH", help="Write the results as JSON ('-' for stdout)")
+    parser.add_argument("--baseline", default=str(BASELINE_JSON), help="Baseline to compare with (default: benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run's results to --baseline")
+    parser.add_argument("--threshold", type=float, default=25.0, help="Percent p50 slowdown reported as a regression (default: 25)")
+    args = parser.parse_args()
+
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    cases = {name: case for name, case in CASES.items() if args.filter in name}
+    baseline_path = Path(args.baseline)
+    baseline = {}
+    if baseline_path.exists() and not args.save_baseline:
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8")).get("results", {})
+
+    results: Dict[str, Dict[str, Any]] = {}
+    print(f"{'case':<40}{'ops/s':>12}{'p50 us':>11}{'p95 us':>11}{'peak KiB':>10}{'vs base':>9}", file=sys.stderr)
+    for scale in scales:
+        inputs = Inputs(scale)
+        for name, case in cases.items():
+            key = f"{name}@x{scale}"
+            run, ops = case(inputs)
+            results[key] = measure(run, ops, args.samples, args.min_sample / 1000)
+            change = compare({key: results[key]}, baseline)[key]
+            r = results[key]
+            delta = "-" if change is None else f"{change:+.0f}%"
+            print(f"{key:<40}{r['ops_per_sec']:>12,.0f}{r['p50_us']:>11.2f}{r['p95_us']:>11.2f}{r['peak_kib']:>10.1f}{delta:>9}", file=sys.stderr)
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "samples": args.samples,
+        "results": results,
+    }
+    if args.json:
+        text = json.dumps(report, indent=2, sort_keys=True)
+        if args.json == "-":
+            print(text)
+        else:
+            Path(args.json).write_text(text + "\n", encoding="utf-8")
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Baseline written to {baseline_path}", file=sys.stderr)
+        return 0
+    regressions = {k: v for k, v in compare(results, baseline).items() if v is not None and v > args.threshold}
+    for key, change in regressions.items():
+        print(f"REGRESSION: {key} p50 {change:+.0f}% vs baseline", file=sys.stderr)
+    if not baseline:
+        print(f"No baseline at {baseline_path}; run with --save-baseline to create one.", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""Runs bambu_inventory/bulk_products.py from a checkout: `python scripts/bulk_products.py [args]`."""
+import runpy
+import sys
+from pathlib import Path
+
+if __name__ == "__main__":
+    # Import the package from the checkout rather than these same-named shims
+    sys.path[0] = str(Path(__file__).resolve().parents[1])
+    runpy.run_module("bambu_inventory.bulk_products", run_name="__main__", alter_sys=True)
@@ -20,6 +20,8 @@ function doGet(e) {
 }
 const DEFAULT_SHEET_NAME = 'Inventory';
 const IMAGES_SHEET_NAME = 'Store Index';
+const STORE_INDEX_HEADERS = ['Code', 'Name', 'Color', 'VariantId', 'Image', 'ProductUrl', 'ImageUrl'];
+const UPLOAD_CACHE_SECONDS = 3600; // how long received chunks and commit results are kept
 const TRAY_UID_COLUMN_INDEX = 8; // Column H: Tray UID for roll (also holds chip UID when tray missing)
 
 // New: Inventory columns (1-based):
@@ -48,6 +50,19 @@ function doPost(e) {
       return handleStoreIndexUpload(payload);
     }
 
+    // Diff-based Store Index update from sync_all_data.py (only changed rows are written).
+    if (payload && payload.action === 'patchStoreIndex') {
+      return handleStoreIndexPatch(payload);
+    }
+
+    // Chunked, gzip+base64 uploads of the two Store Index actions above (see handleUploadChunk).
+    if (payload && payload.action === 'uploadChunk') {
+      return handleUploadChunk(payload);
+    }
+    if (payload && payload.action === 'commitUpload') {
+      return handleCommitUpload(payload);
+    }
+
     // Lightweight status probe to debug sheet connectivity without writing data.
     if (payload && payload.action === 'status') {
       const sheetId = getSheetId();
@@ -551,30 +566,215 @@ function handleStoreIndexUpload(payload) {
   const ss = SpreadsheetApp.openById(sheetId);
   const sheet = ss.getSheetByName(IMAGES_SHEET_NAME) || ss.insertSheet(IMAGES_SHEET_NAME);
   const sep = getArgSeparator(ss);
-  const headers = ['Code', 'Name', 'Color', 'VariantId', 'Image', 'ProductUrl', 'ImageUrl'];
-  const rows = records.map(r => {
-    const imageUrl = r.imageUrl || '';
-    const productUrl = r.productUrl || '';
-    const code = r.code || '';
-    const codeCell = productUrl ? `=HYPERLINK("${productUrl}"${sep}"${code}")` : code;
-    const imageCell = imageUrl ? `=IMAGE("${imageUrl}")` : '';
-    const variantId = r.variantId || '';
-    return [
-      codeCell,
-      r.name || '',
-      r.color || '',
-      variantId,
-      imageCell,
-      productUrl,
-      imageUrl
-    ];
-  });
+  const headers = STORE_INDEX_HEADERS;
+  const rows = records.map(r => storeIndexRow(r, sep));
   sheet.clearContents();
   sheet.getRange(1, 1, 1, headers.length).setValues([headers]);
   sheet.getRange(2, 1, rows.length, headers.length).setValues(rows);
   return jsonResponse(200, { ok: true, rows: rows.length });
 }
 
+/**
+ * Store Index code order, as the scripts sort the records they upload: numeric codes by value, after any others.
+ */
+function compareCodes(a, b) {
+  const x = String(a || '').trim();
+  const y = String(b || '').trim();
+  const nx = /^\d+$/.test(x) ? Number(x) : -1;
+  const ny = /^\d+$/.test(y) ? Number(y) : -1;
+  return nx !== ny ? nx - ny : (x < y ? -1 : x > y ? 1 : 0);
+}
+
+/**
+ * One Store Index row (formula cells included) for an uploaded record.
+ */
+function storeIndexRow(r, sep) {
+  const imageUrl = r.imageUrl || '';
+  const productUrl = r.productUrl || '';
+  const code = r.code || '';
+  const codeCell = productUrl ? `=HYPERLINK("${productUrl}"${sep}"${code}")` : code;
+  const imageCell = imageUrl ? `=IMAGE("${imageUrl}")` : '';
+  return [
+    codeCell,
+    r.name || '',
+    r.color || '',
+    r.variantId || '',
+    imageCell,
+    productUrl,
+    imageUrl
+  ];
+}
+
+/**
+ * Apply a Store Index diff computed by sync_all_data.py instead of clearing and rewriting the tab, so untouched
+ * =IMAGE()/=HYPERLINK() cells are not re-evaluated.
+ * Expects { action: 'patchStoreIndex', expectedRows, updates: [ { row, record } ], deletes: [ { row, code } ], inserts: [ record ] }
+ * with 1-based sheet rows as fetched. When the tab changed since the fetch (row count, headers, or the code at a
+ * patched row), nothing is written and { error: 'stale' } tells the caller to fall back to uploadStoreIndex.
+ */
+function handleStoreIndexPatch(payload) {
+  const updates = Array.isArray(payload.updates) ? payload.updates : [];
+  const deletes = Array.isArray(payload.deletes) ? payload.deletes : [];
+  const inserts = Array.isArray(payload.inserts) ? payload.inserts : [];
+  const sheetId = getSheetId();
+  if (!sheetId) {
+    return jsonResponse(500, { error: 'SHEET_ID not configured (set in Script Properties)' });
+  }
+  const ss = SpreadsheetApp.openById(sheetId);
+  const sheet = ss.getSheetByName(IMAGES_SHEET_NAME);
+  if (!sheet) {
+    return jsonResponse(409, { error: 'stale', reason: `Sheet not found: ${IMAGES_SHEET_NAME}` });
+  }
+  const sep = getArgSeparator(ss);
+  const width = STORE_INDEX_HEADERS.length;
+  const lastRow = sheet.getLastRow();
+  const header = lastRow > 0 ? sheet.getRange(1, 1, 1, width).getDisplayValues()[0] : [];
+  if (header.join('|') !== STORE_INDEX_HEADERS.join('|')) {
+    return jsonResponse(409, { error: 'stale', reason: 'headers differ' });
+  }
+  if (lastRow - 1 !== payload.expectedRows) {
+    return jsonResponse(409, { error: 'stale', reason: `expected ${payload.expectedRows} rows, found ${lastRow - 1}` });
+  }
+  // Every patched row must still hold the code it held when the tab was fetched.
+  const codes = lastRow > 1 ? sheet.getRange(2, 1, lastRow - 1, 1).getDisplayValues() : [];
+  const codeAt = row => (row >= 2 && row <= lastRow) ? String(codes[row - 2][0] || '').trim() : null;
+  const moved = updates.find(u => codeAt(u.row) !== String(u.record.code || '').trim()) ||
+    deletes.find(d => codeAt(d.row) !== String(d.code || '').trim());
+  if (moved) {
+    return jsonResponse(409, { error: 'stale', reason: `row ${moved.row} changed` });
+  }
+
+  // Updates first (row numbers are still the fetched ones); consecutive rows go out as one setValues block.
+  let writes = 0;
+  const ordered = updates.slice().sort((a, b) => a.row - b.row);
+  for (let i = 0; i < ordered.length;) {
+    let j = i;
+    while (j + 1 < ordered.length && ordered[j + 1].row === ordered[j].row + 1) j++;
+    const block = ordered.slice(i, j + 1).map(u => storeIndexRow(u.record, sep));
+    sheet.getRange(ordered[i].row, 1, block.length, width).setValues(block);
+    writes++;
+    i = j + 1;
+  }
+  // Deletes bottom-up so the rows above keep their numbers; contiguous rows go in one deleteRows call.
+  const doomed = deletes.map(d => d.row).sort((a, b) => b - a);
+  for (let i = 0; i < doomed.length;) {
+    let j = i;
+    while (j + 1 < doomed.length && doomed[j + 1] === doomed[j] - 1) j++;
+    sheet.deleteRows(doomed[j], j - i + 1);
+    writes++;
+    i = j + 1;
+  }
+  // New codes go in at their place in code order (the order the full upload writes), one block per gap. Sorting the
+  // range instead would not do: Sheets sorts number cells (plain codes) before text, and =HYPERLINK() codes are text.
+  if (inserts.length) {
+    const last = sheet.getLastRow();
+    const existing = last > 1 ? sheet.getRange(2, 1, last - 1, 1).getDisplayValues().map(line => String(line[0]).trim()) : [];
+    const sorted = inserts.slice().sort((a, b) => compareCodes(a.code, b.code));
+    const gaps = [];
+    let pos = 0;
+    sorted.forEach(record => {
+      while (pos < existing.length && compareCodes(existing[pos], record.code) <= 0) pos++;
+      if (gaps.length && gaps[gaps.length - 1].pos === pos) gaps[gaps.length - 1].records.push(record);
+      else gaps.push({ pos: pos, records: [record] });
+    });
+    // Bottom-up, so the rows above a gap keep their numbers
+    for (let g = gaps.length - 1; g >= 0; g--) {
+      const row = gaps[g].pos + 2;
+      const block = gaps[g].records.map(r => storeIndexRow(r, sep));
+      if (gaps[g].pos < existing.length) sheet.insertRowsBefore(row, block.length);
+      sheet.getRange(row, 1, block.length, width).setValues(block);
+      writes++;
+    }
+  }
+  return jsonResponse(200, { ok: true, updated: updates.length, deleted: deletes.length, inserted: inserts.length, writes: writes });
+}
+
+/**
+ * One chunk of a chunked Store Index upload from the scripts (chunked_upload.py):
+ * { action: 'uploadChunk', session, seq, total, digest, data }, where `data` is slice `seq` of the base64 text of
+ * the gzipped JSON body of an uploadStoreIndex or patchStoreIndex request and `digest` is the sha256 of that JSON.
+ * Chunks are idempotent per (session, seq) and wait in the script cache. The request that completes the set
+ * decodes and verifies the body, runs it once under the script lock, and caches the result, so a retried chunk or
+ * commit gets the same reply instead of a second write.
+ */
+function handleUploadChunk(payload) {
+  const session = String(payload.session || '');
+  const total = Number(payload.total);
+  const seq = Number(payload.seq);
+  if (!/^[0-9a-f]{8,64}$/.test(session) || !(total > 0) || !(seq >= 0 && seq < total) || typeof payload.data !== 'string') {
+    return jsonResponse(400, { error: 'bad chunk' });
+  }
+  CacheService.getScriptCache().put(uploadChunkKey(session, seq), payload.data, UPLOAD_CACHE_SECONDS);
+  return commitUploadIfComplete(session, total, payload.digest);
+}
+
+/**
+ * { action: 'commitUpload', session, total, digest }: commit a session whose chunks all arrived, or list the
+ * missing sequence numbers so the client can resend just those.
+ */
+function handleCommitUpload(payload) {
+  const session = String(payload.session || '');
+  const total = Number(payload.total);
+  if (!/^[0-9a-f]{8,64}$/.test(session) || !(total > 0)) {
+    return jsonResponse(400, { error: 'bad commit' });
+  }
+  return commitUploadIfComplete(session, total, payload.digest);
+}
+
+function uploadChunkKey(session, seq) {
+  return `upload:${session}:${seq}`;
+}
+
+function commitUploadIfComplete(session, total, digest) {
+  const cache = CacheService.getScriptCache();
+  const doneKey = `upload:${session}:done`;
+  const lock = LockService.getScriptLock();
+  lock.waitLock(30000);
+  try {
+    const done = cache.get(doneKey);
+    if (done) {
+      return jsonResponse(200, { ok: true, session, committed: true, result: JSON.parse(done) });
+    }
+    const keys = [];
+    for (let i = 0; i < total; i++) keys.push(uploadChunkKey(session, i));
+    const found = cache.getAll(keys);
+    const missing = [];
+    keys.forEach((key, i) => {
+      if (typeof found[key] !== 'string') missing.push(i);
+    });
+    if (missing.length) {
+      return jsonResponse(200, { ok: true, session, committed: false, received: total - missing.length, missing });
+    }
+    const gz = Utilities.base64Decode(keys.map(key => found[key]).join(''));
+    const text = Utilities.ungzip(Utilities.newBlob(gz, 'application/x-gzip')).getDataAsString('UTF-8');
+    if (digest && sha256Hex(text) !== digest) {
+      cache.removeAll(keys);
+      return jsonResponse(400, { error: 'digest mismatch', session });
+    }
+    const inner = JSON.parse(text);
+    let output;
+    if (inner.action === 'uploadStoreIndex') {
+      output = handleStoreIndexUpload(inner);
+    } else if (inner.action === 'patchStoreIndex') {
+      output = handleStoreIndexPatch(inner);
+    } else {
+      return jsonResponse(400, { error: `action not allowed in a chunked upload: ${inner.action}` });
+    }
+    const result = JSON.parse(output.getContent());
+    cache.put(doneKey, JSON.stringify(result), UPLOAD_CACHE_SECONDS);
+    cache.removeAll(keys);
+    return jsonResponse(200, { ok: true, session, committed: true, result });
+  } finally {
+    lock.releaseLock();
+  }
+}
+
+function sha256Hex(text) {
+  return Utilities.computeDigest(Utilities.DigestAlgorithm.SHA_256, text, Utilities.Charset.UTF_8)
+    .map(b => ('0' + (b & 0xff).toString(16)).slice(-2))
+    .join('');
+}
+
 function resolveJsonInput(input) {
   const trimmed = input.trim();
   // If it looks like JSON array/object, return as-is.
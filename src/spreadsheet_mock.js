@@ -0,0 +1,291 @@
+#!/usr/bin/env node
+/**
+ * Local harness for code.gs: runs it in a Node vm against an in-memory SpreadsheetApp (plus ContentService,
+ * PropertiesService, CacheService, LockService, Utilities and Logger), so Store Index uploads and patches can be
+ * checked without a real sheet.
+ *
+ *   echo '{"sheets": {"Store Index": [["Code", ...], [...]]}, "requests": [{"action": "..."}, "GET"]}' | node src/spreadsheet_mock.js
+ *
+ * Each request is a doPost body, or "GET" for doGet. Prints
+ *   {"responses": [...], "sheets": {name: cells}, "calls": {setValues, cellsWritten, formulasWritten, deleteRows, insertRows, clearContents, sort}}
+ * Cells are stored as written (formulas as text); getValues/getDisplayValues evaluate =HYPERLINK() to its label
+ * and =IMAGE() to '' the way Sheets displays them. Used by `python scripts/store_index_patch.py --check`.
+ *
+ *   node src/spreadsheet_mock.js --serve [--flaky P] [--seed N] < '{"sheets": {...}}'
+ *
+ * serves the same web app over HTTP on a free local port (printed as {"port": N}): POST / is doPost, GET / is doGet
+ * and GET /__state returns {sheets, calls}. With --flaky, a fraction P of POSTs answers 503 without running, or
+ * runs and then answers 503 (a reply lost after the write). Used by `python scripts/chunked_upload.py --check`.
+ */
+const fs = require('fs');
+const http = require('http');
+const path = require('path');
+const vm = require('vm');
+const crypto = require('crypto');
+const zlib = require('zlib');
+
+const calls = { setValues: 0, cellsWritten: 0, formulasWritten: 0, deleteRows: 0, insertRows: 0, clearContents: 0, sort: 0 };
+
+function display(cell) {
+  if (cell === null || cell === undefined) return '';
+  const text = String(cell);
+  const link = text.match(/^=HYPERLINK\("[^"]*"[,;]"([^"]*)"\)$/i);
+  if (link) return link[1];
+  if (/^=IMAGE\(/i.test(text)) return '';
+  return text;
+}
+
+class MockRange {
+  constructor(sheet, row, col, rows, cols) {
+    Object.assign(this, { sheet, row, col, rows, cols });
+  }
+
+  read(fn) {
+    const out = [];
+    for (let r = 0; r < this.rows; r++) {
+      const line = this.sheet.cells[this.row - 1 + r] || [];
+      const values = [];
+      for (let c = 0; c < this.cols; c++) values.push(fn(line[this.col - 1 + c]));
+      out.push(values);
+    }
+    return out;
+  }
+
+  getValues() { return this.read(display); }
+  getDisplayValues() { return this.read(display); }
+  getValue() { return this.getValues()[0][0]; }
+
+  setValues(values) {
+    if (values.length !== this.rows || values.some(v => v.length !== this.cols)) {
+      throw new Error(`setValues: data is ${values.length}x${(values[0] || []).length}, range is ${this.rows}x${this.cols}`);
+    }
+    calls.setValues++;
+    values.forEach((line, r) => line.forEach((value, c) => this.sheet.write(this.row + r, this.col + c, value)));
+    return this;
+  }
+
+  setValue(value) { return this.setValues([[value]]); }
+  setFormula(formula) { return this.setValues([[formula]]); }
+  setFontColor() { return this; }
+  setFontLine() { return this; }
+
+  // Sorts like Sheets: number cells first (by value), then text, formula results such as =HYPERLINK() labels
+  // included (by text), then empty cells. A digits-only string written with setValues is a number cell.
+  sort(spec) {
+    calls.sort++;
+    const key = (spec && spec.column ? spec.column : this.col) - this.col;
+    const block = this.sheet.cells.slice(this.row - 1, this.row - 1 + this.rows).map(l => l.slice(this.col - 1, this.col - 1 + this.cols));
+    const rank = cell => {
+      const text = display(cell);
+      if (text === '') return [2, text];
+      const isFormula = typeof cell === 'string' && cell.startsWith('=');
+      return !isFormula && text.trim() !== '' && isFinite(Number(text)) ? [0, Number(text)] : [1, text];
+    };
+    block.sort((a, b) => {
+      const [tx, x] = rank(a[key]);
+      const [ty, y] = rank(b[key]);
+      if (tx !== ty || tx === 2) return tx - ty;  // empty cells stay last in either direction
+      const cmp = tx === 0 ? x - y : x.localeCompare(y);
+      return spec && spec.ascending === false ? -cmp : cmp;
+    });
+    block.forEach((line, r) => line.forEach((value, c) => { this.sheet.cells[this.row - 1 + r][this.col - 1 + c] = value; }));
+    return this;
+  }
+}
+
+class MockSheet {
+  constructor(name, cells) {
+    this.name = name;
+    this.cells = (cells || []).map(line => line.slice());
+  }
+
+  write(row, col, value) {
+    while (this.cells.length < row) this.cells.push([]);
+    const line = this.cells[row - 1];
+    while (line.length < col) line.push('');
+    line[col - 1] = value;
+    calls.cellsWritten++;
+    if (typeof value === 'string' && value.startsWith('=')) calls.formulasWritten++;
+  }
+
+  getName() { return this.name; }
+
+  getLastRow() {
+    for (let r = this.cells.length; r > 0; r--) {
+      if (this.cells[r - 1].some(v => v !== '' && v !== null && v !== undefined)) return r;
+    }
+    return 0;
+  }
+
+  getLastColumn() { return this.cells.reduce((max, line) => Math.max(max, line.length), 0); }
+  getRange(row, col, rows, cols) { return new MockRange(this, row, col, rows || 1, cols || 1); }
+  getDataRange() { return new MockRange(this, 1, 1, Math.max(this.getLastRow(), 1), Math.max(this.getLastColumn(), 1)); }
+
+  clearContents() {
+    calls.clearContents++;
+    this.cells = [];
+  }
+
+  deleteRows(start, count) {
+    calls.deleteRows++;
+    this.cells.splice(start - 1, count);
+  }
+
+  insertRowsBefore(row, count) {
+    calls.insertRows++;
+    while (this.cells.length < row - 1) this.cells.push([]);
+    this.cells.splice(row - 1, 0, ...Array.from({ length: count }, () => []));
+  }
+
+  appendRow(values) {
+    const row = this.getLastRow() + 1;
+    values.forEach((value, c) => this.write(row, c + 1, value));
+  }
+}
+
+class MockSpreadsheet {
+  constructor(sheets) {
+    this.sheets = Object.entries(sheets || {}).map(([name, cells]) => new MockSheet(name, cells));
+  }
+
+  // Apps Script matches sheet names case-insensitively
+  getSheetByName(name) { return this.sheets.find(s => s.name.toLowerCase() === String(name).toLowerCase()) || null; }
+
+  insertSheet(name) {
+    const sheet = new MockSheet(name, []);
+    this.sheets.push(sheet);
+    return sheet;
+  }
+
+  getSpreadsheetLocale() { return 'en_US'; }
+}
+
+class MockCache {
+  constructor() {
+    this.values = new Map();
+  }
+
+  get(key) { return this.values.has(key) ? this.values.get(key) : null; }
+
+  getAll(keys) {
+    const out = {};
+    keys.forEach(key => { if (this.values.has(key)) out[key] = this.values.get(key); });
+    return out;
+  }
+
+  put(key, value) {
+    if (String(value).length > 100 * 1024) throw new Error(`CacheService: value for ${key} exceeds 100KB`);
+    this.values.set(key, String(value));
+  }
+
+  remove(key) { this.values.delete(key); }
+  removeAll(keys) { keys.forEach(key => this.values.delete(key)); }
+}
+
+class MockBlob {
+  constructor(bytes, contentType) {
+    this.bytes = Buffer.from(bytes.map(b => b & 0xff));
+    this.contentType = contentType || null;
+  }
+
+  getBytes() { return Array.from(this.bytes, b => (b > 127 ? b - 256 : b)); }
+  getDataAsString() { return this.bytes.toString('utf8'); }
+}
+
+// Apps Script byte arrays are signed Java bytes
+const signed = buffer => Array.from(buffer, b => (b > 127 ? b - 256 : b));
+
+const Utilities = {
+  DigestAlgorithm: { SHA_256: 'sha256', MD5: 'md5', SHA_1: 'sha1' },
+  Charset: { UTF_8: 'utf8' },
+  base64Decode: text => signed(Buffer.from(text, 'base64')),
+  base64Encode: bytes => Buffer.from(bytes.map(b => b & 0xff)).toString('base64'),
+  newBlob: (bytes, contentType) => new MockBlob(bytes, contentType),
+  gzip: blob => new MockBlob(signed(zlib.gzipSync(blob.bytes)), 'application/x-gzip'),
+  ungzip: blob => new MockBlob(signed(zlib.gunzipSync(blob.bytes))),
+  computeDigest: (algorithm, text) => signed(crypto.createHash(algorithm).update(String(text), 'utf8').digest()),
+  sleep() {},
+};
+
+function loadScript(spreadsheet) {
+  const cache = new MockCache();
+  const lock = { waitLock() {}, tryLock: () => true, releaseLock() {}, hasLock: () => true };
+  const context = vm.createContext({
+    console: { log() {}, warn() {}, error: console.error },
+    Logger: { log() {} },
+    SpreadsheetApp: {
+      openById: () => spreadsheet,
+      getActiveSpreadsheet: () => spreadsheet,
+      getActive: () => spreadsheet,
+    },
+    PropertiesService: { getScriptProperties: () => ({ getProperty: key => (key === 'SHEET_ID' ? 'mock-sheet' : null) }) },
+    CacheService: { getScriptCache: () => cache },
+    LockService: { getScriptLock: () => lock },
+    Utilities,
+    ContentService: {
+      MimeType: { JSON: 'application/json' },
+      createTextOutput: text => ({ text, setMimeType() { return this; }, getContent() { return this.text; } }),
+    },
+  });
+  vm.runInContext(fs.readFileSync(path.join(__dirname, 'code.gs'), 'utf8'), context, { filename: 'code.gs' });
+  return request => {
+    context.__event = request === 'GET' ? {} : { postData: { contents: JSON.stringify(request) } };
+    const output = vm.runInContext(request === 'GET' ? 'doGet(__event)' : 'doPost(__event)', context);
+    return JSON.parse(output.getContent());
+  };
+}
+
+function sheetCells(spreadsheet) {
+  const sheets = {};
+  spreadsheet.sheets.forEach(s => { sheets[s.name] = s.cells; });
+  return sheets;
+}
+
+function option(name, fallback) {
+  const i = process.argv.indexOf(name);
+  return i >= 0 && i + 1 < process.argv.length ? process.argv[i + 1] : fallback;
+}
+
+function serve(spreadsheet, handle) {
+  const flaky = Number(option('--flaky', '0'));
+  let seed = Number(option('--seed', '1')) >>> 0;
+  const random = () => {
+    seed = (Math.imul(seed, 1664525) + 1013904223) >>> 0;
+    return seed / 2 ** 32;
+  };
+  const server = http.createServer((req, res) => {
+    const chunks = [];
+    req.on('data', chunk => chunks.push(chunk));
+    req.on('end', () => {
+      const reply = (status, body) => {
+        res.writeHead(status, { 'Content-Type': 'application/json' });
+        res.end(JSON.stringify(body));
+      };
+      if (req.method === 'GET') {
+        return reply(200, req.url.startsWith('/__state') ? { sheets: sheetCells(spreadsheet), calls } : handle('GET'));
+      }
+      const roll = random();
+      if (roll < flaky / 2) return reply(503, { error: 'mock: dropped before running' });
+      const body = handle(JSON.parse(Buffer.concat(chunks).toString('utf8') || '{}'));
+      if (roll < flaky) return reply(503, { error: 'mock: reply lost after running' });
+      return reply(200, body);
+    });
+  });
+  server.listen(0, '127.0.0.1', () => {
+    process.stdout.write(`${JSON.stringify({ port: server.address().port })}\n`);
+  });
+}
+
+function main() {
+  const input = JSON.parse(fs.readFileSync(0, 'utf8') || '{}');
+  const spreadsheet = new MockSpreadsheet(input.sheets);
+  const handle = loadScript(spreadsheet);
+  if (process.argv.includes('--serve')) {
+    serve(spreadsheet, handle);
+    return;
+  }
+  const responses = (input.requests || []).map(handle);
+  process.stdout.write(JSON.stringify({ responses, sheets: sheetCells(spreadsheet), calls }));
+}
+
+main();